@@ -3,12 +3,13 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from homeassistant.config_entries import ConfigEntryState
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers.service import ServiceCall
 
-from .const import DOMAIN, LOGGER
+from .const import DATA_MOOD_INDEX, DOMAIN, LOGGER
 
 if TYPE_CHECKING:
     from .config_flow import MoodLightsConfigEntry
@@ -21,12 +22,15 @@ CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 PLATFORMS = [Platform.BUTTON, Platform.BINARY_SENSOR, Platform.SWITCH, Platform.NUMBER, Platform.SENSOR]
 
 ATTR_MOOD_NAME = "mood_name"
+ATTR_MOOD_NAMES = "mood_names"
 ATTR_PRESET_NAME = "preset_name"
 ATTR_DURATION = "duration"
 
 SERVICE_ACTIVATE_MOOD = "activate_mood"
+SERVICE_ACTIVATE_MOODS = "activate_moods"
 SERVICE_RESTORE_PREVIOUS = "restore_previous"
 SERVICE_SAVE_STATE = "save_state"
+SERVICE_SAVE_ALL_STATES = "save_all_states"
 SERVICE_CANCEL_AUTO_REVERT = "cancel_auto_revert"
 
 
@@ -44,6 +48,17 @@ def _build_schemas() -> tuple:
             ),
         }
     )
+    activate_many = vol.Schema(
+        {
+            vol.Required(ATTR_MOOD_NAMES): vol.All(
+                cv.ensure_list, [cv.string], vol.Length(min=1)
+            ),
+            vol.Optional(ATTR_PRESET_NAME, default=""): cv.string,
+            vol.Optional(ATTR_DURATION): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=1440)
+            ),
+        }
+    )
     restore = vol.Schema(
         {
             vol.Required(ATTR_MOOD_NAME): cv.string,
@@ -55,31 +70,77 @@ def _build_schemas() -> tuple:
             vol.Optional(ATTR_PRESET_NAME, default=""): cv.string,
         }
     )
+    save_all = vol.Schema(
+        {
+            vol.Optional(ATTR_PRESET_NAME, default=""): cv.string,
+        }
+    )
     cancel_auto_revert = vol.Schema(
         {
             vol.Required(ATTR_MOOD_NAME): cv.string,
         }
     )
-    return activate, restore, save, cancel_auto_revert
+    return activate, activate_many, restore, save, save_all, cancel_auto_revert
+
+
+def _get_mood_index(hass: HomeAssistant) -> dict[str, tuple[MoodManager, str]]:
+    """Return the domain-wide case-folded mood name -> (manager, mood_id) index."""
+    return hass.data.setdefault(DOMAIN, {}).setdefault(DATA_MOOD_INDEX, {})
+
+
+def _loaded_managers(hass: HomeAssistant) -> list[MoodManager]:
+    """Return the managers of every loaded MoodLights entry."""
+    return [
+        entry.runtime_data
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+    ]
+
+
+def _index_moods(hass: HomeAssistant, manager: MoodManager) -> None:
+    """Add every mood of a freshly loaded manager to the name index."""
+    index = _get_mood_index(hass)
+    for mood in manager.get_all_moods().values():
+        # First loaded entry wins on a (config-flow-prevented) name clash
+        index.setdefault(mood.name.casefold(), (manager, mood.mood_id))
+
+
+def _unindex_moods(hass: HomeAssistant, manager: MoodManager) -> None:
+    """Remove every mood owned by a manager from the name index.
+
+    A mood of another loaded entry that lost a name clash to one of them
+    takes the freed name over.
+    """
+    index = _get_mood_index(hass)
+    freed = False
+    for mood in manager.get_all_moods().values():
+        key = mood.name.casefold()
+        match = index.get(key)
+        if match is not None and match[0] is manager:
+            del index[key]
+            freed = True
+    if not freed:
+        return
+    for other in _loaded_managers(hass):
+        if other is not manager:
+            _index_moods(hass, other)
 
 
 def _resolve_mood(hass: HomeAssistant, mood_name: str):
     """Resolve a mood by name across all MoodLights entries. Raises ServiceValidationError on failure."""
-    for entry in hass.config_entries.async_entries(DOMAIN):
-        if not entry.state:
-            continue
-        manager: MoodManager = entry.runtime_data
-        mood = manager.get_mood_by_name(mood_name)
+    index = _get_mood_index(hass)
+    match = index.get(mood_name.casefold())
+    if match is not None:
+        manager, mood_id = match
+        mood = manager.get_mood(mood_id)
         if mood is not None:
             return manager, mood
 
-    all_moods: list[str] = []
-    for entry in hass.config_entries.async_entries(DOMAIN):
-        if entry.state:
-            manager: MoodManager = entry.runtime_data
-            all_moods.extend(m.name for m in manager.get_all_moods().values())
-
-    available = ", ".join(f"'{m}'" for m in all_moods)
+    available = ", ".join(
+        f"'{mood.name}'"
+        for manager, mood_id in index.values()
+        if (mood := manager.get_mood(mood_id)) is not None
+    )
     raise ServiceValidationError(
         f"Mood '{mood_name}' not found. Available moods: {available or 'none'}."
     )
@@ -89,7 +150,14 @@ async def async_setup(hass: HomeAssistant, _config: dict) -> bool:
     """Set up the MoodLights integration."""
     hass.data.setdefault(DOMAIN, {})
 
-    schema_activate, schema_restore, schema_save, schema_cancel = _build_schemas()
+    (
+        schema_activate,
+        schema_activate_many,
+        schema_restore,
+        schema_save,
+        schema_save_all,
+        schema_cancel,
+    ) = _build_schemas()
 
     async def handle_activate_mood(call: ServiceCall) -> None:
         """Handle the activate_mood service call."""
@@ -98,6 +166,22 @@ async def async_setup(hass: HomeAssistant, _config: dict) -> bool:
         duration = call.data.get(ATTR_DURATION)
         await manager.activate_mood(mood.mood_id, preset_name=preset_name, duration=duration)
 
+    async def handle_activate_moods(call: ServiceCall) -> None:
+        """Handle the activate_moods service call."""
+        from .manager import async_activate_moods
+
+        moods = [
+            (manager, mood.mood_id)
+            for manager, mood in (
+                _resolve_mood(hass, mood_name) for mood_name in call.data[ATTR_MOOD_NAMES]
+            )
+        ]
+        await async_activate_moods(
+            moods,
+            preset_name=call.data.get(ATTR_PRESET_NAME, ""),
+            duration=call.data.get(ATTR_DURATION),
+        )
+
     async def handle_restore_previous(call: ServiceCall) -> None:
         """Handle the restore_previous service call."""
         manager, mood = _resolve_mood(hass, call.data[ATTR_MOOD_NAME])
@@ -113,6 +197,14 @@ async def async_setup(hass: HomeAssistant, _config: dict) -> bool:
         preset_name = call.data.get(ATTR_PRESET_NAME, "")
         await manager.save_state(mood.mood_id, preset_name=preset_name)
 
+    async def handle_save_all_states(call: ServiceCall) -> None:
+        """Handle the save_all_states service call."""
+        from .manager import async_save_all_states
+
+        await async_save_all_states(
+            _loaded_managers(hass), preset_name=call.data.get(ATTR_PRESET_NAME, "")
+        )
+
     async def handle_cancel_auto_revert(call: ServiceCall) -> None:
         """Handle the cancel_auto_revert service call."""
         manager, mood = _resolve_mood(hass, call.data[ATTR_MOOD_NAME])
@@ -128,6 +220,12 @@ async def async_setup(hass: HomeAssistant, _config: dict) -> bool:
         handle_activate_mood,
         schema=schema_activate,
     )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ACTIVATE_MOODS,
+        handle_activate_moods,
+        schema=schema_activate_many,
+    )
     hass.services.async_register(
         DOMAIN,
         SERVICE_RESTORE_PREVIOUS,
@@ -140,6 +238,12 @@ async def async_setup(hass: HomeAssistant, _config: dict) -> bool:
         handle_save_state,
         schema=schema_save,
     )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SAVE_ALL_STATES,
+        handle_save_all_states,
+        schema=schema_save_all,
+    )
     hass.services.async_register(
         DOMAIN,
         SERVICE_CANCEL_AUTO_REVERT,
@@ -155,13 +259,25 @@ async def async_setup_entry(hass: HomeAssistant, entry: MoodLightsConfigEntry) -
     """Set up MoodLights from a config entry."""
     from .manager import MoodManager
 
-    manager = MoodManager(hass, options=entry.options)
+    manager = MoodManager(hass, options=entry.options, entry_id=entry.entry_id)
     await manager.load_moods(entry.data)
+    await manager.async_restore_timers()
 
     entry.runtime_data = manager
+    _index_moods(hass, manager)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Options are read once by the manager, so apply changed ones by reloading.
+    # Mood edits update the entry too, but the config flow reloads for those.
+    options = dict(entry.options)
+
+    async def _async_update_listener(hass: HomeAssistant, entry: MoodLightsConfigEntry) -> None:
+        if entry.options != options:
+            await hass.config_entries.async_reload(entry.entry_id)
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
     return True
 
 
@@ -170,6 +286,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: MoodLightsConfigEntry)
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     manager: MoodManager = entry.runtime_data
+    _unindex_moods(hass, manager)
     await manager.async_unload()
 
     return unload_ok
@@ -180,6 +297,10 @@ async def async_remove_entry(hass: HomeAssistant, entry: MoodLightsConfigEntry)
     from homeassistant.helpers import device_registry as dr
     from homeassistant.helpers import entity_registry as er
 
+    from .store import MoodLightsStore
+
+    await MoodLightsStore(hass, entry.entry_id).async_remove()
+
     device_reg = dr.async_get(hass)
     for device in dr.async_entries_for_config_entry(device_reg, entry.entry_id):
         device_reg.async_remove_device(device.id)
@@ -0,0 +1,157 @@
+"""Activity recording for MoodLights diagnostics.
+
+The manager wraps every activation and restore in ``ActivityLog.track``.
+While one is running, the dispatcher reports each service call it makes
+through ``record_call``; the call lands on the timeline of the operation
+that issued it, even when several operations overlap. A batch spanning
+several entries tracks one operation per entry, nested, and its calls land
+on each of their timelines.
+"""
+from __future__ import annotations
+
+import time
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from .const import DEFAULT_DIAGNOSTICS_TIMELINES
+
+
+@dataclass(slots=True)
+class CallRecord:
+    """One service call made during an activation or restore."""
+
+    domain: str
+    service: str
+    entity_ids: tuple[str, ...]
+    offset: float  # seconds from the start of the operation to the call
+    wait: float  # seconds queued for a dispatch slot
+    latency: float  # seconds spent in the service call
+    error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the call as diagnostics data (times in milliseconds)."""
+        return {
+            "service": f"{self.domain}.{self.service}",
+            "entity_ids": list(self.entity_ids),
+            "offset_ms": round(self.offset * 1000, 1),
+            "wait_ms": round(self.wait * 1000, 1),
+            "latency_ms": round(self.latency * 1000, 1),
+            "error": self.error,
+        }
+
+
+@dataclass(slots=True)
+class Timeline:
+    """An activation or restore and the service calls it made."""
+
+    kind: str
+    mood_ids: tuple[str, ...]
+    started_at: float = field(default_factory=time.time)
+    started: float = field(default_factory=time.monotonic)
+    duration: float | None = None  # None while still running
+    calls: list[CallRecord] = field(default_factory=list)
+    convergence: dict[str, Any] | None = None  # set when a convergence phase ends
+    superseded: list[str] = field(default_factory=list)  # commands dropped unsent
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the timeline as diagnostics data."""
+        return {
+            "kind": self.kind,
+            "mood_ids": list(self.mood_ids),
+            "started_at": datetime.fromtimestamp(self.started_at, UTC).isoformat(),
+            "duration_ms": (
+                None if self.duration is None else round(self.duration * 1000, 1)
+            ),
+            "failed_calls": sum(call.error is not None for call in self.calls),
+            "calls": [call.as_dict() for call in self.calls],
+            "convergence": self.convergence,
+            "superseded": self.superseded,
+        }
+
+
+# Timelines of the activations/restores running in the current task
+_current_timelines: ContextVar[tuple[Timeline, ...]] = ContextVar(
+    "moodlights_timelines", default=()
+)
+
+
+class ActivityLog:
+    """Per-mood operation counts plus a ring buffer of recent timelines."""
+
+    def __init__(self, max_timelines: int = DEFAULT_DIAGNOSTICS_TIMELINES) -> None:
+        """Initialize the log."""
+        self._timelines: deque[Timeline] = deque(maxlen=max_timelines)
+        self._counts: dict[str, Counter[str]] = {}
+
+    @contextmanager
+    def track(self, kind: str, mood_ids: Iterable[str]) -> Iterator[Timeline]:
+        """Record an operation and the service calls made inside the block."""
+        timeline = Timeline(kind, tuple(mood_ids))
+        self.count(kind, timeline.mood_ids)
+        # Appended up front so a stuck operation shows up while it runs
+        self._timelines.append(timeline)
+        token = _current_timelines.set((*_current_timelines.get(), timeline))
+        try:
+            yield timeline
+        finally:
+            _current_timelines.reset(token)
+            timeline.duration = time.monotonic() - timeline.started
+
+    def count(self, kind: str, mood_ids: Iterable[str]) -> None:
+        """Count an event for each mood without recording a timeline."""
+        for mood_id in mood_ids:
+            self._counts.setdefault(mood_id, Counter())[kind] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return counts and timelines (newest first) as diagnostics data."""
+        return {
+            "counts": {mood_id: dict(counts) for mood_id, counts in self._counts.items()},
+            "timelines": [timeline.as_dict() for timeline in reversed(self._timelines)],
+        }
+
+
+def record_call(
+    domain: str,
+    service: str,
+    service_data: dict[str, Any],
+    queued: float,
+    started: float,
+    error: BaseException | None,
+) -> None:
+    """Add a finished service call to the running operation's timeline.
+
+    ``queued`` and ``started`` are monotonic times at which the call asked
+    for a dispatch slot and got one. Calls made outside a tracked operation
+    are ignored.
+    """
+    timelines = _current_timelines.get()
+    if not timelines:
+        return
+    entity_ids = service_data.get("entity_id", ())
+    if isinstance(entity_ids, str):
+        entity_ids = (entity_ids,)
+    latency = time.monotonic() - started
+    for timeline in timelines:
+        timeline.calls.append(
+            CallRecord(
+                domain=domain,
+                service=service,
+                entity_ids=tuple(entity_ids),
+                offset=queued - timeline.started,
+                wait=started - queued,
+                latency=latency,
+                error=None if error is None else repr(error),
+            )
+        )
+
+
+def record_superseded(entity_ids: Iterable[str]) -> None:
+    """Note entities whose command was dropped because a newer one took over."""
+    entity_ids = tuple(entity_ids)
+    for timeline in _current_timelines.get():
+        timeline.superseded.extend(entity_ids)
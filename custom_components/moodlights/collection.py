@@ -0,0 +1,153 @@
+"""Collection entries: many moods in one config entry.
+
+A collection is served by one manager and one set of platform setups, so
+startup and reload cost stays flat as moods are added. Every mood in it
+carries a stable ``mood_id``; entity unique ids and storage keys are
+derived from it, so adding a mood never renumbers the others.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .const import CONF_COLLECTION, CONF_MOOD_ID, DOMAIN, LOGGER
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+
+
+def is_collection(entry: ConfigEntry) -> bool:
+    """Return True if the entry is a collection entry."""
+    return bool(entry.data.get(CONF_COLLECTION, False))
+
+
+def with_mood_ids(moods: list[dict]) -> list[dict]:
+    """Return the moods with their (positional, if unset) mood_id made explicit."""
+    return [
+        {**mood, CONF_MOOD_ID: mood.get(CONF_MOOD_ID, f"mood_{idx}")}
+        for idx, mood in enumerate(moods)
+    ]
+
+
+def next_mood_id(moods: list[dict]) -> str:
+    """Return an unused mood_id for a mood appended to ``moods``."""
+    taken = {mood[CONF_MOOD_ID] for mood in with_mood_ids(moods)}
+    idx = len(moods)
+    while f"mood_{idx}" in taken:
+        idx += 1
+    return f"mood_{idx}"
+
+
+async def async_fold_entries(
+    hass: HomeAssistant, target: ConfigEntry, sources: list[ConfigEntry]
+) -> list[dict]:
+    """Move the moods of ``sources`` into ``target`` and return its new mood list.
+
+    Entities and devices are re-pointed at ``target`` with the new mood ids,
+    keeping their entity ids and history, and saved snapshots and pending
+    auto-revert deadlines are carried over. The source entries are removed;
+    the caller writes the returned moods to ``target`` and reloads it.
+    """
+    from homeassistant.helpers import device_registry as dr
+    from homeassistant.helpers import entity_registry as er
+
+    from .store import MoodLightsStore
+
+    # Unloading flushes each manager's pending snapshot and timer writes
+    for entry in (target, *sources):
+        await hass.config_entries.async_unload(entry.entry_id)
+
+    moods = with_mood_ids(target.data.get("moods", []))
+    target_store = MoodLightsStore(hass, target.entry_id)
+    timers: dict[str, float] = await target_store.async_load_timers()
+    snapshots: dict[str, Any] = await target_store.async_load_snapshots()
+    entity_reg = er.async_get(hass)
+    device_reg = dr.async_get(hass)
+
+    for source in sources:
+        source_store = MoodLightsStore(hass, source.entry_id)
+        source_timers = await source_store.async_load_timers()
+        source_snapshots = await source_store.async_load_snapshots()
+        source_entities = er.async_entries_for_config_entry(entity_reg, source.entry_id)
+
+        for mood in with_mood_ids(source.data.get("moods", [])):
+            old_id = mood[CONF_MOOD_ID]
+            new_id = next_mood_id(moods)
+            moods.append({**mood, CONF_MOOD_ID: new_id})
+
+            if old_id in source_timers:
+                timers[new_id] = source_timers[old_id]
+            if old_id in source_snapshots:
+                snapshots[new_id] = source_snapshots[old_id]
+
+            old_prefix = f"{DOMAIN}_{source.entry_id}_{old_id}_"
+            new_prefix = f"{DOMAIN}_{target.entry_id}_{new_id}_"
+            for entity in source_entities:
+                if entity.unique_id.startswith(old_prefix):
+                    entity_reg.async_update_entity(
+                        entity.entity_id,
+                        config_entry_id=target.entry_id,
+                        new_unique_id=new_prefix + entity.unique_id[len(old_prefix) :],
+                    )
+            device = device_reg.async_get_device(
+                identifiers={(DOMAIN, f"{source.entry_id}_{old_id}")}
+            )
+            if device is not None:
+                device_reg.async_update_device(
+                    device.id,
+                    add_config_entry_id=target.entry_id,
+                    remove_config_entry_id=source.entry_id,
+                    new_identifiers={(DOMAIN, f"{target.entry_id}_{new_id}")},
+                )
+
+        # Also deletes the source's storage files
+        await hass.config_entries.async_remove(source.entry_id)
+        LOGGER.debug("Folded entry %s into collection %s", source.title, target.title)
+
+    await target_store.async_save_timers(timers)
+    await target_store.async_save_snapshots(snapshots)
+    return moods
+
+
+async def async_remove_mood(
+    hass: HomeAssistant, entry: ConfigEntry, mood_id: str
+) -> list[dict]:
+    """Remove one mood from ``entry`` and return its new mood list.
+
+    The mood's device and entities are deleted, and its saved snapshots and
+    pending auto-revert deadline are pruned from the entry's storage. The
+    remaining moods keep their ids; the caller writes the returned moods to
+    ``entry`` and reloads it.
+    """
+    from homeassistant.helpers import device_registry as dr
+    from homeassistant.helpers import entity_registry as er
+
+    from .store import MoodLightsStore
+
+    # Unloading flushes the manager's pending snapshot and timer writes
+    await hass.config_entries.async_unload(entry.entry_id)
+
+    store = MoodLightsStore(hass, entry.entry_id)
+    timers: dict[str, float] = await store.async_load_timers()
+    snapshots: dict[str, Any] = await store.async_load_snapshots()
+    timers.pop(mood_id, None)
+    snapshots.pop(mood_id, None)
+    await store.async_save_timers(timers)
+    await store.async_save_snapshots(snapshots)
+
+    entity_reg = er.async_get(hass)
+    prefix = f"{DOMAIN}_{entry.entry_id}_{mood_id}_"
+    for entity in er.async_entries_for_config_entry(entity_reg, entry.entry_id):
+        if entity.unique_id.startswith(prefix):
+            entity_reg.async_remove(entity.entity_id)
+    device_reg = dr.async_get(hass)
+    device = device_reg.async_get_device(identifiers={(DOMAIN, f"{entry.entry_id}_{mood_id}")})
+    if device is not None:
+        device_reg.async_remove_device(device.id)
+
+    LOGGER.debug("Removed mood %s from collection %s", mood_id, entry.title)
+    return [
+        mood
+        for mood in with_mood_ids(entry.data.get("moods", []))
+        if mood[CONF_MOOD_ID] != mood_id
+    ]
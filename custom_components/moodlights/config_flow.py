@@ -5,15 +5,29 @@ from typing import TYPE_CHECKING
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.config_entries import SOURCE_RECONFIGURE
+from homeassistant.config_entries import SOURCE_RECONFIGURE, ConfigEntryState
 from homeassistant.core import callback
 from homeassistant.helpers import selector
 
+from .collection import (
+    async_fold_entries,
+    async_remove_mood,
+    is_collection,
+    next_mood_id,
+    with_mood_ids,
+)
 from .const import (
+    COLLECTION_TITLE,
+    CONF_COLLECTION,
+    CONF_CONVERGE,
+    CONF_CONVERGE_MAX_RETRIES,
+    CONF_CONVERGE_TIMEOUT,
     CONF_COVER_CONFIG,
     CONF_COVER_POSITION,
     CONF_COVER_TILT_POSITION,
     CONF_COVERS,
+    CONF_DELTA_APPLY,
+    CONF_DELTA_RESTORE,
     CONF_LIGHT_BRIGHTNESS,
     CONF_LIGHT_COLOR_TEMP_KELVIN,
     CONF_LIGHT_CONFIG,
@@ -21,9 +35,27 @@ from .const import (
     CONF_LIGHT_POWER,
     CONF_LIGHT_RGB_COLOR,
     CONF_LIGHTS,
+    CONF_MAX_IN_FLIGHT,
+    CONF_MAX_IN_FLIGHT_PER_DOMAIN,
+    CONF_MOOD_ID,
     CONF_MOOD_NAME,
+    CONF_RESTORE_BRIGHTNESS_TOLERANCE,
+    CONF_RESTORE_COLOR_TEMP_TOLERANCE,
+    CONF_RESTORE_POSITION_TOLERANCE,
+    CONF_REVERT_AT_TIMESTAMP,
+    CONF_REVERT_COALESCE_WINDOW,
+    CONF_VECTORIZED_MATCH,
     COVER_SUPPORT_SET_POSITION,
     COVER_SUPPORT_SET_TILT_POSITION,
+    DATA_MOOD_INDEX,
+    DEFAULT_CONVERGE_MAX_RETRIES,
+    DEFAULT_CONVERGE_TIMEOUT_SEC,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MAX_IN_FLIGHT_PER_DOMAIN,
+    DEFAULT_RESTORE_BRIGHTNESS_TOLERANCE,
+    DEFAULT_RESTORE_COLOR_TEMP_TOLERANCE,
+    DEFAULT_RESTORE_POSITION_TOLERANCE,
+    DEFAULT_REVERT_COALESCE_WINDOW_SEC,
     DOMAIN,
     MAX_BRIGHTNESS,
     MAX_COLOR_TEMP_KELVIN,
@@ -48,6 +80,8 @@ class MoodLightsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self.current_mood_name: str = ""
         self.selected_lights: list[str] = []
         self.selected_covers: list[str] = []
+        # Position of the mood being reconfigured in its entry's mood list
+        self._mood_index: int | None = None
 
     @staticmethod
     @callback
@@ -58,7 +92,17 @@ class MoodLightsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_user(
         self, user_input: dict | None = None
     ) -> config_entries.ConfigFlowResult:
-        """Handle the initial step - enter mood name."""
+        """Handle the initial step - offer to combine entries, else create a mood."""
+        if user_input is None and self._fold_plan() is not None:
+            return self.async_show_menu(
+                step_id="user", menu_options=["add_mood", "combine"]
+            )
+        return await self.async_step_add_mood(user_input)
+
+    async def async_step_add_mood(
+        self, user_input: dict | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Enter the new mood's name."""
         errors: dict[str, str] = {}
 
         if user_input is not None:
@@ -70,7 +114,7 @@ class MoodLightsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 return await self.async_step_select_lights()
 
         return self.async_show_form(
-            step_id="user",
+            step_id="add_mood",
             data_schema=vol.Schema({
                 vol.Required(
                     CONF_MOOD_NAME,
@@ -85,21 +129,109 @@ class MoodLightsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     def _is_mood_name_taken(self, name: str) -> bool:
         """Return True if another config entry already uses this mood name (case-insensitive)."""
-        name_lower = name.lower()
+        name_key = name.casefold()
+        # Allow the same name when reconfiguring the same entry
+        reconfigure_entry = (
+            self._get_reconfigure_entry() if self.source == SOURCE_RECONFIGURE else None
+        )
+
+        index = self.hass.data.get(DOMAIN, {}).get(DATA_MOOD_INDEX, {})
+        match = index.get(name_key)
+        if match is not None and (
+            reconfigure_entry is None
+            or getattr(reconfigure_entry, "runtime_data", None) is not match[0]
+        ):
+            return True
+
+        # Other moods of the collection being reconfigured
+        if reconfigure_entry is not None:
+            for idx, mood in enumerate(reconfigure_entry.data.get("moods", [])):
+                if idx == self._mood_index:
+                    continue
+                if mood.get(CONF_MOOD_NAME, "").casefold() == name_key:
+                    return True
+
+        # Only loaded entries are indexed — check the stored data of the rest
         for entry in self.hass.config_entries.async_entries(DOMAIN):
+            if entry.state is ConfigEntryState.LOADED:
+                continue
+            if reconfigure_entry is not None and entry.entry_id == reconfigure_entry.entry_id:
+                continue
             for mood in entry.data.get("moods", []):
-                if mood.get(CONF_MOOD_NAME, "").lower() == name_lower:
-                    # Allow the same name when reconfiguring the same entry
-                    if self.source == SOURCE_RECONFIGURE:
-                        reconfigure_entry = self._get_reconfigure_entry()
-                        if entry.entry_id == reconfigure_entry.entry_id:
-                            continue
+                if mood.get(CONF_MOOD_NAME, "").casefold() == name_key:
                     return True
         return False
 
     async def async_step_import(self, _import_info: dict | None) -> config_entries.ConfigFlowResult:
         """Handle import from YAML."""
-        return await self.async_step_user(None)
+        return await self.async_step_add_mood(None)
+
+    # ------------------------------------------------------------------
+    # Collection steps
+    # ------------------------------------------------------------------
+
+    def _collection_entry(self) -> config_entries.ConfigEntry | None:
+        """Return the collection entry, if there is one."""
+        return next(
+            (
+                entry
+                for entry in self.hass.config_entries.async_entries(DOMAIN)
+                if is_collection(entry)
+            ),
+            None,
+        )
+
+    def _fold_plan(
+        self,
+    ) -> tuple[config_entries.ConfigEntry, list[config_entries.ConfigEntry]] | None:
+        """Return the entry to combine into and the single-mood entries to fold.
+
+        Single-mood entries fold into the existing collection, or into the
+        first of them when there is none yet. None if there is nothing to do.
+        """
+        singles = [
+            entry
+            for entry in self.hass.config_entries.async_entries(DOMAIN)
+            if not is_collection(entry)
+        ]
+        collection = self._collection_entry()
+        if collection is not None:
+            return (collection, singles) if singles else None
+        return (singles[0], singles[1:]) if len(singles) > 1 else None
+
+    async def async_step_combine(
+        self, user_input: dict | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Fold all single-mood entries into one collection entry."""
+        plan = self._fold_plan()
+        if plan is None:
+            return self.async_abort(reason="nothing_to_combine")
+        target, sources = plan
+
+        if user_input is None:
+            return self.async_show_form(
+                step_id="combine",
+                data_schema=vol.Schema({}),
+                description_placeholders={
+                    "count": str(len(sources) + (0 if is_collection(target) else 1))
+                },
+                last_step=True,
+            )
+
+        moods = await async_fold_entries(self.hass, target, sources)
+        return self.async_update_reload_and_abort(
+            target,
+            title=COLLECTION_TITLE,
+            data={**target.data, CONF_COLLECTION: True, "moods": moods},
+            reason="combined",
+        )
+
+    def _reconfigure_mood(self) -> dict:
+        """Return the stored data of the mood being reconfigured."""
+        moods = self._get_reconfigure_entry().data.get("moods", [])
+        if self._mood_index is None or self._mood_index >= len(moods):
+            return {}
+        return moods[self._mood_index]
 
     # ------------------------------------------------------------------
     # Lights steps
@@ -190,10 +322,7 @@ class MoodLightsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         # Load existing light_config for pre-filling during reconfigure
         existing_light_config: dict = {}
         if self.source == SOURCE_RECONFIGURE:
-            reconfigure_entry = self._get_reconfigure_entry()
-            moods = reconfigure_entry.data.get("moods", [])
-            if moods:
-                existing_light_config = moods[0].get(CONF_LIGHT_CONFIG, {})
+            existing_light_config = self._reconfigure_mood().get(CONF_LIGHT_CONFIG, {})
 
         # Build schema — optional fields have no default (renders blank); pre-fill from existing data on reconfigure
         schema = {}
@@ -305,10 +434,7 @@ class MoodLightsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         # Pre-fill from existing config on reconfigure
         default_covers: list[str] = []
         if self.source == SOURCE_RECONFIGURE:
-            reconfigure_entry = self._get_reconfigure_entry()
-            moods = reconfigure_entry.data.get("moods", [])
-            if moods:
-                default_covers = moods[0].get(CONF_COVERS, [])
+            default_covers = self._reconfigure_mood().get(CONF_COVERS, [])
         self.selected_covers = default_covers
 
         covers_key = (
@@ -374,10 +500,30 @@ class MoodLightsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             # In reconfigure: update + reload the existing entry
             if self.source == SOURCE_RECONFIGURE:
                 config_entry = self._get_reconfigure_entry()
+                if not is_collection(config_entry):
+                    return self.async_update_reload_and_abort(
+                        config_entry,
+                        title=self.current_mood_name,
+                        data={"moods": self.moods},
+                    )
+                # Replace just this mood, keeping its id (and so its entities)
+                moods = list(config_entry.data.get("moods", []))
+                mood_data[CONF_MOOD_ID] = self._reconfigure_mood()[CONF_MOOD_ID]
+                moods[self._mood_index] = mood_data
                 return self.async_update_reload_and_abort(
                     config_entry,
-                    title=self.current_mood_name,
-                    data={"moods": self.moods},
+                    data={**config_entry.data, "moods": moods},
+                )
+
+            # With a collection, new moods join it instead of adding an entry
+            collection = self._collection_entry()
+            if collection is not None:
+                moods = list(collection.data.get("moods", []))
+                moods.append({**mood_data, CONF_MOOD_ID: next_mood_id(moods)})
+                return self.async_update_reload_and_abort(
+                    collection,
+                    data={**collection.data, "moods": moods},
+                    reason="mood_added",
                 )
 
             # Normal setup: set unique_id and create a new entry
@@ -396,10 +542,7 @@ class MoodLightsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         # Load existing cover_config for pre-filling during reconfigure
         existing_cover_config: dict = {}
         if self.source == SOURCE_RECONFIGURE:
-            reconfigure_entry = self._get_reconfigure_entry()
-            moods = reconfigure_entry.data.get("moods", [])
-            if moods:
-                existing_cover_config = moods[0].get(CONF_COVER_CONFIG, {})
+            existing_cover_config = self._reconfigure_mood().get(CONF_COVER_CONFIG, {})
 
         schema: dict = {}
 
@@ -473,8 +616,14 @@ class MoodLightsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     ) -> config_entries.ConfigFlowResult:
         """Seed existing data and start the full reconfigure flow from step 1."""
         config_entry = self._get_reconfigure_entry()
-        moods = config_entry.data.get("moods", [])
-        current_mood = moods[0] if moods else {}
+        if self._mood_index is None:
+            if is_collection(config_entry):
+                return self.async_show_menu(
+                    step_id="manage_collection",
+                    menu_options=["select_mood", "remove_mood"],
+                )
+            self._mood_index = 0
+        current_mood = self._reconfigure_mood()
 
         # Pre-fill instance state from current entry
         self.current_mood_name = current_mood.get(CONF_MOOD_NAME, "")
@@ -509,21 +658,130 @@ class MoodLightsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             last_step=False,
         )
 
-class MoodLightsOptionsFlowHandler(config_entries.OptionsFlow):
-    """Handles the options flow for MoodLights."""
+    async def async_step_select_mood(
+        self, user_input: dict | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Pick which mood of a collection to reconfigure."""
+        moods = self._get_reconfigure_entry().data.get("moods", [])
+        if user_input is not None:
+            self._mood_index = int(user_input["mood"])
+            return await self.async_step_reconfigure()
 
-    async def async_step_init(self, user_input: dict | None = None) -> config_entries.ConfigFlowResult:
-        """Handle options flow - show about."""
         return self.async_show_form(
-            step_id="about",
-            data_schema=vol.Schema({}),
-            last_step=True,
+            step_id="select_mood",
+            data_schema=vol.Schema({
+                vol.Required("mood"): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=[
+                            selector.SelectOptionDict(
+                                value=str(idx), label=mood.get(CONF_MOOD_NAME, "")
+                            )
+                            for idx, mood in enumerate(moods)
+                        ],
+                        mode=selector.SelectSelectorMode.DROPDOWN,
+                    )
+                ),
+            }),
+            last_step=False,
         )
 
-    async def async_step_about(self, user_input: dict | None = None) -> config_entries.ConfigFlowResult:
-        """Handle about step."""
+    async def async_step_remove_mood(
+        self, user_input: dict | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Pick a mood of a collection and remove it, with its entities and history."""
+        config_entry = self._get_reconfigure_entry()
+        moods = with_mood_ids(config_entry.data.get("moods", []))
+        if len(moods) <= 1:
+            return self.async_abort(reason="last_mood")
+
+        if user_input is not None:
+            moods = await async_remove_mood(self.hass, config_entry, user_input["mood"])
+            return self.async_update_reload_and_abort(
+                config_entry,
+                data={**config_entry.data, "moods": moods},
+                reason="mood_removed",
+            )
+
         return self.async_show_form(
-            step_id="about",
-            data_schema=vol.Schema({}),
+            step_id="remove_mood",
+            data_schema=vol.Schema({
+                vol.Required("mood"): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=[
+                            selector.SelectOptionDict(
+                                value=mood[CONF_MOOD_ID], label=mood.get(CONF_MOOD_NAME, "")
+                            )
+                            for mood in moods
+                        ],
+                        mode=selector.SelectSelectorMode.DROPDOWN,
+                    )
+                ),
+            }),
             last_step=True,
         )
+
+
+class MoodLightsOptionsFlowHandler(config_entries.OptionsFlow):
+    """Handles the options flow for MoodLights."""
+
+    async def async_step_init(self, user_input: dict | None = None) -> config_entries.ConfigFlowResult:
+        """Handle options flow - how moods are applied, restored and tracked."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.hass.config_entries.async_get_entry(self.handler).options
+
+        def _number(
+            maximum: float, unit: str | None = None, step: float = 1, minimum: float = 0
+        ) -> selector.NumberSelector:
+            config = selector.NumberSelectorConfig(
+                min=minimum, max=maximum, step=step, mode=selector.NumberSelectorMode.BOX
+            )
+            if unit is not None:
+                config["unit_of_measurement"] = unit
+            return selector.NumberSelector(config)
+
+        fields = [
+            (CONF_DELTA_APPLY, False, selector.BooleanSelector()),
+            (CONF_CONVERGE, False, selector.BooleanSelector()),
+            (CONF_CONVERGE_TIMEOUT, DEFAULT_CONVERGE_TIMEOUT_SEC, _number(300, "s")),
+            (CONF_CONVERGE_MAX_RETRIES, DEFAULT_CONVERGE_MAX_RETRIES, _number(10)),
+            (CONF_DELTA_RESTORE, False, selector.BooleanSelector()),
+            (
+                CONF_RESTORE_BRIGHTNESS_TOLERANCE,
+                DEFAULT_RESTORE_BRIGHTNESS_TOLERANCE,
+                _number(255),
+            ),
+            (
+                CONF_RESTORE_COLOR_TEMP_TOLERANCE,
+                DEFAULT_RESTORE_COLOR_TEMP_TOLERANCE,
+                _number(1000, "K"),
+            ),
+            (
+                CONF_RESTORE_POSITION_TOLERANCE,
+                DEFAULT_RESTORE_POSITION_TOLERANCE,
+                _number(100, "%"),
+            ),
+            (
+                CONF_REVERT_COALESCE_WINDOW,
+                DEFAULT_REVERT_COALESCE_WINDOW_SEC,
+                _number(60, "s", step=0.1),
+            ),
+            (CONF_REVERT_AT_TIMESTAMP, False, selector.BooleanSelector()),
+            (CONF_VECTORIZED_MATCH, False, selector.BooleanSelector()),
+            (CONF_MAX_IN_FLIGHT, DEFAULT_MAX_IN_FLIGHT, _number(100, minimum=1)),
+            (
+                CONF_MAX_IN_FLIGHT_PER_DOMAIN,
+                DEFAULT_MAX_IN_FLIGHT_PER_DOMAIN,
+                _number(100, minimum=1),
+            ),
+        ]
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(key, default=options.get(key, default)): field
+                    for key, default, field in fields
+                }
+            ),
+        )
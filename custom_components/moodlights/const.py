@@ -6,7 +6,19 @@ LOGGER: Logger = getLogger(__package__)
 
 DOMAIN = "moodlights"
 
+# hass.data[DOMAIN] keys
+DATA_MOOD_INDEX = "mood_index"
+DATA_ENTITY_TRACKER = "entity_tracker"
+DATA_ENTITY_SEQUENCER = "entity_sequencer"
+DATA_SERVICE_DISPATCHER = "service_dispatcher"
+
 CONF_MOOD_NAME = "name"
+# Stable id of a mood inside a collection entry (single-mood entries use
+# the mood's position, "mood_0")
+CONF_MOOD_ID = "mood_id"
+# Entry data flag: one entry holding many moods, served by one manager
+CONF_COLLECTION = "collection"
+COLLECTION_TITLE = "Moods"
 CONF_LIGHT_CONFIG = "light_config"
 CONF_LIGHTS = "lights"
 
@@ -24,6 +36,9 @@ MAX_BRIGHTNESS = 100
 MIN_COLOR_TEMP_KELVIN = 2700
 MAX_COLOR_TEMP_KELVIN = 65000
 
+# Active sensor: state events within this window are written as one update
+ACTIVE_SENSOR_WRITE_DELAY_SEC = 1.0
+
 ATTR_MISMATCHED_LIGHTS = "mismatched_lights"
 ATTR_CONFIGURED_LIGHTS = "configured_lights"
 ATTR_MOOD_NAME = "mood_name"
@@ -46,3 +61,37 @@ ATTR_MISMATCHED_COVERS = "mismatched_covers"
 DEFAULT_REVERT_DURATION_MIN = 60  # minutes
 MIN_REVERT_DURATION_MIN = 1  # 1 minute
 MAX_REVERT_DURATION_MIN = 1440  # 24 hours
+COUNTDOWN_UPDATE_INTERVAL_SEC = 5  # shared countdown ticker period
+DEFAULT_REVERT_COALESCE_WINDOW_SEC = 1  # reverts due this close together share one restore
+
+# Service dispatch concurrency, across all entries
+DEFAULT_MAX_IN_FLIGHT = 10  # blocking service calls in flight, all domains
+DEFAULT_MAX_IN_FLIGHT_PER_DOMAIN = 5  # blocking service calls in flight, per domain
+
+# Convergence: re-send to entities that missed an activation command
+DEFAULT_CONVERGE_TIMEOUT_SEC = 10
+DEFAULT_CONVERGE_MAX_RETRIES = 2
+CONVERGE_INITIAL_BACKOFF_SEC = 1  # doubled after every retry
+
+# Diagnostics: activation/restore timelines kept per config entry
+DEFAULT_DIAGNOSTICS_TIMELINES = 20
+
+# Delta restore tolerances (live state this close to the snapshot is left alone)
+DEFAULT_RESTORE_BRIGHTNESS_TOLERANCE = 2  # raw brightness units (0-255)
+DEFAULT_RESTORE_COLOR_TEMP_TOLERANCE = 50  # Kelvin
+DEFAULT_RESTORE_POSITION_TOLERANCE = 2  # cover position/tilt percent
+
+# Entry options
+CONF_REVERT_AT_TIMESTAMP = "revert_at_timestamp"  # countdown sensor shows a timestamp
+CONF_REVERT_COALESCE_WINDOW = "revert_coalesce_window"  # seconds
+CONF_MAX_IN_FLIGHT = "max_in_flight"  # shared by all entries
+CONF_MAX_IN_FLIGHT_PER_DOMAIN = "max_in_flight_per_domain"  # shared by all entries
+CONF_DELTA_APPLY = "delta_apply"  # only command entities not already at target
+CONF_DELTA_RESTORE = "delta_restore"  # only restore entities that changed
+CONF_CONVERGE = "converge"  # verify targets after activation, retry laggards
+CONF_CONVERGE_TIMEOUT = "converge_timeout"
+CONF_CONVERGE_MAX_RETRIES = "converge_max_retries"
+CONF_RESTORE_BRIGHTNESS_TOLERANCE = "restore_brightness_tolerance"
+CONF_RESTORE_COLOR_TEMP_TOLERANCE = "restore_color_temp_tolerance"
+CONF_RESTORE_POSITION_TOLERANCE = "restore_position_tolerance"
+CONF_VECTORIZED_MATCH = "vectorized_match"  # evaluate all moods with NumPy
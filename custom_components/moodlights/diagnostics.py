@@ -0,0 +1,31 @@
+"""Diagnostics support for MoodLights."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant
+
+from .manager import MoodManager
+
+if TYPE_CHECKING:
+    from .config_flow import MoodLightsConfigEntry
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant,  # noqa: ARG001
+    entry: MoodLightsConfigEntry,
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    Includes per-mood activation/restore counts, the most recent activation
+    and restore timelines with per-call latency and failures, the snapshot
+    memory footprint and pending auto-revert deadlines.
+    """
+    manager: MoodManager = entry.runtime_data
+    return {
+        "entry": {
+            "title": entry.title,
+            "options": dict(entry.options),
+        },
+        **manager.get_diagnostics(),
+    }
@@ -0,0 +1,162 @@
+"""Bounded-concurrency service dispatch for MoodLights."""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING, Any
+
+from .activity import record_call, record_superseded
+from .const import (
+    CONF_MAX_IN_FLIGHT,
+    CONF_MAX_IN_FLIGHT_PER_DOMAIN,
+    DATA_SERVICE_DISPATCHER,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MAX_IN_FLIGHT_PER_DOMAIN,
+    DOMAIN,
+)
+from .sequencer import async_get_sequencer
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .sequencer import EntitySequencer
+
+ServiceCall = tuple[str, str, dict[str, Any]]
+
+
+class ServiceDispatcher:
+    """Run blocking service calls with a cap on how many are in flight.
+
+    Two limits apply: one across all domains and one per domain (``light``,
+    ``cover``), so a 200-entity mood is fed to the event loop and the radio
+    mesh at a steady rate instead of in a single burst. Calls beyond the
+    limits wait their turn in FIFO order.
+
+    With a sequencer, calls made inside a claimed activation or restore are
+    also ordered per entity against other moods' commands, and entities a
+    newer operation has taken over are dropped from the call.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_in_flight_per_domain: int = DEFAULT_MAX_IN_FLIGHT_PER_DOMAIN,
+        sequencer: EntitySequencer | None = None,
+    ) -> None:
+        """Initialize the dispatcher."""
+        self._hass = hass
+        self._sequencer = sequencer
+        self._max_in_flight = max_in_flight
+        self._max_in_flight_per_domain = max_in_flight_per_domain
+        self._global_slots = asyncio.Semaphore(max_in_flight)
+        self._domain_slots: dict[str, asyncio.Semaphore] = {}
+
+    def set_limits(self, max_in_flight: int, max_in_flight_per_domain: int) -> None:
+        """Change the in-flight limits.
+
+        Calls already holding or waiting for a slot finish under the old
+        limits; later calls use the new ones.
+        """
+        if (max_in_flight, max_in_flight_per_domain) == (
+            self._max_in_flight,
+            self._max_in_flight_per_domain,
+        ):
+            return
+        self._max_in_flight = max_in_flight
+        self._max_in_flight_per_domain = max_in_flight_per_domain
+        self._global_slots = asyncio.Semaphore(max_in_flight)
+        self._domain_slots = {}
+
+    async def async_call(
+        self, domain: str, service: str, service_data: dict[str, Any]
+    ) -> None:
+        """Run one blocking service call once a slot is free. Raises on failure.
+
+        The call's queueing time, latency and outcome are recorded on the
+        timeline of the activation or restore that made it, if any.
+        """
+        if self._sequencer is None:
+            await self._async_call(domain, service, service_data)
+            return
+
+        requested = service_data["entity_id"]
+        entity_ids = [requested] if isinstance(requested, str) else list(requested)
+        owned, done = await self._sequencer.async_acquire(entity_ids)
+        try:
+            if len(owned) < len(entity_ids):
+                record_superseded(
+                    entity_id for entity_id in entity_ids if entity_id not in owned
+                )
+                if not owned:
+                    return
+                service_data = {
+                    **service_data,
+                    "entity_id": owned[0] if isinstance(requested, str) else owned,
+                }
+            await self._async_call(domain, service, service_data)
+        finally:
+            self._sequencer.release(owned, done)
+
+    async def _async_call(
+        self, domain: str, service: str, service_data: dict[str, Any]
+    ) -> None:
+        """Run one blocking service call within the in-flight limits."""
+        domain_slots = self._domain_slots.get(domain)
+        if domain_slots is None:
+            domain_slots = self._domain_slots[domain] = asyncio.Semaphore(
+                self._max_in_flight_per_domain
+            )
+        queued = time.monotonic()
+        # Take the domain slot first so a queued call never holds a global slot
+        async with domain_slots, self._global_slots:
+            started = time.monotonic()
+            error: BaseException | None = None
+            try:
+                await self._hass.services.async_call(
+                    domain, service, service_data, blocking=True
+                )
+            except Exception as err:
+                error = err
+                raise
+            finally:
+                record_call(domain, service, service_data, queued, started, error)
+
+    async def async_call_many(
+        self, calls: Iterable[ServiceCall]
+    ) -> list[BaseException | None]:
+        """Run calls concurrently within the limits.
+
+        Returns one entry per call: None on success, the exception otherwise.
+        """
+        return await asyncio.gather(
+            *(self.async_call(domain, service, data) for domain, service, data in calls),
+            return_exceptions=True,
+        )
+
+
+def async_get_dispatcher(
+    hass: HomeAssistant, options: Mapping[str, Any] | None = None
+) -> ServiceDispatcher:
+    """Return the integration-wide dispatcher, creating it on first use.
+
+    All entries share it, so the in-flight limits hold for the integration
+    as a whole rather than per entry. They come from the options of the
+    entry that creates it; an entry loaded later that sets them explicitly
+    replaces them, so saving new limits on any entry applies them.
+    """
+    options = options or {}
+    limits = (
+        int(options.get(CONF_MAX_IN_FLIGHT, DEFAULT_MAX_IN_FLIGHT)),
+        int(options.get(CONF_MAX_IN_FLIGHT_PER_DOMAIN, DEFAULT_MAX_IN_FLIGHT_PER_DOMAIN)),
+    )
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    dispatcher = domain_data.get(DATA_SERVICE_DISPATCHER)
+    if dispatcher is None:
+        dispatcher = domain_data[DATA_SERVICE_DISPATCHER] = ServiceDispatcher(
+            hass, *limits, sequencer=async_get_sequencer(hass)
+        )
+    elif CONF_MAX_IN_FLIGHT in options or CONF_MAX_IN_FLIGHT_PER_DOMAIN in options:
+        dispatcher.set_limits(*limits)
+    return dispatcher
@@ -2,19 +2,35 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import heapq
 import time
-from collections.abc import Callable
+from collections import Counter
+from collections.abc import Callable, Collection, Iterable, Iterator, Mapping, Sequence
 from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from types import MappingProxyType
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
-    from homeassistant.core import HomeAssistant
+    from homeassistant.core import Event, HomeAssistant, State
 
+    from .activity import Timeline
+    from .match_engine import MatchEngine
+    from .state import CoverState, LightState
+    from .store import MoodLightsStore
+
+from .activity import ActivityLog
 from .const import (
+    CONF_CONVERGE,
+    CONF_CONVERGE_MAX_RETRIES,
+    CONF_CONVERGE_TIMEOUT,
     CONF_COVER_CONFIG,
     CONF_COVER_POSITION,
     CONF_COVER_TILT_POSITION,
     CONF_COVERS,
+    CONF_DELTA_APPLY,
+    CONF_DELTA_RESTORE,
     CONF_LIGHT_BRIGHTNESS,
     CONF_LIGHT_COLOR_TEMP_KELVIN,
     CONF_LIGHT_CONFIG,
@@ -22,16 +38,36 @@ from .const import (
     CONF_LIGHT_POWER,
     CONF_LIGHT_RGB_COLOR,
     CONF_LIGHTS,
+    CONF_MOOD_ID,
     CONF_MOOD_NAME,
+    CONF_RESTORE_BRIGHTNESS_TOLERANCE,
+    CONF_RESTORE_COLOR_TEMP_TOLERANCE,
+    CONF_RESTORE_POSITION_TOLERANCE,
+    CONF_REVERT_AT_TIMESTAMP,
+    CONF_REVERT_COALESCE_WINDOW,
+    CONF_VECTORIZED_MATCH,
+    CONVERGE_INITIAL_BACKOFF_SEC,
+    COUNTDOWN_UPDATE_INTERVAL_SEC,
+    DEFAULT_CONVERGE_MAX_RETRIES,
+    DEFAULT_CONVERGE_TIMEOUT_SEC,
+    DEFAULT_RESTORE_BRIGHTNESS_TOLERANCE,
+    DEFAULT_RESTORE_COLOR_TEMP_TOLERANCE,
+    DEFAULT_RESTORE_POSITION_TOLERANCE,
+    DEFAULT_REVERT_COALESCE_WINDOW_SEC,
     DEFAULT_REVERT_DURATION_MIN,
     LOGGER,
 )
 from .state import DEFAULT_MAX_STATES, StateManager
+from .targets import CoverTarget, LightTarget
 
 
 @dataclass
 class MoodConfig:
-    """Configuration for a mood."""
+    """Configuration for a mood.
+
+    The per-entity match targets are compiled from ``light_config`` and
+    ``cover_config`` when the mood is built in ``MoodManager.load_moods``.
+    """
 
     mood_id: str
     name: str
@@ -39,36 +75,148 @@ class MoodConfig:
     light_config: dict
     covers: list[str] = field(default_factory=list)
     cover_config: dict = field(default_factory=dict)
+    light_targets: Mapping[str, LightTarget] = field(init=False, repr=False)
+    cover_targets: Mapping[str, CoverTarget] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Compile the match targets for every configured entity."""
+        self.light_targets = MappingProxyType(
+            {
+                entity_id: LightTarget.from_config(config)
+                for entity_id, config in self.light_config.items()
+            }
+        )
+        self.cover_targets = MappingProxyType(
+            {
+                entity_id: CoverTarget.from_config(config)
+                for entity_id, config in self.cover_config.items()
+            }
+        )
+
+
+@dataclass(slots=True)
+class _InFlightActivation:
+    """An activation that is still running; later requests for the mood join it."""
+
+    duration: int | None  # auto-revert override of the latest request
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    succeeded: bool = False
 
 
 class MoodManager:
     """Manages all moods and their operations."""
 
     def __init__(
-        self, hass: HomeAssistant, options: dict | None = None
+        self,
+        hass: HomeAssistant,
+        options: dict | None = None,
+        entry_id: str | None = None,
     ) -> None:
-        """Initialize the mood manager."""
+        """Initialize the mood manager.
+
+        Snapshots and pending auto-revert timers are persisted per config
+        entry when an ``entry_id`` is given.
+        """
+        from .dispatch import async_get_dispatcher
+        from .sequencer import async_get_sequencer
+        from .tracker import async_get_tracker
+
         self._hass = hass
         self._moods: dict[str, MoodConfig] = {}
 
+        # Integration-wide entity -> handlers routing, shared by all entries
+        self._tracker = async_get_tracker(hass)
+        self._tracker_unsubs: dict[object, Callable[[], None]] = {}
+
+        self._store: MoodLightsStore | None = None
+        if entry_id is not None:
+            from .store import MoodLightsStore
+
+            self._store = MoodLightsStore(hass, entry_id)
+
         opts = options or {}
+
+        # Integration-wide entity ownership, so moods of all entries that
+        # share lights send their commands in order
+        self._sequencer = async_get_sequencer(hass)
+
+        # Integration-wide, shared by activation and restore of every entry
+        # so all of them respect the same in-flight limits
+        self._dispatcher = async_get_dispatcher(hass, opts)
+
+        # Counts and recent timelines of activations/restores, for diagnostics
+        self._activity = ActivityLog()
+
+        # Skip entities whose live state already matches the mood target
+        self._delta_apply = bool(opts.get(CONF_DELTA_APPLY, False))
+
+        # Active sensors read every mood's match state from one NumPy engine
+        # instead of evaluating their own targets (built in load_moods)
+        self._vectorized_match = bool(opts.get(CONF_VECTORIZED_MATCH, False))
+        self._match_engine: MatchEngine | None = None
+
+        # After an activation, watch the mood's entities and re-send to the
+        # ones that have not reached their target (mood_id -> running loop)
+        self._converge = bool(opts.get(CONF_CONVERGE, False))
+        self._converge_timeout = float(
+            opts.get(CONF_CONVERGE_TIMEOUT, DEFAULT_CONVERGE_TIMEOUT_SEC)
+        )
+        self._converge_max_retries = int(
+            opts.get(CONF_CONVERGE_MAX_RETRIES, DEFAULT_CONVERGE_MAX_RETRIES)
+        )
+        self._convergence: dict[str, tuple[asyncio.Task, frozenset[str]]] = {}
+
+        # Activations still running, per mood_id (see activate_mood)
+        self._activations: dict[str, _InFlightActivation] = {}
+
         max_states = opts.get("max_states") if opts else DEFAULT_MAX_STATES
         self._state_manager = StateManager(
-            hass, max_states=max_states or DEFAULT_MAX_STATES
+            hass,
+            max_states=max_states or DEFAULT_MAX_STATES,
+            store=self._store,
+            dispatcher=self._dispatcher,
+            delta_restore=bool(opts.get(CONF_DELTA_RESTORE, False)),
+            brightness_tolerance=opts.get(
+                CONF_RESTORE_BRIGHTNESS_TOLERANCE, DEFAULT_RESTORE_BRIGHTNESS_TOLERANCE
+            ),
+            color_temp_tolerance=opts.get(
+                CONF_RESTORE_COLOR_TEMP_TOLERANCE, DEFAULT_RESTORE_COLOR_TEMP_TOLERANCE
+            ),
+            position_tolerance=opts.get(
+                CONF_RESTORE_POSITION_TOLERANCE, DEFAULT_RESTORE_POSITION_TOLERANCE
+            ),
         )
 
         # Auto-revert timer state (per mood_id)
         self._auto_revert_enabled: dict[str, bool] = {}
         self._auto_revert_duration: dict[str, int] = {}  # minutes
-        self._revert_timers: dict[str, Callable[[], None]] = {}  # cancel callbacks
         self._revert_deadlines: dict[str, float] = {}  # monotonic deadline
+        self._revert_at: dict[str, datetime] = {}  # wall-clock deadline
+
+        # Single timer for all moods: a min-heap of (deadline, mood_id) with
+        # lazy deletion — entries whose deadline no longer matches
+        # _revert_deadlines are stale and skipped when popped.
+        self._revert_heap: list[tuple[float, str]] = []
+        self._unsub_revert_timer: Callable[[], None] | None = None
+        self._armed_deadline: float | None = None
+        self._revert_coalesce_window = float(
+            opts.get(CONF_REVERT_COALESCE_WINDOW, DEFAULT_REVERT_COALESCE_WINDOW_SEC)
+        )
+
+        # Countdown sensors: one shared ticker that only runs while timers exist
+        self._countdown_as_timestamp = bool(opts.get(CONF_REVERT_AT_TIMESTAMP, False))
+        self._countdown_listeners: dict[str, Callable[[], None]] = {}
+        self._unsub_countdown_ticker: Callable[[], None] | None = None
+
+        # Active sensors: told when an activation or restore has finished
+        self._settled_listeners: dict[str, Callable[[], None]] = {}
 
     async def load_moods(self, config: dict) -> None:
         """Load moods from config."""
         moods_data = config.get("moods", [])
 
         for idx, mood_data in enumerate(moods_data):
-            mood_id = f"mood_{idx}"
+            mood_id = mood_data.get(CONF_MOOD_ID, f"mood_{idx}")
             mood_config = MoodConfig(
                 mood_id=mood_id,
                 name=mood_data.get(CONF_MOOD_NAME, f"Mood {idx + 1}"),
@@ -79,6 +227,40 @@ class MoodManager:
             )
             self._moods[mood_id] = mood_config
 
+        if self._vectorized_match:
+            self._match_engine = self._build_match_engine()
+
+    def _build_match_engine(self) -> MatchEngine | None:
+        """Build the vectorized match engine, fed by the shared tracker.
+
+        Returns None, so sensors evaluate their own targets, without NumPy.
+        """
+        try:
+            from .match_engine import MatchEngine
+        except ImportError:
+            LOGGER.warning(
+                "Vectorized matching needs NumPy, which is not installed; "
+                "evaluating each mood separately"
+            )
+            return None
+
+        engine = MatchEngine(self._moods.values())
+        self._tracker_unsubs[engine] = self._tracker.async_subscribe(
+            engine.entity_ids, engine.async_handle_event
+        )
+        engine.sync(self._hass.states.get)
+        return engine
+
+    @property
+    def hass(self) -> HomeAssistant:
+        """Return the Home Assistant instance the manager runs in."""
+        return self._hass
+
+    @property
+    def match_engine(self) -> MatchEngine | None:
+        """Return the vectorized match engine, if enabled and available."""
+        return self._match_engine
+
     async def activate_mood(self, mood_id: str, preset_name: str = "", duration: int | None = None) -> bool:
         """Activate a mood, saving current light and cover states first.
 
@@ -92,28 +274,199 @@ class MoodManager:
         if not mood_config:
             return False
 
-        # Save current state before activating (lights + covers atomically)
-        self._state_manager.save_current_state(
-            mood_id,
-            preset_name=preset_name or mood_config.name,
-            light_entities=mood_config.lights,
-            cover_entities=mood_config.covers,
-        )
+        # Coalesce with an activation of the same mood that is still running:
+        # it already took the baseline snapshot and is sending the same
+        # commands, so only the auto-revert duration (latest wins) changes.
+        in_flight = self._activations.get(mood_id)
+        if in_flight is not None:
+            in_flight.duration = duration
+            self._activity.count("activate_coalesced", (mood_id,))
+            await in_flight.done.wait()
+            return in_flight.succeeded
 
-        # Apply the mood
-        await self._apply_light_config(mood_config.light_config)
-        await self._apply_cover_config(mood_config.cover_config)
-
-        # Start auto-revert timer if applicable
-        self._schedule_auto_revert(mood_id, duration)
+        activation = self._activations[mood_id] = _InFlightActivation(duration)
+        try:
+            await self._async_activate(mood_config, preset_name)
+            # Start auto-revert timer if applicable
+            self._schedule_auto_revert(mood_id, activation.duration)
+            activation.succeeded = True
+        finally:
+            del self._activations[mood_id]
+            activation.done.set()
 
         return True
 
+    async def _async_activate(self, mood_config: MoodConfig, preset_name: str) -> None:
+        """Snapshot a mood's entities, then send the mood's commands."""
+        mood_id = mood_config.mood_id
+        with self._operation("activate", (mood_id,)) as timeline:
+            await self._state_manager.async_ensure_loaded()
+
+            # Save current state before activating (lights + covers atomically)
+            self._state_manager.save_current_state(
+                mood_id,
+                preset_name=preset_name or mood_config.name,
+                light_entities=mood_config.lights,
+                cover_entities=mood_config.covers,
+            )
+
+            # Apply the mood
+            light_config = mood_config.light_config
+            cover_config = mood_config.cover_config
+            if self._delta_apply:
+                light_config = self._pending_config(light_config, mood_config.light_targets)
+                cover_config = self._pending_config(cover_config, mood_config.cover_targets)
+            # A convergence loop still re-sending an older mood must not fight this one
+            self._cancel_convergence(mood_config)
+            await self._apply_light_config(light_config)
+            await self._apply_cover_config(cover_config)
+            if self._converge and (light_config or cover_config):
+                self._start_convergence(mood_config, light_config, cover_config, timeline)
+
+    async def async_activate_batch(
+        self,
+        mood_ids: Iterable[str],
+        preset_name: str = "",
+        duration: int | None = None,
+        *,
+        states: Mapping[str, State | None] | None = None,
+        skip: Collection[str] = (),
+    ) -> None:
+        """Activate several of this entry's moods as one operation.
+
+        Each mood gets its own baseline snapshot and auto-revert timer, as
+        with ``activate_mood``, but the moods' targets are merged per entity,
+        later moods taking precedence, so an entity shared by several of them
+        is commanded once and identical payloads go out as multi-entity
+        calls. A mood whose activation is already running joins it instead
+        of taking a second baseline.
+
+        Args:
+            mood_ids: The moods to activate, in precedence order.
+            preset_name: Optional label for the saved state snapshots.
+            duration: Optional auto-revert override in minutes.
+            states: Entity states to take the baselines from, instead of
+                reading the state machine.
+            skip: Entities to snapshot but not command, because another
+                entry's mood in the same batch commands them.
+        """
+        ordered: dict[str, None] = {}
+        for mood_id in mood_ids:
+            if mood_id in self._moods:
+                ordered.pop(mood_id, None)
+                ordered[mood_id] = None
+
+        # (mood, activation); activation is None for a joined mood
+        resolved: list[tuple[MoodConfig, _InFlightActivation | None]] = []
+        joined: list[_InFlightActivation] = []
+        for mood_id in ordered:
+            in_flight = self._activations.get(mood_id)
+            if in_flight is not None:
+                in_flight.duration = duration
+                self._activity.count("activate_coalesced", (mood_id,))
+                joined.append(in_flight)
+                resolved.append((self._moods[mood_id], None))
+            else:
+                activation = self._activations[mood_id] = _InFlightActivation(duration)
+                resolved.append((self._moods[mood_id], activation))
+        batch = [item for item in resolved if item[1] is not None]
+
+        try:
+            if batch:
+                await self._async_activate_batch(resolved, preset_name, states, skip)
+                for mood_config, activation in batch:
+                    self._schedule_auto_revert(mood_config.mood_id, activation.duration)
+                    activation.succeeded = True
+        finally:
+            for mood_config, activation in batch:
+                del self._activations[mood_config.mood_id]
+                activation.done.set()
+
+        for in_flight in joined:
+            await in_flight.done.wait()
+
+    async def _async_activate_batch(
+        self,
+        resolved: list[tuple[MoodConfig, _InFlightActivation | None]],
+        preset_name: str,
+        states: Mapping[str, State | None] | None,
+        skip: Collection[str],
+    ) -> None:
+        """Snapshot the batch's moods, then send their merged commands."""
+        # The batch commands every entity of its moods, except those a later,
+        # already running activation or another entry is commanding
+        claimed: dict[str, None] = {}
+        for mood_config, activation in resolved:
+            for entity_id in (*mood_config.lights, *mood_config.covers):
+                claimed.pop(entity_id, None)
+                if activation is not None and entity_id not in skip:
+                    claimed[entity_id] = None
+        mood_ids = [
+            mood_config.mood_id
+            for mood_config, activation in resolved
+            if activation is not None
+        ]
+
+        with self._operation("activate", mood_ids, claimed):
+            await self._state_manager.async_ensure_loaded()
+
+            if states is None:
+                # One pass over the state machine for every baseline
+                get_state = self._hass.states.get
+                states = {
+                    entity_id: get_state(entity_id)
+                    for entity_id in dict.fromkeys(
+                        entity_id
+                        for mood_config, activation in resolved
+                        if activation is not None
+                        for entity_id in (*mood_config.lights, *mood_config.covers)
+                    )
+                }
+            records: dict[str, LightState | CoverState] = {}
+
+            light_config: dict[str, dict] = {}
+            cover_config: dict[str, dict] = {}
+            for mood_config, activation in resolved:
+                if activation is not None:
+                    self._state_manager.save_current_state(
+                        mood_config.mood_id,
+                        preset_name=preset_name or mood_config.name,
+                        light_entities=mood_config.lights,
+                        cover_entities=mood_config.covers,
+                        states=states,
+                        records=records,
+                    )
+                    self._cancel_convergence(mood_config)
+
+                for config, merged, targets in (
+                    (mood_config.light_config, light_config, mood_config.light_targets),
+                    (mood_config.cover_config, cover_config, mood_config.cover_targets),
+                ):
+                    for entity_id, entity_config in config.items():
+                        merged.pop(entity_id, None)
+                        if (
+                            activation is None
+                            or entity_id in skip
+                            or (
+                                self._delta_apply
+                                and targets[entity_id].matches(states.get(entity_id))
+                            )
+                        ):
+                            continue
+                        merged[entity_id] = entity_config
+
+            await self._apply_light_config(light_config)
+            await self._apply_cover_config(cover_config)
+
     async def restore_previous(self, mood_id: str) -> bool:
         """Restore the previous state for a mood."""
         # Cancel any active auto-revert timer (avoid double revert)
         self.cancel_auto_revert(mood_id)
-        return await self._state_manager.restore_previous(mood_id)
+        if (mood_config := self._moods.get(mood_id)) is not None:
+            self._cancel_convergence(mood_config)
+        await self._state_manager.async_ensure_loaded()
+        with self._operation("restore", (mood_id,), self._snapshot_entity_ids((mood_id,))):
+            return await self._state_manager.restore_previous(mood_id)
 
     async def save_state(self, mood_id: str, preset_name: str = "") -> bool:
         """Manually save the current state of lights and covers for a mood."""
@@ -121,6 +474,7 @@ class MoodManager:
         if not mood_config:
             return False
 
+        await self._state_manager.async_ensure_loaded()
         result = self._state_manager.save_current_state(
             mood_id,
             preset_name=preset_name,
@@ -129,110 +483,305 @@ class MoodManager:
         )
         return result is not None
 
+    async def save_all_states(self, preset_name: str = "") -> int:
+        """Save the current state of every mood. Returns the moods saved."""
+        return await async_save_all_states((self,), preset_name)
+
+    @contextlib.contextmanager
+    def _operation(
+        self,
+        kind: str,
+        mood_ids: Iterable[str],
+        entity_ids: Iterable[str] | None = None,
+    ) -> Iterator[Timeline]:
+        """Run an activation or restore: record it and claim its moods' entities.
+
+        Claiming makes this the newest owner of every light and cover of the
+        moods (or of ``entity_ids``, when given), so commands still queued by
+        older operations on them are dropped and the dispatcher sends this
+        operation's commands in order behind any already in flight.
+        """
+        mood_ids = tuple(mood_ids)
+        if entity_ids is None:
+            entity_ids = [
+                entity_id
+                for mood_id in mood_ids
+                if (mood_config := self._moods.get(mood_id)) is not None
+                for entity_id in (*mood_config.lights, *mood_config.covers)
+            ]
+        try:
+            with (
+                self._activity.track(kind, mood_ids) as timeline,
+                self._sequencer.claim(entity_ids),
+            ):
+                yield timeline
+        finally:
+            for mood_id in mood_ids:
+                self._async_mood_settled(mood_id)
+
+    def _snapshot_entity_ids(self, mood_ids: Iterable[str]) -> list[str]:
+        """Return the entities a restore of the moods' latest snapshots commands.
+
+        A restore claims these rather than the moods' current lights and
+        covers, which may no longer include everything in the snapshot.
+        """
+        return [
+            record.entity_id
+            for mood_id in mood_ids
+            if (mood_state := self._state_manager.get_previous_state(mood_id)) is not None
+            for record in (*mood_state.light_states, *mood_state.cover_states)
+        ]
+
     def can_restore(self, mood_id: str) -> bool:
         """Check if a mood can be restored."""
         return self._state_manager.can_restore(mood_id)
 
-    def get_all_moods(self) -> dict[str, MoodConfig]:
-        """Get all mood configurations."""
-        return self._moods.copy()
+    def get_all_moods(self) -> Mapping[str, MoodConfig]:
+        """Get a read-only view of all mood configurations."""
+        return MappingProxyType(self._moods)
+
+    def get_mood(self, mood_id: str) -> MoodConfig | None:
+        """Get a mood config by its identifier."""
+        return self._moods.get(mood_id)
+
+    def async_track_mood_entities(
+        self, mood_id: str, handler: Callable[[Event], None]
+    ) -> Callable[[], None]:
+        """Route state changes of a mood's lights and covers to a handler.
+
+        Subscriptions go through the shared entity tracker, so an entity used
+        by many moods still has a single state-change listener. Returns a
+        callback that removes the handler.
+        """
+        mood_config = self._moods[mood_id]
+        entity_ids = [*mood_config.light_config, *mood_config.cover_config]
+        unsub = self._tracker.async_subscribe(entity_ids, handler)
 
-    def get_mood_by_name(self, name: str) -> MoodConfig | None:
-        """Get a mood config by its display name (case-insensitive)."""
-        name_lower = name.lower()
-        for mood in self._moods.values():
-            if mood.name.lower() == name_lower:
-                return mood
-        return None
+        token = object()
+        self._tracker_unsubs[token] = unsub
+
+        def _unsubscribe() -> None:
+            if self._tracker_unsubs.pop(token, None) is not None:
+                unsub()
+
+        return _unsubscribe
+
+    def _pending_config(
+        self, config: dict, targets: Mapping[str, LightTarget | CoverTarget]
+    ) -> dict:
+        """Return the part of a light/cover config not yet at its target.
+
+        Uses the same compiled targets as the Active binary sensor, so an
+        entity is skipped exactly when the sensor would call it matching.
+        """
+        get_state = self._hass.states.get
+        return {
+            entity_id: entity_config
+            for entity_id, entity_config in config.items()
+            if not targets[entity_id].matches(get_state(entity_id))
+        }
 
     async def _apply_light_config(self, light_config: dict) -> None:
-        """Apply light configuration to all lights in parallel."""
-        tasks = []
+        """Apply light configuration to all lights in parallel.
 
+        Lights whose service data is identical are sent as one call with a
+        list ``entity_id``.
+        """
+        calls = []
         for entity_id, config in light_config.items():
-            power = config.get(CONF_LIGHT_POWER, True)
+            service, service_data = _light_service_call(config)
+            calls.append(("light", service, entity_id, service_data))
 
-            if power is False:
-                tasks.append(
-                    self._hass.services.async_call(
-                        "light", "turn_off", {"entity_id": entity_id}, blocking=True
-                    )
-                )
-            else:
-                service_data: dict[str, Any] = {"entity_id": entity_id}
-
-                brightness = config.get(CONF_LIGHT_BRIGHTNESS)
-                if brightness is not None:
-                    service_data["brightness_pct"] = brightness
-
-                effect = config.get(CONF_LIGHT_EFFECT)
-                if effect is not None:
-                    # Effect takes priority — apply it and skip colour settings
-                    service_data["effect"] = effect
-                else:
-                    # Colour temperature takes priority over RGB
-                    color_temp_kelvin = config.get(CONF_LIGHT_COLOR_TEMP_KELVIN)
-                    rgb_color = config.get(CONF_LIGHT_RGB_COLOR)
-
-                    if color_temp_kelvin is not None:
-                        service_data["color_temp_kelvin"] = color_temp_kelvin
-                    elif rgb_color is not None:
-                        service_data["rgb_color"] = rgb_color
-
-                tasks.append(
-                    self._hass.services.async_call(
-                        "light", "turn_on", service_data, blocking=True
-                    )
-                )
-
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        await self._async_call_batched(calls)
 
     async def _apply_cover_config(self, cover_config: dict) -> None:
-        """Apply cover configuration to all covers in parallel."""
+        """Apply cover configuration to all covers in parallel.
+
+        Covers sharing a target position (or tilt) are sent as one call.
+        """
         if not cover_config:
             return
 
-        tasks = []
-
+        calls = []
         for entity_id, config in cover_config.items():
             position = config.get(CONF_COVER_POSITION)
             tilt_position = config.get(CONF_COVER_TILT_POSITION)
 
             if position is not None:
-                tasks.append(
-                    self._hass.services.async_call(
-                        "cover",
-                        "set_cover_position",
-                        {"entity_id": entity_id, "position": position},
-                        blocking=True,
-                    )
+                calls.append(
+                    ("cover", "set_cover_position", entity_id, {"position": position})
                 )
 
             if tilt_position is not None:
-                tasks.append(
-                    self._hass.services.async_call(
+                calls.append(
+                    (
                         "cover",
                         "set_cover_tilt_position",
-                        {"entity_id": entity_id, "tilt_position": tilt_position},
-                        blocking=True,
+                        entity_id,
+                        {"tilt_position": tilt_position},
                     )
                 )
 
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        await self._async_call_batched(calls)
+
+    # ------------------------------------------------------------------
+    # Convergence
+    # ------------------------------------------------------------------
+
+    def _start_convergence(
+        self,
+        mood_config: MoodConfig,
+        light_config: dict,
+        cover_config: dict,
+        timeline: Timeline,
+    ) -> None:
+        """Start verifying an activation in the background."""
+        task = self._hass.async_create_background_task(
+            self._async_converge(mood_config, light_config, cover_config, timeline),
+            f"moodlights converge {mood_config.mood_id}",
+        )
+        self._convergence[mood_config.mood_id] = (
+            task,
+            frozenset((*light_config, *cover_config)),
+        )
+
+    def _cancel_convergence(self, mood_config: MoodConfig) -> None:
+        """Stop convergence loops that would re-send to any of a mood's entities."""
+        entity_ids = mood_config.light_targets.keys() | mood_config.cover_targets.keys()
+        for mood_id, (task, watched) in list(self._convergence.items()):
+            if not watched.isdisjoint(entity_ids):
+                task.cancel()
+                del self._convergence[mood_id]
+
+    async def _async_converge(
+        self,
+        mood_config: MoodConfig,
+        light_config: dict,
+        cover_config: dict,
+        timeline: Timeline,
+    ) -> None:
+        """Re-send commands to entities that miss their target until a deadline.
+
+        Entities are watched through the shared tracker and drop out as soon
+        as a state event shows them at target. Whatever is still mismatched
+        when a backoff period ends (1s, 2s, 4s, ...) gets its command again,
+        up to the configured number of retries. The outcome is recorded on
+        the activation's timeline.
+        """
+        mood_id = mood_config.mood_id
+        started = time.monotonic()
+        deadline = started + self._converge_timeout
+        light_targets = mood_config.light_targets
+        cover_targets = mood_config.cover_targets
+        pending_lights = self._pending_config(light_config, light_targets)
+        pending_covers = self._pending_config(cover_config, cover_targets)
+        settled = asyncio.Event()
+        resent: Counter[str] = Counter()
+
+        def _on_state_change(event: Event) -> None:
+            entity_id = event.data["entity_id"]
+            new_state = event.data.get("new_state")
+            if entity_id in pending_lights and light_targets[entity_id].matches(new_state):
+                del pending_lights[entity_id]
+            elif entity_id in pending_covers and cover_targets[entity_id].matches(new_state):
+                del pending_covers[entity_id]
+            if not pending_lights and not pending_covers:
+                settled.set()
+
+        unsub = self._tracker.async_subscribe(
+            (*pending_lights, *pending_covers), _on_state_change
+        )
+        status = "converged"
+        retries = 0
+        backoff = CONVERGE_INITIAL_BACKOFF_SEC
+        try:
+            while pending_lights or pending_covers:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    status = "timed_out"
+                    break
+                exhausted = retries >= self._converge_max_retries
+                # Once retries are used up, keep listening until the deadline
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(
+                        settled.wait(), remaining if exhausted else min(backoff, remaining)
+                    )
+                if settled.is_set() or exhausted:
+                    continue
+
+                retries += 1
+                backoff *= 2
+                resent.update(pending_lights.keys())
+                resent.update(pending_covers.keys())
+                await self._apply_light_config(dict(pending_lights))
+                await self._apply_cover_config(dict(pending_covers))
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        finally:
+            unsub()
+            if self._convergence.get(mood_id, (None,))[0] is asyncio.current_task():
+                del self._convergence[mood_id]
+            laggards = sorted((*pending_lights, *pending_covers))
+            timeline.convergence = {
+                "status": status,
+                "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+                "retries": retries,
+                "resent": dict(resent),
+                "laggards": laggards,
+            }
+            if status == "timed_out":
+                LOGGER.warning(
+                    "Mood '%s': %s did not reach their target after %d retries",
+                    mood_id,
+                    ", ".join(laggards),
+                    retries,
+                )
+            elif status == "converged":
+                LOGGER.debug(
+                    "Mood '%s' converged in %.1fs with %d retries",
+                    mood_id,
+                    time.monotonic() - started,
+                    retries,
+                )
+
+    async def _async_call_batched(
+        self, calls: list[tuple[str, str, str, dict[str, Any]]]
+    ) -> None:
+        """Run per-entity service calls, merging identical payloads."""
+        if not calls:
+            return
+        batched = _batch_service_calls(calls)
+        results = await self._dispatcher.async_call_many(batched)
+        for (domain, service, service_data), result in zip(batched, results, strict=True):
+            if result is not None:
+                LOGGER.warning(
+                    "%s.%s failed for %s: %s",
+                    domain,
+                    service,
+                    service_data["entity_id"],
+                    result,
+                )
 
     # ------------------------------------------------------------------
     # Auto-revert timer management
     # ------------------------------------------------------------------
 
-    def set_auto_revert_enabled(self, mood_id: str, enabled: bool) -> None:
+    async def set_auto_revert_enabled(self, mood_id: str, enabled: bool) -> None:
         """Set whether auto-revert is enabled for a mood (called by switch entity)."""
+        previous = self._auto_revert_enabled.get(mood_id)
         self._auto_revert_enabled[mood_id] = enabled
+        if previous is None:
+            # Initial sync from the restored switch — keep a timer resumed from
+            # storage, and don't start one (or load the snapshots) at startup
+            return
         if not enabled:
             # Disable: cancel any running timer immediately
             self.cancel_auto_revert(mood_id)
-        elif enabled and self._state_manager.can_restore(mood_id):
+            return
+        # Saved states may still be on disk — load them before checking
+        await self._state_manager.async_ensure_loaded()
+        if self._state_manager.can_restore(mood_id):
             # Enable while mood is already active (has saved state) — start timer now
             self._schedule_auto_revert(mood_id)
 
@@ -256,6 +805,10 @@ class MoodManager:
         remaining = deadline - time.monotonic()
         return max(0.0, remaining)
 
+    def get_auto_revert_at(self, mood_id: str) -> datetime | None:
+        """Get the wall-clock time of the pending auto-revert, or None."""
+        return self._revert_at.get(mood_id)
+
     def is_timer_active(self, mood_id: str) -> bool:
         """Check if an auto-revert timer is currently running."""
         return mood_id in self._revert_deadlines
@@ -265,12 +818,12 @@ class MoodManager:
 
         Returns True if a timer was cancelled, False if none was active.
         """
-        cancel_cb = self._revert_timers.pop(mood_id, None)
-        self._revert_deadlines.pop(mood_id, None)
-        if cancel_cb is not None:
-            cancel_cb()
-            return True
-        return False
+        if mood_id not in self._revert_deadlines:
+            return False
+        # The heap entry goes stale and is discarded lazily
+        self._clear_revert_deadline(mood_id)
+        self._arm_revert_timer()
+        return True
 
     def _schedule_auto_revert(self, mood_id: str, duration_override: int | None = None) -> None:
         """Schedule an auto-revert timer for a mood.
@@ -280,8 +833,6 @@ class MoodManager:
             duration_override: Override duration in minutes. If None, uses the
                                mood's switch/number entity state.
         """
-        from homeassistant.helpers.event import async_call_later
-
         # Cancel any existing timer for this mood
         self.cancel_auto_revert(mood_id)
 
@@ -294,47 +845,400 @@ class MoodManager:
             # Auto-revert not enabled and no override — do nothing
             return
 
-        delay_seconds = duration_min * 60
-
-        # Schedule the callback
-        cancel = async_call_later(
-            self._hass, delay_seconds, self._make_revert_callback(mood_id)
-        )
-
-        self._revert_timers[mood_id] = cancel
-        self._revert_deadlines[mood_id] = time.monotonic() + delay_seconds
+        self._start_revert_timer(mood_id, duration_min * 60)
         LOGGER.debug(
             "Auto-revert timer scheduled for mood '%s' in %d minutes",
             mood_id,
             duration_min,
         )
 
-    def _make_revert_callback(self, mood_id: str):
-        """Create a callback for async_call_later that reverts a mood."""
+    def _start_revert_timer(self, mood_id: str, delay_seconds: float) -> None:
+        """Push a revert deadline onto the scheduler."""
+        from homeassistant.util import dt as dt_util
+
+        deadline = time.monotonic() + delay_seconds
+
+        self._revert_deadlines[mood_id] = deadline
+        self._revert_at[mood_id] = dt_util.utcnow() + timedelta(seconds=delay_seconds)
+        heapq.heappush(self._revert_heap, (deadline, mood_id))
+        self._arm_revert_timer()
+        self._async_countdown_changed(mood_id)
+        self._async_schedule_save_timers()
+
+    async def async_restore_timers(self) -> None:
+        """Resume auto-revert timers persisted before a restart.
+
+        Only the small timer file is read here; the snapshots a revert needs
+        are loaded lazily when it fires. Deadlines that passed while Home
+        Assistant was down fire right away.
+        """
+        from homeassistant.util import dt as dt_util
+
+        if self._store is None:
+            return
+        now = dt_util.utcnow().timestamp()
+        for mood_id, revert_at in (await self._store.async_load_timers()).items():
+            if mood_id in self._moods and mood_id not in self._revert_deadlines:
+                self._start_revert_timer(mood_id, max(0.0, revert_at - now))
+
+    def _async_schedule_save_timers(self) -> None:
+        """Schedule a debounced write of the wall-clock revert deadlines."""
+        if self._store is not None:
+            self._store.async_delay_save_timers(self._timers_as_json)
+
+    def _timers_as_json(self) -> dict[str, float]:
+        """Serialize pending deadlines as POSIX timestamps."""
+        return {
+            mood_id: revert_at.timestamp()
+            for mood_id, revert_at in self._revert_at.items()
+        }
+
+    def _is_live_revert(self, deadline: float, mood_id: str) -> bool:
+        """Return True if a heap entry still matches the mood's deadline."""
+        return self._revert_deadlines.get(mood_id) == deadline
+
+    def _arm_revert_timer(self) -> None:
+        """Arm the single revert timer for the earliest live deadline."""
+        from homeassistant.helpers.event import async_call_later
 
-        async def _revert_callback(_now) -> None:
-            """Revert the mood when the timer fires."""
-            # Clean up timer tracking
-            self._revert_timers.pop(mood_id, None)
-            self._revert_deadlines.pop(mood_id, None)
+        heap = self._revert_heap
+        while heap and not self._is_live_revert(*heap[0]):
+            heapq.heappop(heap)
+        # Compact when cancellations leave the heap mostly stale
+        if len(heap) > 2 * len(self._revert_deadlines) + 16:
+            self._revert_heap = heap = [
+                entry for entry in heap if self._is_live_revert(*entry)
+            ]
+            heapq.heapify(heap)
 
-            # Restore the previous state
-            success = await self._state_manager.restore_previous(mood_id)
-            if success:
+        next_deadline = heap[0][0] if heap else None
+        if next_deadline == self._armed_deadline:
+            return
+
+        if self._unsub_revert_timer is not None:
+            self._unsub_revert_timer()
+            self._unsub_revert_timer = None
+        self._armed_deadline = next_deadline
+        if next_deadline is not None:
+            self._unsub_revert_timer = async_call_later(
+                self._hass,
+                max(0.0, next_deadline - time.monotonic()),
+                self._async_revert_timer_fired,
+            )
+
+    async def _async_revert_timer_fired(self, _now) -> None:
+        """Revert every mood due within the coalescing window in one dispatch."""
+        self._unsub_revert_timer = None
+        self._armed_deadline = None
+
+        horizon = time.monotonic() + self._revert_coalesce_window
+        due: list[str] = []
+        heap = self._revert_heap
+        while heap and heap[0][0] <= horizon:
+            deadline, mood_id = heapq.heappop(heap)
+            if self._is_live_revert(deadline, mood_id):
+                due.append(mood_id)
+                self._clear_revert_deadline(mood_id)
+        self._arm_revert_timer()
+
+        if not due:
+            return
+
+        for mood_id in due:
+            if (mood_config := self._moods.get(mood_id)) is not None:
+                self._cancel_convergence(mood_config)
+        await self._state_manager.async_ensure_loaded()
+        with self._operation("auto_revert", due, self._snapshot_entity_ids(due)):
+            restored = await self._state_manager.restore_previous_many(due)
+        for mood_id in due:
+            if mood_id in restored:
                 LOGGER.info("Auto-reverted mood '%s'", mood_id)
             else:
                 LOGGER.warning(
                     "Auto-revert for mood '%s' failed: no saved state", mood_id
                 )
 
-        return _revert_callback
+    def _clear_revert_deadline(self, mood_id: str) -> None:
+        """Forget a mood's revert deadline and refresh its countdown."""
+        if self._revert_deadlines.pop(mood_id, None) is None:
+            return
+        self._revert_at.pop(mood_id, None)
+        self._async_countdown_changed(mood_id)
+        self._async_schedule_save_timers()
 
     # ------------------------------------------------------------------
+    # Countdown sensor updates
+    # ------------------------------------------------------------------
+
+    @property
+    def countdown_as_timestamp(self) -> bool:
+        """Return True if countdown sensors expose a revert_at timestamp."""
+        return self._countdown_as_timestamp
+
+    def async_add_countdown_listener(
+        self, mood_id: str, update_callback: Callable[[], None]
+    ) -> Callable[[], None]:
+        """Register a countdown sensor's state-write callback.
+
+        The callback runs when the mood's timer starts or stops and, unless
+        timestamps are exposed, on every shared tick while the timer runs.
+        Returns a callback that removes the listener.
+        """
+        self._countdown_listeners[mood_id] = update_callback
+
+        def _remove() -> None:
+            if self._countdown_listeners.get(mood_id) is update_callback:
+                del self._countdown_listeners[mood_id]
+
+        return _remove
+
+    def _async_countdown_changed(self, mood_id: str) -> None:
+        """Push a timer start/stop to the sensor and start/stop the ticker."""
+        if (update_callback := self._countdown_listeners.get(mood_id)) is not None:
+            update_callback()
+
+        if self._countdown_as_timestamp:
+            return
+        if self._revert_deadlines and self._unsub_countdown_ticker is None:
+            from homeassistant.core import callback
+            from homeassistant.helpers.event import async_track_time_interval
+
+            @callback
+            def _tick(_now) -> None:
+                self._async_countdown_tick()
+
+            self._unsub_countdown_ticker = async_track_time_interval(
+                self._hass, _tick, timedelta(seconds=COUNTDOWN_UPDATE_INTERVAL_SEC)
+            )
+        elif not self._revert_deadlines and self._unsub_countdown_ticker is not None:
+            self._unsub_countdown_ticker()
+            self._unsub_countdown_ticker = None
+
+    def _async_countdown_tick(self) -> None:
+        """Refresh the countdown sensors of moods with a live timer."""
+        for mood_id in self._revert_deadlines:
+            if (update_callback := self._countdown_listeners.get(mood_id)) is not None:
+                update_callback()
+
+    def async_add_settled_listener(
+        self, mood_id: str, settled_callback: Callable[[], None]
+    ) -> Callable[[], None]:
+        """Register a callback for when an operation on the mood finishes.
+
+        Runs after each activation, restore or auto-revert of the mood has
+        sent its commands. Returns a callback that removes the listener.
+        """
+        self._settled_listeners[mood_id] = settled_callback
+
+        def _remove() -> None:
+            if self._settled_listeners.get(mood_id) is settled_callback:
+                del self._settled_listeners[mood_id]
+
+        return _remove
+
+    def _async_mood_settled(self, mood_id: str) -> None:
+        """Tell the mood's listener that an operation on it has finished."""
+        if (settled_callback := self._settled_listeners.get(mood_id)) is not None:
+            settled_callback()
+
+    # ------------------------------------------------------------------
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        """Return activity, snapshot and timer data for the diagnostics dump."""
+        return {
+            "moods": {
+                mood_id: {
+                    "name": mood.name,
+                    "lights": len(mood.lights),
+                    "covers": len(mood.covers),
+                }
+                for mood_id, mood in self._moods.items()
+            },
+            "activity": self._activity.as_dict(),
+            "snapshots": self._state_manager.get_snapshot_footprint(),
+            "timers": {
+                mood_id: {
+                    "revert_at": revert_at.isoformat(),
+                    "remaining_s": round(self.get_auto_revert_remaining(mood_id) or 0, 1),
+                }
+                for mood_id, revert_at in self._revert_at.items()
+            },
+        }
 
     async def async_unload(self) -> None:
         """Unload the manager."""
+        # Flush pending writes first: unloading is not a reason to forget
+        # snapshots or timers, which resume when the entry is set up again.
+        store, self._store = self._store, None
+        if store is not None:
+            await store.async_save_timers(self._timers_as_json())
+        await self._state_manager.async_close()
+
+        for task, _watched in self._convergence.values():
+            task.cancel()
+        self._convergence.clear()
+
         # Cancel all active auto-revert timers
-        for mood_id in list(self._revert_timers):
+        for mood_id in list(self._revert_deadlines):
             self.cancel_auto_revert(mood_id)
+        self._countdown_listeners.clear()
+        self._settled_listeners.clear()
+        # Drop any entity routing still held for this entry's moods
+        for unsub in list(self._tracker_unsubs.values()):
+            unsub()
+        self._tracker_unsubs.clear()
+        self._match_engine = None
         self._state_manager.clear_all_states()
         self._moods.clear()
+
+
+async def async_activate_moods(
+    moods: Sequence[tuple[MoodManager, str]],
+    preset_name: str = "",
+    duration: int | None = None,
+) -> None:
+    """Activate several moods, possibly of different entries, as one operation.
+
+    The moods are grouped by entry and each entry activates its own with
+    ``MoodManager.async_activate_batch``, concurrently. Every baseline is
+    taken from a single read of each entity's state made before any
+    command is sent. An entity shared by several moods is commanded once,
+    with the target of the last of them in ``moods``; the other entries
+    leave it alone.
+    """
+    by_manager: dict[MoodManager, dict[str, None]] = {}
+    owners: dict[str, MoodManager] = {}  # entity_id -> entry of its last mood
+    for manager, mood_id in moods:
+        if (mood_config := manager.get_mood(mood_id)) is None:
+            continue
+        # Later duplicates win their position, matching the merge precedence
+        mood_ids = by_manager.setdefault(manager, {})
+        mood_ids.pop(mood_id, None)
+        mood_ids[mood_id] = None
+        for entity_id in (*mood_config.lights, *mood_config.covers):
+            owners[entity_id] = manager
+    if not by_manager:
+        return
+
+    get_state = next(iter(by_manager)).hass.states.get
+    states = {entity_id: get_state(entity_id) for entity_id in owners}
+    await asyncio.gather(
+        *(
+            manager.async_activate_batch(
+                mood_ids,
+                preset_name,
+                duration,
+                states=states,
+                skip={
+                    entity_id
+                    for entity_id, owner in owners.items()
+                    if owner is not manager
+                },
+            )
+            for manager, mood_ids in by_manager.items()
+        )
+    )
+
+
+async def async_save_all_states(
+    managers: Iterable[MoodManager], preset_name: str = ""
+) -> int:
+    """Snapshot every mood of the given managers from one state-machine pass.
+
+    Each distinct entity is read once, and a light or cover shared by
+    several moods is stored as a single record that all of their snapshots
+    reference. Returns the number of moods a snapshot was saved for.
+    """
+    managers = list(dict.fromkeys(managers))
+    if not managers:
+        return 0
+    for manager in managers:
+        await manager._state_manager.async_ensure_loaded()
+
+    moods = [
+        (manager, mood_config)
+        for manager in managers
+        for mood_config in manager._moods.values()
+    ]
+    get_state = managers[0]._hass.states.get
+    entity_ids = dict.fromkeys(
+        entity_id
+        for _manager, mood_config in moods
+        for entity_id in (*mood_config.lights, *mood_config.covers)
+    )
+    live = {entity_id: get_state(entity_id) for entity_id in entity_ids}
+    records: dict[str, LightState | CoverState] = {}
+    saved = 0
+    for manager, mood_config in moods:
+        mood_state = manager._state_manager.save_current_state(
+            mood_config.mood_id,
+            preset_name=preset_name,
+            light_entities=mood_config.lights,
+            cover_entities=mood_config.covers,
+            states=live,
+            records=records,
+        )
+        if mood_state is not None:
+            saved += 1
+    return saved
+
+
+def _light_service_call(config: dict) -> tuple[str, dict[str, Any]]:
+    """Return the light service and data (without entity_id) for a light config."""
+    power = config.get(CONF_LIGHT_POWER, True)
+    if power is False:
+        return "turn_off", {}
+
+    service_data: dict[str, Any] = {}
+
+    brightness = config.get(CONF_LIGHT_BRIGHTNESS)
+    if brightness is not None:
+        service_data["brightness_pct"] = brightness
+
+    effect = config.get(CONF_LIGHT_EFFECT)
+    if effect is not None:
+        # Effect takes priority — apply it and skip colour settings
+        service_data["effect"] = effect
+    else:
+        # Colour temperature takes priority over RGB
+        color_temp_kelvin = config.get(CONF_LIGHT_COLOR_TEMP_KELVIN)
+        rgb_color = config.get(CONF_LIGHT_RGB_COLOR)
+
+        if color_temp_kelvin is not None:
+            service_data["color_temp_kelvin"] = color_temp_kelvin
+        elif rgb_color is not None:
+            service_data["rgb_color"] = rgb_color
+
+    return "turn_on", service_data
+
+
+def _batch_service_calls(
+    calls: list[tuple[str, str, str, dict[str, Any]]],
+) -> list[tuple[str, str, dict[str, Any]]]:
+    """Group (domain, service, entity_id, data) calls with identical data.
+
+    Returns one (domain, service, data) call per group, with ``entity_id``
+    set to the list of grouped entities, in first-seen order.
+    """
+    groups: dict[tuple, tuple[str, str, dict[str, Any], list[str]]] = {}
+    for domain, service, entity_id, service_data in calls:
+        key = (
+            domain,
+            service,
+            tuple(
+                sorted(
+                    (attr, tuple(value) if isinstance(value, list) else value)
+                    for attr, value in service_data.items()
+                )
+            ),
+        )
+        group = groups.get(key)
+        if group is None:
+            groups[key] = (domain, service, service_data, [entity_id])
+        else:
+            group[3].append(entity_id)
+
+    return [
+        (domain, service, {"entity_id": entity_ids, **service_data})
+        for domain, service, service_data, entity_ids in groups.values()
+    ]
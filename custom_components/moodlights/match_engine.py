@@ -0,0 +1,244 @@
+"""Vectorized mood matching for MoodLights (optional, needs NumPy).
+
+Targets form a moods x entities x features matrix with NaN meaning "don't
+care". It is stored by its non-empty (mood, entity) cells, grouped by
+mood, because a mood uses only a few of the house's entities. Next to it
+sits one current-state row per entity, which state events overwrite in
+place. The mismatch flags of every cell of every mood are then recomputed
+together in a single array pass, and only when a state has changed since
+the last pass.
+
+The rules are the same as ``LightTarget.matches``/``CoverTarget.matches``:
+unavailable entities never match, an off light only has its power compared,
+and cover positions match inside their tolerance windows.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from itertools import compress
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .targets import UNMATCHABLE_STATES
+
+if TYPE_CHECKING:
+    from homeassistant.core import Event, State
+
+    from .manager import MoodConfig
+    from .targets import LightTarget
+
+# Light feature columns: power, brightness, effect, colour temp, then RGB
+_POWER = 0
+_LIGHT_FEATURES = 7
+_COVER_FEATURES = 2  # position, tilt position
+
+_NO_RGB = (np.nan, np.nan, np.nan)
+
+
+def _number(value: float | None) -> float:
+    """Return a value as a float, NaN for None."""
+    return np.nan if value is None else float(value)
+
+
+def _rgb(value) -> tuple[float, float, float]:
+    """Return an RGB triple as floats, NaN for a missing or malformed one."""
+    if value is None or len(value) != 3:
+        return _NO_RGB
+    return (float(value[0]), float(value[1]), float(value[2]))
+
+
+def _power(state: str | None) -> float:
+    """Return 1 for on, 0 for off and NaN for anything else."""
+    if state == "on":
+        return 1.0
+    if state == "off":
+        return 0.0
+    return np.nan
+
+
+class MatchEngine:
+    """Match state of every mood of a manager, kept as NumPy arrays."""
+
+    def __init__(self, moods: Iterable[MoodConfig]) -> None:
+        """Lay out the compiled targets of the moods."""
+        moods = list(moods)
+        self._lights = list(
+            dict.fromkeys(entity_id for mood in moods for entity_id in mood.light_targets)
+        )
+        self._covers = list(
+            dict.fromkeys(entity_id for mood in moods for entity_id in mood.cover_targets)
+        )
+        self._light_columns = {entity_id: col for col, entity_id in enumerate(self._lights)}
+        self._cover_columns = {entity_id: col for col, entity_id in enumerate(self._covers)}
+        # Effects are compared as codes; states can bring effects no mood uses
+        self._effect_codes: dict[str, float] = {}
+
+        # One cell per (mood, entity) pair, a mood's cells kept contiguous
+        light_cells: list[str] = []
+        light_targets: list[tuple[float, ...]] = []
+        cover_cells: list[str] = []
+        cover_windows: list[tuple[float, ...]] = []
+        # mood_id -> its light and cover cell ranges
+        self._slices: dict[str, tuple[slice, slice]] = {}
+        for mood in moods:
+            light_start, cover_start = len(light_cells), len(cover_cells)
+            for entity_id, light_target in mood.light_targets.items():
+                light_cells.append(entity_id)
+                light_targets.append(self._encode_light_target(light_target))
+            for entity_id, cover_target in mood.cover_targets.items():
+                cover_cells.append(entity_id)
+                cover_windows.append(
+                    (*_window(cover_target.position), *_window(cover_target.tilt_position))
+                )
+            self._slices[mood.mood_id] = (
+                slice(light_start, len(light_cells)),
+                slice(cover_start, len(cover_cells)),
+            )
+
+        self._light_cell_columns = np.array(
+            [self._light_columns[entity_id] for entity_id in light_cells], dtype=np.intp
+        )
+        self._light_targets = np.array(light_targets, dtype=float).reshape(
+            -1, _LIGHT_FEATURES
+        )
+        self._light_cares = ~np.isnan(self._light_targets)
+
+        self._cover_cell_columns = np.array(
+            [self._cover_columns[entity_id] for entity_id in cover_cells], dtype=np.intp
+        )
+        windows = np.array(cover_windows, dtype=float).reshape(-1, 2 * _COVER_FEATURES)
+        self._cover_low = windows[:, 0::2]
+        self._cover_high = windows[:, 1::2]
+        self._cover_cares = ~np.isnan(self._cover_low)
+
+        # Current states; nothing matches before the first sync
+        self._light_states = np.full((len(self._lights), _LIGHT_FEATURES), np.nan)
+        self._light_available = np.zeros(len(self._lights), dtype=bool)
+        self._cover_states = np.full((len(self._covers), _COVER_FEATURES), np.nan)
+        self._cover_available = np.zeros(len(self._covers), dtype=bool)
+
+        # Each mood's entities, in cell order, to pick mismatches from
+        self._names = {
+            mood_id: (tuple(light_cells[lights]), tuple(cover_cells[covers]))
+            for mood_id, (lights, covers) in self._slices.items()
+        }
+        # Per-cell mismatch flags as Python lists, for cheap per-mood reads
+        self._light_mismatch: list[bool] = [True] * len(light_cells)
+        self._cover_mismatch: list[bool] = [True] * len(cover_cells)
+        self._stale = False
+
+    @property
+    def entity_ids(self) -> list[str]:
+        """Return every light and cover the engine evaluates."""
+        return [*self._lights, *self._covers]
+
+    def _effect_code(self, effect: str | None) -> float:
+        """Return the numeric code of an effect name, NaN for None."""
+        if effect is None:
+            return np.nan
+        code = self._effect_codes.get(effect)
+        if code is None:
+            code = self._effect_codes[effect] = float(len(self._effect_codes))
+        return code
+
+    def _encode_light_target(self, target: LightTarget) -> tuple[float, ...]:
+        """Return a light target as a feature row."""
+        return (
+            _power(target.state),
+            _number(target.brightness),
+            self._effect_code(target.effect),
+            _number(target.color_temp_kelvin),
+            *_rgb(target.rgb_color),
+        )
+
+    def _encode_light_state(self, state: State) -> tuple[float, ...]:
+        """Return a light state as a feature row."""
+        attrs = state.attributes
+        return (
+            _power(state.state),
+            _number(attrs.get("brightness")),
+            self._effect_code(attrs.get("effect")),
+            _number(attrs.get("color_temp_kelvin")),
+            *_rgb(attrs.get("rgb_color")),
+        )
+
+    def update(self, entity_id: str, state: State | None) -> None:
+        """Store an entity's new state; flags are recomputed on next read."""
+        available = state is not None and state.state not in UNMATCHABLE_STATES
+        if (col := self._light_columns.get(entity_id)) is not None:
+            self._light_available[col] = available
+            if available:
+                self._light_states[col] = self._encode_light_state(state)
+            self._stale = True
+        if (col := self._cover_columns.get(entity_id)) is not None:
+            self._cover_available[col] = available
+            if available:
+                attrs = state.attributes
+                self._cover_states[col] = (
+                    _number(attrs.get("current_position")),
+                    _number(attrs.get("current_tilt_position")),
+                )
+            self._stale = True
+
+    def async_handle_event(self, event: Event) -> None:
+        """Store the new state from a state-change event."""
+        self.update(event.data["entity_id"], event.data.get("new_state"))
+
+    def sync(self, get_state: Callable[[str], State | None]) -> None:
+        """Re-read every entity, e.g. after startup."""
+        for entity_id in self.entity_ids:
+            self.update(entity_id, get_state(entity_id))
+
+    def _refresh(self) -> None:
+        """Recompute the mismatch flags of every mood in one pass."""
+        if not self._stale:
+            return
+        self._stale = False
+
+        # NaN compares unequal, so a missing attribute fails a set target
+        columns = self._light_cell_columns
+        states = self._light_states[columns]
+        wrong = self._light_cares & (self._light_targets != states)
+        is_off = states[:, _POWER] == 0
+        light_match = (
+            self._light_available[columns]
+            & ~wrong[:, _POWER]
+            & (is_off | ~wrong[:, _POWER + 1 :].any(axis=1))
+        )
+        self._light_mismatch = (~light_match).tolist()
+
+        columns = self._cover_cell_columns
+        states = self._cover_states[columns]
+        outside = self._cover_cares & ~(
+            (self._cover_low <= states) & (states <= self._cover_high)
+        )
+        cover_match = self._cover_available[columns] & ~outside.any(axis=1)
+        self._cover_mismatch = (~cover_match).tolist()
+
+    def mismatched(self, mood_id: str) -> tuple[list[str], list[str]]:
+        """Return (mismatched_lights, mismatched_covers) of a mood."""
+        self._refresh()
+        lights, covers = self._slices[mood_id]
+        light_names, cover_names = self._names[mood_id]
+        return (
+            list(compress(light_names, self._light_mismatch[lights])),
+            list(compress(cover_names, self._cover_mismatch[covers])),
+        )
+
+    def active_mood_ids(self) -> list[str]:
+        """Return the moods whose lights and covers all match."""
+        self._refresh()
+        return [
+            mood_id
+            for mood_id, (lights, covers) in self._slices.items()
+            if not any(self._light_mismatch[lights])
+            and not any(self._cover_mismatch[covers])
+        ]
+
+
+def _window(window: tuple[int, int] | None) -> tuple[float, float]:
+    """Return a cover target window as floats, NaN for "don't care"."""
+    if window is None:
+        return (np.nan, np.nan)
+    return (float(window[0]), float(window[1]))
@@ -1,14 +1,13 @@
 """Sensor platform for MoodLights — auto-revert countdown per mood."""
 from __future__ import annotations
 
-from datetime import timedelta
+from datetime import datetime
 from typing import TYPE_CHECKING
 
 from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_time_interval
 
 from .const import DOMAIN
 from .manager import MoodConfig, MoodManager
@@ -16,9 +15,6 @@ from .manager import MoodConfig, MoodManager
 if TYPE_CHECKING:
     from .config_flow import MoodLightsConfigEntry
 
-# Update interval for countdown display
-_UPDATE_INTERVAL = timedelta(seconds=5)
-
 
 async def async_setup_entry(
     hass: HomeAssistant,  # noqa: ARG001
@@ -40,7 +36,11 @@ class MoodRevertCountdownSensor(SensorEntity):
     """Sensor showing remaining time until auto-revert.
 
     Uses device_class: duration so HA automatically displays the value
-    in the most appropriate unit (seconds, minutes, hours, days).
+    in the most appropriate unit (seconds, minutes, hours, days). Updates
+    are pushed by the manager's shared ticker, only while a timer runs.
+
+    With the ``revert_at_timestamp`` option the sensor instead exposes the
+    revert time as a timestamp, written once per timer start/stop.
     """
 
     _attr_has_entity_name = True
@@ -66,11 +66,17 @@ class MoodRevertCountdownSensor(SensorEntity):
             manufacturer="Mood Lights",
             model="Mood",
         )
-        self._unsub_interval = None
+        self._unsub_countdown = None
+        if manager.countdown_as_timestamp:
+            self._attr_device_class = SensorDeviceClass.TIMESTAMP
+            self._attr_native_unit_of_measurement = None
+            self._attr_suggested_display_precision = None
 
     @property
-    def native_value(self) -> float | None:
-        """Return remaining seconds or None when no timer is active."""
+    def native_value(self) -> float | datetime | None:
+        """Return remaining seconds (or the revert time) when a timer is active."""
+        if self._manager.countdown_as_timestamp:
+            return self._manager.get_auto_revert_at(self._config.mood_id)
         remaining = self._manager.get_auto_revert_remaining(self._config.mood_id)
         if remaining is None or remaining <= 0:
             return None
@@ -84,20 +90,18 @@ class MoodRevertCountdownSensor(SensorEntity):
         return "mdi:timer-sand-empty"
 
     async def async_added_to_hass(self) -> None:
-        """Start periodic updates when entity is added."""
-        self._unsub_interval = async_track_time_interval(
-            self.hass,
-            self._update_state,
-            _UPDATE_INTERVAL,
+        """Receive countdown updates from the manager when entity is added."""
+        self._unsub_countdown = self._manager.async_add_countdown_listener(
+            self._config.mood_id, self._update_state
         )
 
     async def async_will_remove_from_hass(self) -> None:
-        """Stop periodic updates when entity is removed."""
-        if self._unsub_interval is not None:
-            self._unsub_interval()
-            self._unsub_interval = None
+        """Stop countdown updates when entity is removed."""
+        if self._unsub_countdown is not None:
+            self._unsub_countdown()
+            self._unsub_countdown = None
 
     @callback
-    def _update_state(self, _now=None) -> None:
-        """Periodically refresh the countdown value."""
+    def _update_state(self) -> None:
+        """Refresh the countdown value."""
         self.async_write_ha_state()
@@ -0,0 +1,122 @@
+"""Entity ownership and command sequencing for MoodLights.
+
+Every activation and restore claims the entities it is about to command.
+The newest claim on an entity owns it: commands from older claims that
+have not been sent yet are dropped, and a command is only sent once any
+command already in flight for the same entity has finished. Operations
+on disjoint entities never wait for each other.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
+from .const import DATA_ENTITY_SEQUENCER, DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+
+class EntityClaim:
+    """One operation's claim on a set of entities."""
+
+    __slots__ = ("entity_ids",)
+
+    def __init__(self, entity_ids: tuple[str, ...]) -> None:
+        """Initialize the claim."""
+        self.entity_ids = entity_ids
+
+
+# Claim of the activation/restore running in the current task
+_current_claim: ContextVar[EntityClaim | None] = ContextVar(
+    "moodlights_claim", default=None
+)
+
+
+class EntitySequencer:
+    """Integration-wide entity -> owning claim table.
+
+    Shared by all config entries, since moods of different entries can
+    control the same lights.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty table."""
+        self._owners: dict[str, EntityClaim] = {}
+        # entity_id -> completion of the command currently in flight for it
+        self._busy: dict[str, asyncio.Future[None]] = {}
+
+    @contextmanager
+    def claim(self, entity_ids: Iterable[str]) -> Iterator[EntityClaim]:
+        """Take ownership of entities for the commands sent inside the block.
+
+        Ownership outlives the block, so follow-up commands issued on the
+        operation's behalf (convergence retries) still go out until a newer
+        claim takes the entity over.
+        """
+        claim = EntityClaim(tuple(dict.fromkeys(entity_ids)))
+        for entity_id in claim.entity_ids:
+            self._owners[entity_id] = claim
+        token = _current_claim.set(claim)
+        try:
+            yield claim
+        finally:
+            _current_claim.reset(token)
+
+    async def async_acquire(
+        self, entity_ids: list[str]
+    ) -> tuple[list[str], asyncio.Future[None] | None]:
+        """Wait until the running operation may command the given entities.
+
+        Returns the entities it still owns once no other command is in
+        flight for them, plus a future to pass to ``release`` after the
+        command. Entities taken over by a newer claim are left out. Outside
+        a claimed operation every entity is returned straight away.
+        """
+        claim = _current_claim.get()
+        if claim is None:
+            return entity_ids, None
+
+        while True:
+            entity_ids = [
+                entity_id
+                for entity_id in entity_ids
+                if self._owners.get(entity_id) is claim
+            ]
+            busy = {
+                self._busy[entity_id] for entity_id in entity_ids if entity_id in self._busy
+            }
+            if not busy:
+                break
+            await asyncio.wait(busy)
+
+        done = asyncio.get_running_loop().create_future()
+        for entity_id in entity_ids:
+            self._busy[entity_id] = done
+        return entity_ids, done
+
+    def release(self, entity_ids: list[str], done: asyncio.Future[None] | None) -> None:
+        """Mark a command from ``async_acquire`` as finished."""
+        if done is None:
+            return
+        for entity_id in entity_ids:
+            if self._busy.get(entity_id) is done:
+                del self._busy[entity_id]
+        done.set_result(None)
+
+    @property
+    def owned_entity_count(self) -> int:
+        """Return the number of entities with an owner."""
+        return len(self._owners)
+
+
+def async_get_sequencer(hass: HomeAssistant) -> EntitySequencer:
+    """Return the integration-wide sequencer, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    sequencer = domain_data.get(DATA_ENTITY_SEQUENCER)
+    if sequencer is None:
+        sequencer = domain_data[DATA_ENTITY_SEQUENCER] = EntitySequencer()
+    return sequencer
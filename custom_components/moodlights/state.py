@@ -2,63 +2,323 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
+import sys
 from collections import deque
+from collections.abc import Iterator, Mapping
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DEFAULT_RESTORE_BRIGHTNESS_TOLERANCE,
+    DEFAULT_RESTORE_COLOR_TEMP_TOLERANCE,
+    DEFAULT_RESTORE_POSITION_TOLERANCE,
+)
+from .dispatch import ServiceDispatcher
+
 if TYPE_CHECKING:
-    from homeassistant.core import HomeAssistant
+    from homeassistant.core import HomeAssistant, State
+
+    from .store import MoodLightsStore
 
 DEFAULT_MAX_STATES = 1
 
+# States that never count as "already restored"
+_UNSETTLED_STATES = frozenset(("unavailable", "unknown"))
+
 
-@dataclass
+# HA colour mode -> the attribute that restores it. Modes without an entry
+# (onoff, brightness, white) have no colour to restore.
+_COLOR_MODE_ATTRS: dict[str, tuple[str, ...]] = {
+    "color_temp": ("color_temp_kelvin", "color_temp"),
+    "hs": ("rgb_color",),
+    "rgb": ("rgb_color",),
+    "rgbw": ("rgb_color",),
+    "rgbww": ("rgb_color",),
+    "xy": ("xy_color",),
+}
+# Used when a light reports no colour mode: the restore priority order
+_FALLBACK_COLOR_ATTRS = ("color_temp_kelvin", "color_temp", "rgb_color", "xy_color")
+
+
+@dataclass(frozen=True, slots=True)
 class LightState:
-    """Represents a saved light state."""
+    """Represents a saved light state.
+
+    Only one colour descriptor is kept: the attribute (``color_attr``) and
+    value (``color``) of the light's active colour mode. The per-descriptor
+    properties read from it.
+    """
 
     entity_id: str
     state: str
-    brightness: int | None
-    color_temp: int | None
-    color_temp_kelvin: int | None
-    rgb_color: tuple[int, int, int] | None
-    xy_color: tuple[float, float] | None
-    effect: str | None
-    timestamp: datetime = field(default_factory=datetime.now)
+    brightness: int | None = None
+    color_attr: str | None = None
+    color: int | tuple[float, ...] | None = None
+    effect: str | None = None
+
+    @classmethod
+    def from_state(cls, entity_id: str, state: State) -> LightState:
+        """Capture a light's live state."""
+        attrs = state.attributes
+        color_attr = color = None
+        if state.state == "on":
+            color_mode = attrs.get("color_mode")
+            candidates = (
+                _COLOR_MODE_ATTRS.get(color_mode, ()) if color_mode else _FALLBACK_COLOR_ATTRS
+            )
+            for attr in candidates:
+                if (value := attrs.get(attr)) is not None:
+                    color_attr = attr
+                    color = tuple(value) if isinstance(value, (list, tuple)) else value
+                    break
+        effect = attrs.get("effect")
+        return cls(
+            entity_id=sys.intern(entity_id),
+            state=sys.intern(state.state),
+            brightness=attrs.get("brightness"),
+            color_attr=color_attr,
+            color=color,
+            effect=sys.intern(effect) if effect is not None else None,
+        )
+
+    @property
+    def color_temp(self) -> int | None:
+        """Return the saved colour temperature in mireds, if that was the mode."""
+        return self.color if self.color_attr == "color_temp" else None
+
+    @property
+    def color_temp_kelvin(self) -> int | None:
+        """Return the saved colour temperature in Kelvin, if that was the mode."""
+        return self.color if self.color_attr == "color_temp_kelvin" else None
+
+    @property
+    def rgb_color(self) -> tuple[int, int, int] | None:
+        """Return the saved RGB colour, if that was the mode."""
+        return self.color if self.color_attr == "rgb_color" else None
+
+    @property
+    def xy_color(self) -> tuple[float, float] | None:
+        """Return the saved XY colour, if that was the mode."""
+        return self.color if self.color_attr == "xy_color" else None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CoverState:
     """Represents a saved cover state."""
 
     entity_id: str
     state: str
-    current_position: int | None
-    current_tilt_position: int | None
-    timestamp: datetime = field(default_factory=datetime.now)
+    current_position: int | None = None
+    current_tilt_position: int | None = None
+
+    @classmethod
+    def from_state(cls, entity_id: str, state: State) -> CoverState:
+        """Capture a cover's live state."""
+        attrs = state.attributes
+        return cls(
+            entity_id=sys.intern(entity_id),
+            state=sys.intern(state.state),
+            current_position=attrs.get("current_position"),
+            current_tilt_position=attrs.get("current_tilt_position"),
+        )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MoodState:
-    """Represents a saved mood state."""
+    """Represents a saved mood state.
+
+    The timestamp applies to every entity record in the snapshot.
+    """
 
     mood_id: str
     preset_name: str = ""
-    light_states: list[LightState] = field(default_factory=list)
-    cover_states: list[CoverState] = field(default_factory=list)
-    timestamp: datetime = field(default_factory=datetime.now)
+    light_states: tuple[LightState, ...] = ()
+    cover_states: tuple[CoverState, ...] = ()
+    timestamp: datetime = field(default_factory=dt_util.utcnow)
+
+
+@dataclass(frozen=True, slots=True)
+class _SnapshotDelta:
+    """Difference between one generation of a mood's history and the next.
+
+    ``lights``/``covers`` hold added or changed records only; ``removed``
+    holds entity_ids no longer in the snapshot.
+    """
+
+    preset_name: str
+    timestamp: datetime
+    lights: tuple[LightState, ...] = ()
+    covers: tuple[CoverState, ...] = ()
+    removed: frozenset[str] = frozenset()
+
+
+class SnapshotHistory:
+    """Bounded snapshot history of one mood, stored as a base plus deltas.
+
+    The oldest generation is kept in full; every later one only as the
+    records that changed since its predecessor. Unchanged records are the
+    same objects in every generation, so a deep history costs memory in
+    proportion to what changed rather than to its length. The newest
+    generation is cached; older ones are rebuilt on demand.
+    """
+
+    __slots__ = ("_base", "_deltas", "_latest", "_maxlen")
+
+    def __init__(self, maxlen: int) -> None:
+        """Initialize an empty history."""
+        self._maxlen = maxlen
+        self._base: MoodState | None = None
+        self._deltas: deque[_SnapshotDelta] = deque()
+        self._latest: MoodState | None = None
+
+    def __len__(self) -> int:
+        """Return the number of generations."""
+        return 0 if self._base is None else len(self._deltas) + 1
+
+    def __iter__(self) -> Iterator[MoodState]:
+        """Yield every generation, oldest first."""
+        if self._base is None:
+            return
+        mood_state = self._base
+        yield mood_state
+        for delta in self._deltas:
+            mood_state = _apply_delta(mood_state, delta)
+            yield mood_state
+
+    def __getitem__(self, index: int) -> MoodState:
+        """Return one generation, rebuilt from the base if it is not the newest."""
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("snapshot history index out of range")
+        if index == count - 1:
+            return self._latest
+        mood_state = self._base
+        for delta in itertools.islice(self._deltas, index):
+            mood_state = _apply_delta(mood_state, delta)
+        return mood_state
+
+    @property
+    def latest(self) -> MoodState | None:
+        """Return the newest generation."""
+        return self._latest
+
+    def stored_objects(self) -> Iterator[object]:
+        """Yield the objects this history holds, shared ones once per holder."""
+        if self._base is None:
+            return
+        snapshots: list[MoodState | _SnapshotDelta] = [self._base, *self._deltas]
+        if self._latest is not self._base:
+            snapshots.append(self._latest)
+        for snapshot in snapshots:
+            yield snapshot
+            if isinstance(snapshot, MoodState):
+                records = (snapshot.light_states, snapshot.cover_states)
+            else:
+                records = (snapshot.lights, snapshot.covers)
+                yield snapshot.removed
+            for group in records:
+                yield group
+                for record in group:
+                    yield record
+                    if isinstance(record, LightState) and isinstance(record.color, tuple):
+                        yield record.color
+
+    def append(self, mood_state: MoodState) -> None:
+        """Add a generation, dropping the oldest one beyond ``maxlen``."""
+        if self._latest is None or self._maxlen <= 1:
+            # A lone generation is its own base: nothing to diff or fold
+            self._base = self._latest = mood_state
+            return
+
+        delta, self._latest = _diff_mood_states(self._latest, mood_state)
+        self._deltas.append(delta)
+        # Fold only when an older generation is actually evicted
+        while len(self._deltas) >= self._maxlen:
+            self._base = _apply_delta(self._base, self._deltas.popleft())
 
 
 class StateManager:
     """Manages saved states for mood restoration."""
 
-    def __init__(self, hass: HomeAssistant, max_states: int = DEFAULT_MAX_STATES) -> None:
-        """Initialize the state manager."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_states: int = DEFAULT_MAX_STATES,
+        store: MoodLightsStore | None = None,
+        dispatcher: ServiceDispatcher | None = None,
+        delta_restore: bool = False,
+        brightness_tolerance: int = DEFAULT_RESTORE_BRIGHTNESS_TOLERANCE,
+        color_temp_tolerance: int = DEFAULT_RESTORE_COLOR_TEMP_TOLERANCE,
+        position_tolerance: int = DEFAULT_RESTORE_POSITION_TOLERANCE,
+    ) -> None:
+        """Initialize the state manager.
+
+        With ``delta_restore``, snapshot records whose entity is already at
+        the saved state (within the given tolerances) are skipped on restore.
+        """
         self._hass = hass
         self._max_states = max_states
-        # Per mood_id: a deque of MoodState (most recent last)
-        self._states: dict[str, deque[MoodState]] = {}
+        self._dispatcher = dispatcher or ServiceDispatcher(hass)
+
+        self._delta_restore = delta_restore
+        self._brightness_tolerance = brightness_tolerance
+        self._color_temp_tolerance = color_temp_tolerance
+        self._position_tolerance = position_tolerance
+        # Per mood_id: the snapshot history (most recent last)
+        self._states: dict[str, SnapshotHistory] = {}
+
+        # Snapshots persisted in a store are loaded lazily on first access
+        self._store = store
+        self._loaded = store is None
+        self._load_lock = asyncio.Lock()
+
+    async def async_ensure_loaded(self) -> None:
+        """Load persisted snapshots once, on first access after startup.
+
+        Snapshots taken before the load completes take precedence over the
+        stored ones for the same mood.
+        """
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            data = await self._store.async_load_snapshots()
+            for mood_id, history in data.items():
+                if mood_id in self._states:
+                    continue
+                mood_history = self._states[mood_id] = SnapshotHistory(self._max_states)
+                for item in history:
+                    mood_history.append(_mood_state_from_json(mood_id, item))
+            self._loaded = True
+
+    async def async_close(self) -> None:
+        """Flush pending snapshot writes and stop persisting."""
+        store, self._store = self._store, None
+        if store is not None and self._loaded:
+            await store.async_save_snapshots(self._as_json())
+
+    def _async_schedule_save(self) -> None:
+        """Schedule a debounced write of all snapshots.
+
+        Nothing is written before the stored snapshots are loaded, so an early
+        write can never clobber history that has not been read yet.
+        """
+        if self._store is not None and self._loaded:
+            self._store.async_delay_save_snapshots(self._as_json)
+
+    def _as_json(self) -> dict[str, list]:
+        """Serialize every mood's snapshot history."""
+        return {
+            mood_id: [_mood_state_to_json(mood_state) for mood_state in history]
+            for mood_id, history in self._states.items()
+        }
 
     def save_current_state(
         self,
@@ -66,45 +326,45 @@ class StateManager:
         preset_name: str = "",
         light_entities: list[str] | None = None,
         cover_entities: list[str] | None = None,
+        states: Mapping[str, State | None] | None = None,
+        records: dict[str, LightState | CoverState] | None = None,
     ) -> MoodState | None:
-        """Save current state of lights and covers before applying a mood."""
+        """Save current state of lights and covers before applying a mood.
+
+        ``states`` optionally supplies states already read from the state
+        machine, so several moods can be snapshotted from one read.
+        ``records`` is an entity_id -> record memo shared by those moods:
+        an entity in several of them is stored as one record object.
+        """
         if light_entities is None:
             light_entities = []
         if cover_entities is None:
             cover_entities = []
-
-        light_states: list[LightState] = []
-        cover_states: list[CoverState] = []
-
-        for entity_id in light_entities:
-            state = self._hass.states.get(entity_id)
-            if state is None:
-                continue
-
-            light_state = LightState(
-                entity_id=entity_id,
-                state=state.state,
-                brightness=state.attributes.get("brightness"),
-                color_temp=state.attributes.get("color_temp"),
-                color_temp_kelvin=state.attributes.get("color_temp_kelvin"),
-                rgb_color=state.attributes.get("rgb_color"),
-                xy_color=state.attributes.get("xy_color"),
-                effect=state.attributes.get("effect"),
-            )
-            light_states.append(light_state)
-
-        for entity_id in cover_entities:
-            state = self._hass.states.get(entity_id)
-            if state is None:
-                continue
-
-            cover_state = CoverState(
-                entity_id=entity_id,
-                state=state.state,
-                current_position=state.attributes.get("current_position"),
-                current_tilt_position=state.attributes.get("current_tilt_position"),
-            )
-            cover_states.append(cover_state)
+        if records is None:
+            records = {}
+
+        get_state = self._hass.states.get if states is None else states.get
+
+        def _record(
+            entity_id: str, record_type: type[LightState | CoverState]
+        ) -> LightState | CoverState | None:
+            record = records.get(entity_id)
+            if record is None:
+                if (state := get_state(entity_id)) is None:
+                    return None
+                record = records[entity_id] = record_type.from_state(entity_id, state)
+            return record
+
+        light_states = tuple(
+            record
+            for entity_id in light_entities
+            if (record := _record(entity_id, LightState)) is not None
+        )
+        cover_states = tuple(
+            record
+            for entity_id in cover_entities
+            if (record := _record(entity_id, CoverState)) is not None
+        )
 
         if not light_states and not cover_states:
             return None
@@ -117,9 +377,10 @@ class StateManager:
         )
 
         if mood_id not in self._states:
-            self._states[mood_id] = deque(maxlen=self._max_states)
+            self._states[mood_id] = SnapshotHistory(self._max_states)
 
         self._states[mood_id].append(mood_state)
+        self._async_schedule_save()
         return mood_state
 
     def can_restore(self, mood_id: str) -> bool:
@@ -132,110 +393,401 @@ class StateManager:
             return 0
         return len(self._states[mood_id])
 
+    def get_snapshot_footprint(self) -> dict[str, int]:
+        """Return counts and the approximate memory use of all snapshots."""
+        seen: set[int] = set()
+        records = 0
+        approx_bytes = 0
+        for history in self._states.values():
+            for obj in history.stored_objects():
+                if id(obj) in seen:
+                    continue
+                seen.add(id(obj))
+                approx_bytes += sys.getsizeof(obj)
+                if isinstance(obj, LightState | CoverState):
+                    records += 1
+        return {
+            "moods": len(self._states),
+            "generations": sum(len(history) for history in self._states.values()),
+            "stored_records": records,
+            "approx_bytes": approx_bytes,
+        }
+
     def get_previous_state(self, mood_id: str) -> MoodState | None:
         """Return the most recently saved state for a mood."""
         if not self.can_restore(mood_id):
             return None
-        return self._states[mood_id][-1]
+        return self._states[mood_id].latest
 
     async def restore_previous(self, mood_id: str) -> bool:
         """Restore the most recently saved state for a mood."""
+        await self.async_ensure_loaded()
         previous_state = self.get_previous_state(mood_id)
         if not previous_state:
             return False
 
         return await self._restore_state(previous_state)
 
-    async def _restore_state(self, mood_state: MoodState) -> bool:
-        """Restore a specific mood state.
+    async def restore_previous_many(self, mood_ids: list[str]) -> set[str]:
+        """Restore the most recent saved state of several moods in one dispatch.
 
-        Processes lights sequentially to avoid platform-level conflicts
-        when multiple turn_on calls with attributes hit the same integration.
+        The snapshots are merged per entity and restored together. When moods
+        share an entity, the later mood in ``mood_ids`` wins, matching the
+        outcome of restoring them one after another. Returns the mood_ids
+        that had a saved state.
         """
-        restored_any = False
+        await self.async_ensure_loaded()
+        previous_states = [
+            state
+            for mood_id in mood_ids
+            if (state := self.get_previous_state(mood_id)) is not None
+        ]
+        if not previous_states:
+            return set()
+
+        if len(previous_states) == 1:
+            await self._restore_state(previous_states[0])
+        else:
+            await self._restore_state(_merge_mood_states(previous_states))
+        return {state.mood_id for state in previous_states}
 
-        for light_state in mood_state.light_states:
-            service_data: dict[str, Any] = {"entity_id": light_state.entity_id}
-
-            if light_state.state == "off":
-                service = "turn_off"
-            else:
-                service = "turn_on"
-                if light_state.brightness is not None:
-                    service_data["brightness"] = light_state.brightness
-                # Prefer kelvin over mired; never send both to avoid conflicts
-                if light_state.color_temp_kelvin is not None:
-                    service_data["color_temp_kelvin"] = light_state.color_temp_kelvin
-                elif light_state.color_temp is not None:
-                    service_data["color_temp"] = light_state.color_temp
-                # Only one color descriptor allowed — elif chain prevents exclusion group conflict
-                elif light_state.rgb_color is not None:
-                    service_data["rgb_color"] = light_state.rgb_color
-                elif light_state.xy_color is not None:
-                    service_data["xy_color"] = light_state.xy_color
-                if light_state.effect is not None:
-                    service_data["effect"] = light_state.effect
+    async def _restore_state(self, mood_state: MoodState) -> bool:
+        """Restore a specific mood state.
 
-            try:
-                await self._hass.services.async_call(
-                    "light", service, service_data, blocking=True
-                )
-                restored_any = True
-            except Exception:  # noqa: BLE001
-                pass
+        Lights are grouped by the integration that provides them. Each
+        integration's lights are processed sequentially to avoid
+        platform-level conflicts when multiple turn_on calls with attributes
+        hit the same integration, while different integrations run in
+        parallel — total time approaches the slowest integration's queue
+        rather than the sum of all of them.
+        """
+        light_states = mood_state.light_states
+        cover_states = mood_state.cover_states
+        if self._delta_restore:
+            get_state = self._hass.states.get
+            light_states = [
+                light_state
+                for light_state in light_states
+                if not self._light_at_snapshot(light_state, get_state(light_state.entity_id))
+            ]
+            cover_states = [
+                cover_state
+                for cover_state in cover_states
+                if not self._cover_at_snapshot(cover_state, get_state(cover_state.entity_id))
+            ]
+            if not light_states and not cover_states:
+                # Everything is already back where it was
+                return True
+
+        groups = self._group_by_platform(light_states)
+        results = await asyncio.gather(
+            *(self._restore_lights_sequentially(group) for group in groups)
+        )
+        restored_any = any(results)
 
-        # Covers can still run in parallel (different physical devices)
-        cover_tasks = []
-        for cover_state in mood_state.cover_states:
+        # Covers can still run in parallel (different physical devices), within
+        # the dispatcher's in-flight limits
+        cover_calls: list[tuple[str, str, dict[str, Any]]] = []
+        for cover_state in cover_states:
             if cover_state.current_position is not None:
-                cover_tasks.append(
-                    self._hass.services.async_call(
+                cover_calls.append(
+                    (
                         "cover",
                         "set_cover_position",
                         {"entity_id": cover_state.entity_id, "position": cover_state.current_position},
-                        blocking=True,
                     )
                 )
             elif cover_state.state == "closed":
-                cover_tasks.append(
-                    self._hass.services.async_call(
-                        "cover",
-                        "close_cover",
-                        {"entity_id": cover_state.entity_id},
-                        blocking=True,
-                    )
+                cover_calls.append(
+                    ("cover", "close_cover", {"entity_id": cover_state.entity_id})
                 )
             else:
-                cover_tasks.append(
-                    self._hass.services.async_call(
-                        "cover",
-                        "open_cover",
-                        {"entity_id": cover_state.entity_id},
-                        blocking=True,
-                    )
+                cover_calls.append(
+                    ("cover", "open_cover", {"entity_id": cover_state.entity_id})
                 )
 
             if cover_state.current_tilt_position is not None:
-                cover_tasks.append(
-                    self._hass.services.async_call(
+                cover_calls.append(
+                    (
                         "cover",
                         "set_cover_tilt_position",
                         {"entity_id": cover_state.entity_id, "tilt_position": cover_state.current_tilt_position},
-                        blocking=True,
                     )
                 )
 
-        if cover_tasks:
-            await asyncio.gather(*cover_tasks, return_exceptions=True)
+        if cover_calls:
+            await self._dispatcher.async_call_many(cover_calls)
             restored_any = True
 
         return restored_any
 
+    def _light_at_snapshot(self, light_state: LightState, current: State | None) -> bool:
+        """Return True if a light already shows its snapshot state.
+
+        Compares the attributes a restore would send: brightness and colour
+        temperature within tolerance, RGB/XY colour and effect exactly.
+        """
+        if current is None or current.state in _UNSETTLED_STATES:
+            return False
+        if light_state.state == "off" or current.state == "off":
+            return current.state == light_state.state
+
+        attrs = current.attributes
+        if light_state.brightness is not None and not _within(
+            attrs.get("brightness"), light_state.brightness, self._brightness_tolerance
+        ):
+            return False
+        color_attr = light_state.color_attr
+        if color_attr == "color_temp_kelvin":
+            if not _within(
+                attrs.get(color_attr), light_state.color, self._color_temp_tolerance
+            ):
+                return False
+        elif color_attr == "color_temp":
+            if attrs.get(color_attr) != light_state.color:
+                return False
+        elif color_attr is not None and _as_tuple(attrs.get(color_attr)) != light_state.color:
+            return False
+        return light_state.effect is None or attrs.get("effect") == light_state.effect
+
+    def _cover_at_snapshot(self, cover_state: CoverState, current: State | None) -> bool:
+        """Return True if a cover already sits at its snapshot position and tilt."""
+        if current is None or current.state in _UNSETTLED_STATES:
+            return False
+
+        attrs = current.attributes
+        if cover_state.current_position is not None:
+            if not _within(
+                attrs.get("current_position"),
+                cover_state.current_position,
+                self._position_tolerance,
+            ):
+                return False
+        elif current.state != cover_state.state:
+            # Position-less covers: only fully open/closed counts
+            return False
+        return cover_state.current_tilt_position is None or _within(
+            attrs.get("current_tilt_position"),
+            cover_state.current_tilt_position,
+            self._position_tolerance,
+        )
+
+    def _group_by_platform(
+        self, light_states: list[LightState]
+    ) -> list[list[LightState]]:
+        """Split light states into per-integration groups, keeping order.
+
+        Lights missing from the entity registry share one group.
+        """
+        from homeassistant.helpers import entity_registry as er
+
+        registry = er.async_get(self._hass)
+        groups: dict[str | None, list[LightState]] = {}
+        for light_state in light_states:
+            entry = registry.async_get(light_state.entity_id)
+            platform = entry.platform if entry is not None else None
+            groups.setdefault(platform, []).append(light_state)
+        return list(groups.values())
+
+    async def _restore_lights_sequentially(self, light_states: list[LightState]) -> bool:
+        """Restore lights one after another. Returns True if any call succeeded."""
+        restored_any = False
+
+        for light_state in light_states:
+            service_data: dict[str, Any] = {"entity_id": light_state.entity_id}
+
+            if light_state.state == "off":
+                service = "turn_off"
+            else:
+                service = "turn_on"
+                if light_state.brightness is not None:
+                    service_data["brightness"] = light_state.brightness
+                # Only one colour descriptor is saved, so the call never
+                # hits the colour exclusion group
+                if light_state.color_attr is not None:
+                    service_data[light_state.color_attr] = light_state.color
+                if light_state.effect is not None:
+                    service_data["effect"] = light_state.effect
+
+            try:
+                await self._dispatcher.async_call("light", service, service_data)
+                restored_any = True
+            except Exception:  # noqa: BLE001
+                pass
+
+        return restored_any
+
     def clear_states(self, mood_id: str) -> None:
         """Clear saved states for a mood."""
         if mood_id in self._states:
             del self._states[mood_id]
+            self._async_schedule_save()
 
     def clear_all_states(self) -> None:
         """Clear all saved states."""
         self._states = {}
+        self._async_schedule_save()
+
+
+def _within(value: float | None, target: float, tolerance: float) -> bool:
+    """Return True if a value is within tolerance of a target."""
+    return value is not None and abs(value - target) <= tolerance
+
+
+def _as_tuple(value) -> tuple | None:
+    """Return a list/tuple attribute as a tuple (None stays None)."""
+    return None if value is None else tuple(value)
+
+
+def _diff_mood_states(
+    previous: MoodState, current: MoodState
+) -> tuple[_SnapshotDelta, MoodState]:
+    """Return the delta that turns one generation into the next.
+
+    Also returns ``current`` rebuilt from ``previous`` plus the delta, which
+    shares every unchanged record with ``previous``. If the entity order
+    changed, the delta replaces every record so the rebuilt generation keeps
+    the order it was saved in.
+    """
+    previous_lights = {light.entity_id: light for light in previous.light_states}
+    previous_covers = {cover.entity_id: cover for cover in previous.cover_states}
+    current_ids = {
+        record.entity_id for record in (*current.light_states, *current.cover_states)
+    }
+    delta = _SnapshotDelta(
+        preset_name=current.preset_name,
+        timestamp=current.timestamp,
+        lights=tuple(
+            light
+            for light in current.light_states
+            if previous_lights.get(light.entity_id) != light
+        ),
+        covers=tuple(
+            cover
+            for cover in current.cover_states
+            if previous_covers.get(cover.entity_id) != cover
+        ),
+        removed=frozenset(
+            entity_id
+            for entity_id in (*previous_lights, *previous_covers)
+            if entity_id not in current_ids
+        ),
+    )
+
+    rebuilt = _apply_delta(previous, delta)
+    if _entity_order(rebuilt) != _entity_order(current):
+        delta = _SnapshotDelta(
+            preset_name=current.preset_name,
+            timestamp=current.timestamp,
+            lights=current.light_states,
+            covers=current.cover_states,
+            removed=frozenset(previous_lights) | frozenset(previous_covers),
+        )
+        rebuilt = _apply_delta(previous, delta)
+    return delta, rebuilt
+
+
+def _apply_delta(mood_state: MoodState, delta: _SnapshotDelta) -> MoodState:
+    """Return the generation that follows ``mood_state``."""
+    lights = {light.entity_id: light for light in mood_state.light_states}
+    covers = {cover.entity_id: cover for cover in mood_state.cover_states}
+    for entity_id in delta.removed:
+        lights.pop(entity_id, None)
+        covers.pop(entity_id, None)
+    # Changed records keep their position; new ones are appended
+    lights.update((light.entity_id, light) for light in delta.lights)
+    covers.update((cover.entity_id, cover) for cover in delta.covers)
+    return MoodState(
+        mood_id=mood_state.mood_id,
+        preset_name=delta.preset_name,
+        light_states=tuple(lights.values()),
+        cover_states=tuple(covers.values()),
+        timestamp=delta.timestamp,
+    )
+
+
+def _entity_order(mood_state: MoodState) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Return the light and cover entity_ids of a snapshot, in order."""
+    return (
+        tuple(light.entity_id for light in mood_state.light_states),
+        tuple(cover.entity_id for cover in mood_state.cover_states),
+    )
+
+
+def _merge_mood_states(mood_states: list[MoodState]) -> MoodState:
+    """Combine snapshots into one, later snapshots winning per entity."""
+    light_states: dict[str, LightState] = {}
+    cover_states: dict[str, CoverState] = {}
+    for mood_state in mood_states:
+        for light_state in mood_state.light_states:
+            light_states[light_state.entity_id] = light_state
+        for cover_state in mood_state.cover_states:
+            cover_states[cover_state.entity_id] = cover_state
+
+    return MoodState(
+        mood_id="+".join(mood_state.mood_id for mood_state in mood_states),
+        light_states=tuple(light_states.values()),
+        cover_states=tuple(cover_states.values()),
+    )
+
+
+def _mood_state_to_json(mood_state: MoodState) -> dict[str, Any]:
+    """Serialize a snapshot as compact JSON (positional entity records)."""
+    return {
+        "preset": mood_state.preset_name,
+        "ts": mood_state.timestamp.timestamp(),
+        "lights": [
+            [
+                light.entity_id,
+                light.state,
+                light.brightness,
+                light.color_attr,
+                light.color,
+                light.effect,
+            ]
+            for light in mood_state.light_states
+        ],
+        "covers": [
+            [
+                cover.entity_id,
+                cover.state,
+                cover.current_position,
+                cover.current_tilt_position,
+            ]
+            for cover in mood_state.cover_states
+        ],
+    }
+
+
+def _mood_state_from_json(mood_id: str, data: dict[str, Any]) -> MoodState:
+    """Rebuild a snapshot serialized by _mood_state_to_json."""
+    return MoodState(
+        mood_id=mood_id,
+        preset_name=data.get("preset", ""),
+        light_states=tuple(_light_state_from_json(item) for item in data.get("lights", [])),
+        cover_states=tuple(
+            CoverState(
+                entity_id=sys.intern(entity_id),
+                state=sys.intern(state),
+                current_position=current_position,
+                current_tilt_position=current_tilt_position,
+            )
+            for entity_id, state, current_position, current_tilt_position in data.get(
+                "covers", []
+            )
+        ),
+        timestamp=dt_util.utc_from_timestamp(data["ts"]),
+    )
+
+
+def _light_state_from_json(item: list) -> LightState:
+    """Rebuild one light record serialized by _mood_state_to_json."""
+    entity_id, state, brightness, color_attr, color, effect = item
+    return LightState(
+        entity_id=sys.intern(entity_id),
+        state=sys.intern(state),
+        brightness=brightness,
+        color_attr=color_attr,
+        color=tuple(color) if isinstance(color, list) else color,
+        effect=effect,
+    )
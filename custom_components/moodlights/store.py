@@ -0,0 +1,82 @@
+"""Persistent storage for MoodLights snapshots and auto-revert timers."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+# 2: mood ids can be renumbered when entries are folded into a collection,
+# so an older release must not read these files as its own
+STORAGE_VERSION = 2
+
+# Debounce window for disk writes: a burst of activations costs one write
+SAVE_DELAY = 5  # seconds
+
+
+class _MoodLightsFile(Store):
+    """A storage file that migrates data written by older versions."""
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: Any
+    ) -> Any:
+        """Return data written by an older version in the current layout."""
+        if old_major_version == 1:
+            # Same layout, keyed by the positional mood ids that
+            # collection.with_mood_ids keeps
+            return old_data
+        return await super()._async_migrate_func(
+            old_major_version, old_minor_version, old_data
+        )
+
+
+class MoodLightsStore:
+    """Persist one config entry's snapshots and pending auto-revert deadlines.
+
+    Deadlines and snapshots live in separate files. The timer file is tiny and
+    read at setup so pending reverts resume straight away; the snapshot file
+    is only parsed the first time a snapshot is actually needed.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self._timers: Store[dict[str, float]] = _MoodLightsFile(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.timers"
+        )
+        self._snapshots: Store[dict[str, Any]] = _MoodLightsFile(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshots"
+        )
+
+    async def async_load_timers(self) -> dict[str, float]:
+        """Load mood_id -> wall-clock revert deadline (POSIX timestamp)."""
+        return await self._timers.async_load() or {}
+
+    async def async_load_snapshots(self) -> dict[str, Any]:
+        """Load the serialized snapshot history of every mood."""
+        return await self._snapshots.async_load() or {}
+
+    def async_delay_save_timers(self, data_func: Callable[[], dict[str, float]]) -> None:
+        """Schedule a debounced write of the revert deadlines."""
+        self._timers.async_delay_save(data_func, SAVE_DELAY)
+
+    def async_delay_save_snapshots(self, data_func: Callable[[], dict[str, Any]]) -> None:
+        """Schedule a debounced write of the snapshots."""
+        self._snapshots.async_delay_save(data_func, SAVE_DELAY)
+
+    async def async_save_timers(self, data: dict[str, float]) -> None:
+        """Write the revert deadlines now, superseding any pending write."""
+        await self._timers.async_save(data)
+
+    async def async_save_snapshots(self, data: dict[str, Any]) -> None:
+        """Write the snapshots now, superseding any pending write."""
+        await self._snapshots.async_save(data)
+
+    async def async_remove(self) -> None:
+        """Delete both files."""
+        await self._timers.async_remove()
+        await self._snapshots.async_remove()
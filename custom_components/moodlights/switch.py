@@ -70,12 +70,12 @@ class MoodAutoRevertSwitch(SwitchEntity, RestoreEntity):
         if last_state is not None:
             self._is_on = last_state.state == "on"
         # Sync with manager
-        self._manager.set_auto_revert_enabled(self._config.mood_id, self._is_on)
+        await self._manager.set_auto_revert_enabled(self._config.mood_id, self._is_on)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Enable auto-revert for this mood."""
         self._is_on = True
-        self._manager.set_auto_revert_enabled(self._config.mood_id, True)
+        await self._manager.set_auto_revert_enabled(self._config.mood_id, True)
         self.async_write_ha_state()
         # Notify dependent entities (e.g. number entity becomes available)
         async_dispatcher_send(
@@ -85,7 +85,7 @@ class MoodAutoRevertSwitch(SwitchEntity, RestoreEntity):
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Disable auto-revert for this mood (also cancels active timer)."""
         self._is_on = False
-        self._manager.set_auto_revert_enabled(self._config.mood_id, False)
+        await self._manager.set_auto_revert_enabled(self._config.mood_id, False)
         self.async_write_ha_state()
         # Notify dependent entities (e.g. number entity becomes unavailable)
         async_dispatcher_send(
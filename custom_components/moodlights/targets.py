@@ -0,0 +1,153 @@
+"""Compiled match targets for MoodLights.
+
+A mood's raw ``light_config``/``cover_config`` dicts are compiled once, when
+the mood is loaded, into immutable per-entity records holding the values a
+live state has to match. Evaluating a state against a target is then a
+handful of attribute comparisons with no dict lookups on the config and no
+unit conversions.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .const import (
+    CONF_COVER_POSITION,
+    CONF_COVER_TILT_POSITION,
+    CONF_LIGHT_BRIGHTNESS,
+    CONF_LIGHT_COLOR_TEMP_KELVIN,
+    CONF_LIGHT_EFFECT,
+    CONF_LIGHT_POWER,
+    CONF_LIGHT_RGB_COLOR,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.core import State
+
+# Tolerance for cover position matching (motor imprecision)
+COVER_POSITION_TOLERANCE = 2
+
+# Unavailable or unknown entities are never considered matching
+UNMATCHABLE_STATES = frozenset(("unavailable", "unknown"))
+
+
+def brightness_pct_to_raw(pct: int) -> int:
+    """Convert brightness percentage (1-100) to raw HA value (0-255)."""
+    return round(pct / 100 * 255)
+
+
+@dataclass(frozen=True, slots=True)
+class LightTarget:
+    """Expected state of a light, compiled from its mood config.
+
+    ``None`` means "don't care". Colour fields are already resolved with the
+    manager's priority rules: an effect suppresses colour checks, and colour
+    temperature suppresses RGB.
+    """
+
+    state: str | None = None
+    brightness: int | None = None
+    effect: str | None = None
+    color_temp_kelvin: int | None = None
+    rgb_color: tuple[int, ...] | None = None
+
+    @classmethod
+    def from_config(cls, config: dict) -> LightTarget:
+        """Compile a light's mood config into a target."""
+        power = config.get(CONF_LIGHT_POWER)
+        brightness_pct = config.get(CONF_LIGHT_BRIGHTNESS)
+        effect = config.get(CONF_LIGHT_EFFECT)
+
+        color_temp_kelvin = None
+        rgb_color = None
+        if effect is None:
+            color_temp_kelvin = config.get(CONF_LIGHT_COLOR_TEMP_KELVIN)
+            if color_temp_kelvin is None and config.get(CONF_LIGHT_RGB_COLOR) is not None:
+                rgb_color = tuple(config[CONF_LIGHT_RGB_COLOR])
+
+        return cls(
+            state=None if power is None else ("on" if power else "off"),
+            brightness=(
+                None if brightness_pct is None else brightness_pct_to_raw(brightness_pct)
+            ),
+            effect=effect,
+            color_temp_kelvin=color_temp_kelvin,
+            rgb_color=rgb_color,
+        )
+
+    def matches(self, state: State | None) -> bool:
+        """Return True if the light state matches this target exactly.
+
+        Only attributes set on the target are checked.
+        """
+        if state is None:
+            return False
+        current = state.state
+        if current in UNMATCHABLE_STATES:
+            return False
+        if self.state is not None and current != self.state:
+            return False
+        # An off light has no attributes worth comparing
+        if current == "off":
+            return True
+
+        attrs = state.attributes
+        if self.brightness is not None and attrs.get("brightness") != self.brightness:
+            return False
+        if self.effect is not None:
+            return attrs.get("effect") == self.effect
+        if (
+            self.color_temp_kelvin is not None
+            and attrs.get("color_temp_kelvin") != self.color_temp_kelvin
+        ):
+            return False
+        if self.rgb_color is not None:
+            current_rgb = attrs.get("rgb_color")
+            if current_rgb is None or tuple(current_rgb) != self.rgb_color:
+                return False
+        return True
+
+
+@dataclass(frozen=True, slots=True)
+class CoverTarget:
+    """Expected state of a cover as inclusive position/tilt windows.
+
+    The windows already include the motor-imprecision tolerance.
+    """
+
+    position: tuple[int, int] | None = None
+    tilt_position: tuple[int, int] | None = None
+
+    @classmethod
+    def from_config(cls, config: dict) -> CoverTarget:
+        """Compile a cover's mood config into a target."""
+        return cls(
+            position=_window(config.get(CONF_COVER_POSITION)),
+            tilt_position=_window(config.get(CONF_COVER_TILT_POSITION)),
+        )
+
+    def matches(self, state: State | None) -> bool:
+        """Return True if the cover state is inside every configured window."""
+        if state is None or state.state in UNMATCHABLE_STATES:
+            return False
+
+        attrs = state.attributes
+        if self.position is not None and not _in_window(
+            attrs.get("current_position"), self.position
+        ):
+            return False
+        return self.tilt_position is None or _in_window(
+            attrs.get("current_tilt_position"), self.tilt_position
+        )
+
+
+def _window(target: int | None) -> tuple[int, int] | None:
+    """Return the inclusive tolerance window around a target position."""
+    if target is None:
+        return None
+    return (target - COVER_POSITION_TOLERANCE, target + COVER_POSITION_TOLERANCE)
+
+
+def _in_window(value: int | None, window: tuple[int, int]) -> bool:
+    """Return True if a position is inside a window."""
+    return value is not None and window[0] <= value <= window[1]
@@ -0,0 +1,93 @@
+"""Shared state-change routing for MoodLights."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING
+
+from homeassistant.core import Event, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import DATA_ENTITY_TRACKER, DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+StateChangeHandler = Callable[[Event], None]
+
+
+class MoodEntityTracker:
+    """Route state changes of tracked entities to the moods that use them.
+
+    Holds exactly one state-change subscription per tracked entity, no matter
+    how many moods include it, backed by a reverse index of
+    entity_id -> handlers. Each event is routed only to the handlers of the
+    entity that changed.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the tracker."""
+        self._hass = hass
+        self._handlers: dict[str, set[StateChangeHandler]] = {}
+        self._unsubs: dict[str, Callable[[], None]] = {}
+
+    @callback
+    def async_subscribe(
+        self, entity_ids: Iterable[str], handler: StateChangeHandler
+    ) -> Callable[[], None]:
+        """Route state changes of the given entities to a handler.
+
+        Returns a callback that removes the handler again.
+        """
+        entity_ids = tuple(entity_ids)
+        for entity_id in entity_ids:
+            handlers = self._handlers.get(entity_id)
+            if handlers is None:
+                handlers = self._handlers[entity_id] = set()
+                self._unsubs[entity_id] = async_track_state_change_event(
+                    self._hass, entity_id, self._async_route_event
+                )
+            handlers.add(handler)
+
+        @callback
+        def _unsubscribe() -> None:
+            self._async_unsubscribe(entity_ids, handler)
+
+        return _unsubscribe
+
+    @callback
+    def _async_unsubscribe(
+        self, entity_ids: tuple[str, ...], handler: StateChangeHandler
+    ) -> None:
+        """Remove a handler, dropping subscriptions nobody needs any more."""
+        for entity_id in entity_ids:
+            handlers = self._handlers.get(entity_id)
+            if handlers is None:
+                continue
+            handlers.discard(handler)
+            if not handlers:
+                del self._handlers[entity_id]
+                self._unsubs.pop(entity_id)()
+
+    @callback
+    def _async_route_event(self, event: Event) -> None:
+        """Dispatch a state change to the handlers of the changed entity."""
+        handlers = self._handlers.get(event.data["entity_id"])
+        if not handlers:
+            return
+        # Copy: a handler may unsubscribe while we iterate
+        for handler in tuple(handlers):
+            handler(event)
+
+    @property
+    def tracked_entity_count(self) -> int:
+        """Return the number of entities with an active subscription."""
+        return len(self._unsubs)
+
+
+def async_get_tracker(hass: HomeAssistant) -> MoodEntityTracker:
+    """Return the integration-wide entity tracker, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    tracker = domain_data.get(DATA_ENTITY_TRACKER)
+    if tracker is None:
+        tracker = domain_data[DATA_ENTITY_TRACKER] = MoodEntityTracker(hass)
+    return tracker
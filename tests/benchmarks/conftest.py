@@ -0,0 +1,39 @@
+"""Fixtures for the MoodLights benchmark suite."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Coroutine
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from .fakes import FakeEntityRegistry, FakeHass
+
+
+@pytest.fixture
+def fake_hass() -> FakeHass:
+    """Return an in-memory Home Assistant stand-in."""
+    return FakeHass()
+
+
+@pytest.fixture(autouse=True)
+def entity_registry():
+    """Patch the entity registry with one that knows no entities."""
+    registry = FakeEntityRegistry()
+    with patch(
+        "homeassistant.helpers.entity_registry.async_get", return_value=registry
+    ):
+        yield registry
+
+
+@pytest.fixture
+def run() -> Callable[..., Any]:
+    """Return a helper that runs a coroutine function to completion."""
+    loop = asyncio.new_event_loop()
+
+    def _run(func: Callable[..., Coroutine], *args: Any) -> Any:
+        return loop.run_until_complete(func(*args))
+
+    yield _run
+    loop.close()
@@ -0,0 +1,142 @@
+"""In-memory Home Assistant stand-in and scenario builders for benchmarks.
+
+A dict-backed state machine and a service registry that only counts calls.
+Neither changes between rounds, so every round measures the same work.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any
+
+from custom_components.moodlights.const import (
+    CONF_COVER_CONFIG,
+    CONF_COVERS,
+    CONF_LIGHT_CONFIG,
+    CONF_LIGHTS,
+    CONF_MOOD_NAME,
+)
+
+
+@dataclass(slots=True)
+class FakeState:
+    """Minimal stand-in for homeassistant.core.State."""
+
+    entity_id: str
+    state: str
+    attributes: MappingProxyType
+
+
+class FakeStates:
+    """Dict-backed state machine."""
+
+    def __init__(self) -> None:
+        """Initialize an empty state machine."""
+        self._states: dict[str, FakeState] = {}
+
+    def get(self, entity_id: str) -> FakeState | None:
+        """Return the state of an entity."""
+        return self._states.get(entity_id)
+
+    def async_set(self, entity_id: str, state: str, attributes: dict) -> None:
+        """Set the state of an entity."""
+        self._states[entity_id] = FakeState(
+            entity_id, state, MappingProxyType(attributes)
+        )
+
+
+class FakeServices:
+    """Service registry that accepts every call and counts it."""
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self.call_count = 0
+
+    async def async_call(
+        self,
+        domain: str,
+        service: str,
+        service_data: dict[str, Any] | None = None,
+        blocking: bool = False,
+    ) -> None:
+        """Accept a service call."""
+        self.call_count += 1
+
+
+class FakeEntityRegistry:
+    """Entity registry with no entries, so all lights share one restore queue."""
+
+    def async_get(self, entity_id: str) -> None:
+        """Return the registry entry of an entity (there are none)."""
+        return None
+
+
+@dataclass
+class FakeHass:
+    """The parts of HomeAssistant that MoodLights touches on its hot paths."""
+
+    states: FakeStates = field(default_factory=FakeStates)
+    services: FakeServices = field(default_factory=FakeServices)
+    data: dict = field(default_factory=dict)
+
+
+def light_ids(count: int) -> list[str]:
+    """Return entity_ids for a number of lights."""
+    return [f"light.bench_{index}" for index in range(count)]
+
+
+def cover_ids(count: int) -> list[str]:
+    """Return entity_ids for a number of covers."""
+    return [f"cover.bench_{index}" for index in range(count)]
+
+
+def populate(hass: FakeHass, lights: int, covers: int = 0) -> None:
+    """Fill the state machine with lights in mixed colour modes and covers."""
+    for index, entity_id in enumerate(light_ids(lights)):
+        if index % 3 == 0:
+            attributes = {
+                "color_mode": "color_temp",
+                "brightness": 128,
+                "color_temp_kelvin": 2700,
+                "color_temp": 370,
+            }
+        elif index % 3 == 1:
+            attributes = {
+                "color_mode": "xy",
+                "brightness": 200,
+                "rgb_color": (255, 80, 0),
+                "xy_color": (0.6, 0.35),
+            }
+        else:
+            attributes = {}
+        hass.states.async_set(entity_id, "off" if index % 3 == 2 else "on", attributes)
+    for entity_id in cover_ids(covers):
+        hass.states.async_set(
+            entity_id, "open", {"current_position": 60, "current_tilt_position": 30}
+        )
+
+
+def mood_data(name: str, lights: list[str], covers: list[str] | None = None) -> dict:
+    """Return a stored mood dict targeting the given entities.
+
+    Lights alternate between two payloads so batching has something to
+    group, and every tenth light differs from the state machine.
+    """
+    covers = covers or []
+    light_config = {}
+    for index, entity_id in enumerate(lights):
+        if index % 2:
+            light_config[entity_id] = {"power": True, "rgb_color": [255, 80, 0]}
+        else:
+            light_config[entity_id] = {
+                "power": True,
+                "brightness": 50 if index % 10 else 100,
+                "color_temp_kelvin": 2700,
+            }
+    return {
+        CONF_MOOD_NAME: name,
+        CONF_LIGHTS: lights,
+        CONF_LIGHT_CONFIG: light_config,
+        CONF_COVERS: covers,
+        CONF_COVER_CONFIG: {entity_id: {"position": 60} for entity_id in covers},
+    }
@@ -0,0 +1,88 @@
+"""Benchmarks for mood match evaluation."""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from custom_components.moodlights.binary_sensor import (
+    MoodActiveBinarySensor,
+)
+from custom_components.moodlights.manager import MoodManager
+
+from .fakes import cover_ids, light_ids, mood_data, populate
+
+LIGHT_COUNTS = [10, 100, 1000]
+MOOD_COUNTS = [10, 100, 500]
+
+
+def _sensors(hass, run, moods):
+    manager = MoodManager(hass)
+    run(manager.load_moods, {"moods": moods})
+    sensors = []
+    for mood_config in manager.get_all_moods().values():
+        sensor = MoodActiveBinarySensor(mood_config, manager, "bench")
+        sensor.hass = hass
+        sensors.append(sensor)
+    return sensors
+
+
+@pytest.mark.benchmark(group="compute_mismatched")
+@pytest.mark.parametrize("lights", LIGHT_COUNTS)
+def test_compute_mismatched(benchmark, fake_hass, run, lights):
+    """Evaluate one mood against the state machine."""
+    populate(fake_hass, lights, covers=lights // 10)
+    (sensor,) = _sensors(
+        fake_hass,
+        run,
+        [mood_data("Bench", light_ids(lights), cover_ids(lights // 10))],
+    )
+
+    mismatched_lights, _ = benchmark(sensor._compute_mismatched)
+
+    assert mismatched_lights
+
+
+@pytest.mark.benchmark(group="compute_mismatched_all_moods")
+@pytest.mark.parametrize("moods", MOOD_COUNTS)
+def test_compute_mismatched_all_moods(benchmark, fake_hass, run, moods):
+    """Evaluate every mood, each with 20 overlapping lights."""
+    populate(fake_hass, 100)
+    sensors = _sensors(
+        fake_hass,
+        run,
+        [
+            mood_data(f"Mood {index}", light_ids(100)[index % 80 : index % 80 + 20])
+            for index in range(moods)
+        ],
+    )
+
+    def _compute_all():
+        return [sensor._compute_mismatched() for sensor in sensors]
+
+    assert len(benchmark(_compute_all)) == moods
+
+
+@pytest.mark.benchmark(group="compute_mismatched_all_moods")
+@pytest.mark.parametrize("moods", MOOD_COUNTS)
+def test_match_engine_all_moods(benchmark, fake_hass, run, moods):
+    """Re-sync and evaluate every mood with the vectorized engine."""
+    pytest.importorskip("numpy")
+    from custom_components.moodlights.match_engine import MatchEngine
+
+    populate(fake_hass, 100)
+    manager = MoodManager(fake_hass)
+    run(
+        manager.load_moods,
+        {
+            "moods": [
+                mood_data(f"Mood {index}", light_ids(100)[index % 80 : index % 80 + 20])
+                for index in range(moods)
+            ]
+        },
+    )
+    engine = MatchEngine(manager.get_all_moods().values())
+
+    def _sync_and_compute_all():
+        engine.sync(fake_hass.states.get)
+        return [engine.mismatched(mood_id) for mood_id in manager.get_all_moods()]
+
+    assert len(benchmark(_sync_and_compute_all)) == moods
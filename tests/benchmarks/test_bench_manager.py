@@ -0,0 +1,51 @@
+"""Benchmarks for mood activation and loading."""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from custom_components.moodlights.const import CONF_DELTA_APPLY
+from custom_components.moodlights.manager import MoodManager
+
+from .fakes import cover_ids, light_ids, mood_data, populate
+
+LIGHT_COUNTS = [10, 100, 1000]
+MOOD_COUNTS = [10, 100, 500]
+
+
+@pytest.mark.benchmark(group="activate_mood")
+@pytest.mark.parametrize("lights", LIGHT_COUNTS)
+def test_activate_mood(benchmark, fake_hass, run, lights):
+    """Snapshot, batch and dispatch one mood."""
+    populate(fake_hass, lights, covers=lights // 10)
+    manager = MoodManager(fake_hass)
+    run(
+        manager.load_moods,
+        {"moods": [mood_data("Bench", light_ids(lights), cover_ids(lights // 10))]},
+    )
+
+    assert benchmark(run, manager.activate_mood, "mood_0") is True
+
+
+@pytest.mark.benchmark(group="activate_mood_delta")
+@pytest.mark.parametrize("lights", LIGHT_COUNTS)
+def test_activate_mood_delta(benchmark, fake_hass, run, lights):
+    """Activation with delta-apply, where most lights are already at target."""
+    populate(fake_hass, lights)
+    manager = MoodManager(fake_hass, options={CONF_DELTA_APPLY: True})
+    run(manager.load_moods, {"moods": [mood_data("Bench", light_ids(lights))]})
+
+    assert benchmark(run, manager.activate_mood, "mood_0") is True
+
+
+@pytest.mark.benchmark(group="load_moods")
+@pytest.mark.parametrize("moods", MOOD_COUNTS)
+def test_load_moods(benchmark, fake_hass, run, moods):
+    """Load and compile many 20-light moods."""
+    config = {
+        "moods": [mood_data(f"Mood {index}", light_ids(20)) for index in range(moods)]
+    }
+    manager = MoodManager(fake_hass)
+
+    benchmark(run, manager.load_moods, config)
+
+    assert len(manager.get_all_moods()) == moods
@@ -0,0 +1,55 @@
+"""Benchmarks for snapshotting and restoring states."""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from custom_components.moodlights.state import StateManager
+
+from .fakes import cover_ids, light_ids, populate
+
+LIGHT_COUNTS = [10, 100, 1000]
+
+
+@pytest.mark.benchmark(group="save_current_state")
+@pytest.mark.parametrize("lights", LIGHT_COUNTS)
+def test_save_current_state(benchmark, fake_hass, lights):
+    """Snapshot every light and cover of a mood."""
+    populate(fake_hass, lights, covers=lights // 10)
+    manager = StateManager(fake_hass, max_states=10)
+
+    result = benchmark(
+        manager.save_current_state,
+        "mood_0",
+        "Bench",
+        light_ids(lights),
+        cover_ids(lights // 10),
+    )
+
+    assert len(result.light_states) == lights
+
+
+@pytest.mark.benchmark(group="restore_state")
+@pytest.mark.parametrize("lights", LIGHT_COUNTS)
+def test_restore_state(benchmark, fake_hass, run, lights):
+    """Restore a full snapshot."""
+    populate(fake_hass, lights, covers=lights // 10)
+    manager = StateManager(fake_hass)
+    mood_state = manager.save_current_state(
+        "mood_0", "Bench", light_ids(lights), cover_ids(lights // 10)
+    )
+
+    assert benchmark(run, manager._restore_state, mood_state) is True
+
+
+@pytest.mark.benchmark(group="restore_state_delta")
+@pytest.mark.parametrize("lights", LIGHT_COUNTS)
+def test_restore_state_delta(benchmark, fake_hass, run, lights):
+    """Restore with delta-restore when nothing moved since the snapshot."""
+    populate(fake_hass, lights, covers=lights // 10)
+    manager = StateManager(fake_hass, delta_restore=True)
+    mood_state = manager.save_current_state(
+        "mood_0", "Bench", light_ids(lights), cover_ids(lights // 10)
+    )
+
+    assert benchmark(run, manager._restore_state, mood_state) is True
+    assert fake_hass.services.call_count == 0
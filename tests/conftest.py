@@ -1,6 +1,6 @@
 """Test fixtures for MoodLights."""
 import pytest
-from unittest.mock import Mock, AsyncMock, MagicMock
+from unittest.mock import Mock, AsyncMock, MagicMock, patch
 
 
 @pytest.fixture
@@ -38,3 +38,20 @@ def mock_light_entity():
         "supported_color_modes": ["brightness", "color_temp", "rgb"],
     }
     return entity
+
+
+@pytest.fixture
+def entity_registry():
+    """Patch the entity registry; map entity_id -> platform via `platforms`."""
+    registry = MagicMock()
+    registry.platforms = {}
+
+    def _get(entity_id):
+        platform = registry.platforms.get(entity_id)
+        return None if platform is None else MagicMock(platform=platform)
+
+    registry.async_get.side_effect = _get
+    with patch(
+        "homeassistant.helpers.entity_registry.async_get", return_value=registry
+    ):
+        yield registry
@@ -0,0 +1,62 @@
+"""Tests for activity recording."""
+import pytest
+from unittest.mock import AsyncMock
+
+from custom_components.moodlights.activity import ActivityLog
+from custom_components.moodlights.dispatch import ServiceDispatcher
+
+
+class TestActivityLog:
+    async def test_calls_recorded_on_running_timeline(self, hass):
+        hass.services.async_call = AsyncMock(side_effect=[None, RuntimeError("offline")])
+        dispatcher = ServiceDispatcher(hass)
+        log = ActivityLog()
+
+        with log.track("activate", ["mood_0"]):
+            await dispatcher.async_call_many(
+                [
+                    ("light", "turn_on", {"entity_id": ["light.a", "light.b"]}),
+                    ("light", "turn_off", {"entity_id": "light.c"}),
+                ]
+            )
+
+        (timeline,) = log.as_dict()["timelines"]
+        assert timeline["kind"] == "activate"
+        assert timeline["duration_ms"] is not None
+        assert timeline["failed_calls"] == 1
+        calls = {call["service"]: call for call in timeline["calls"]}
+        assert calls["light.turn_on"]["entity_ids"] == ["light.a", "light.b"]
+        assert calls["light.turn_on"]["error"] is None
+        assert calls["light.turn_off"]["entity_ids"] == ["light.c"]
+        assert "offline" in calls["light.turn_off"]["error"]
+
+    async def test_calls_outside_operation_ignored(self, hass):
+        hass.services.async_call = AsyncMock()
+        log = ActivityLog()
+        with log.track("restore", ["mood_0"]):
+            pass
+
+        await ServiceDispatcher(hass).async_call("light", "turn_on", {"entity_id": "light.a"})
+
+        assert log.as_dict()["timelines"][0]["calls"] == []
+
+    def test_ring_buffer_and_counts(self):
+        log = ActivityLog(max_timelines=2)
+        for kind in ("activate", "activate", "restore"):
+            with log.track(kind, ["mood_0"]):
+                pass
+
+        data = log.as_dict()
+        assert data["counts"] == {"mood_0": {"activate": 2, "restore": 1}}
+        assert [timeline["kind"] for timeline in data["timelines"]] == [
+            "restore",
+            "activate",
+        ]
+
+    def test_timeline_open_while_running(self):
+        log = ActivityLog()
+        with log.track("activate", ["mood_0"]), pytest.raises(ValueError):
+            assert log.as_dict()["timelines"][0]["duration_ms"] is None
+            raise ValueError
+
+        assert log.as_dict()["timelines"][0]["duration_ms"] is not None
@@ -3,8 +3,9 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from custom_components.moodlights.binary_sensor import MoodActiveBinarySensor, _brightness_pct_to_raw
+from custom_components.moodlights.binary_sensor import MoodActiveBinarySensor
 from custom_components.moodlights.manager import MoodConfig
+from custom_components.moodlights.targets import LightTarget, brightness_pct_to_raw
 
 
 ENTRY_ID = "test_entry_id"
@@ -23,7 +24,7 @@ def _make_mood(light_config: dict) -> MoodConfig:
 def _make_sensor(light_config: dict) -> MoodActiveBinarySensor:
     """Helper to build a sensor instance (not added to hass)."""
     mood = _make_mood(light_config)
-    sensor = MoodActiveBinarySensor(mood, ENTRY_ID)
+    sensor = MoodActiveBinarySensor(mood, MagicMock(match_engine=None), ENTRY_ID)
     return sensor
 
 
@@ -43,138 +44,113 @@ def _mock_state(state: str, **attributes) -> MagicMock:
 
 
 # ---------------------------------------------------------------------------
-# _brightness_pct_to_raw helper
+# LightTarget.matches (the sensor's per-light check)
 # ---------------------------------------------------------------------------
 
 
-class TestBrightnessPctToRaw:
-    def test_100_pct_is_255(self):
-        assert _brightness_pct_to_raw(100) == 255
-
-    def test_50_pct_is_128(self):
-        assert _brightness_pct_to_raw(50) == 128
-
-    def test_1_pct_is_3(self):
-        assert _brightness_pct_to_raw(1) == 3
-
-
-# ---------------------------------------------------------------------------
-# _is_light_matching
-# ---------------------------------------------------------------------------
-
-
-class TestIsLightMatching:
+class TestLightTargetMatches:
     def test_matching_power_on(self):
-        sensor = _make_sensor({"light.test": {"power": True}})
-        _attach_hass(sensor, {"light.test": _mock_state("on")})
+        target = LightTarget.from_config({"power": True})
+        state = _mock_state("on")
 
-        assert sensor._is_light_matching("light.test", {"power": True}) is True
+        assert target.matches(state) is True
 
     def test_mismatching_power_on(self):
-        sensor = _make_sensor({"light.test": {"power": True}})
-        _attach_hass(sensor, {"light.test": _mock_state("off")})
+        target = LightTarget.from_config({"power": True})
+        state = _mock_state("off")
 
-        assert sensor._is_light_matching("light.test", {"power": True}) is False
+        assert target.matches(state) is False
 
     def test_matching_power_off(self):
-        sensor = _make_sensor({"light.test": {"power": False}})
-        _attach_hass(sensor, {"light.test": _mock_state("off")})
+        target = LightTarget.from_config({"power": False})
+        state = _mock_state("off")
 
-        assert sensor._is_light_matching("light.test", {"power": False}) is True
+        assert target.matches(state) is True
 
     def test_unavailable_light_is_not_matching(self):
-        sensor = _make_sensor({"light.test": {"power": True}})
-        _attach_hass(sensor, {"light.test": _mock_state("unavailable")})
+        target = LightTarget.from_config({"power": True})
+        state = _mock_state("unavailable")
 
-        assert sensor._is_light_matching("light.test", {"power": True}) is False
+        assert target.matches(state) is False
 
     def test_missing_light_is_not_matching(self):
-        sensor = _make_sensor({"light.test": {"power": True}})
-        _attach_hass(sensor, {})  # light.test returns None
+        target = LightTarget.from_config({"power": True})
+        state = None  # light.test does not exist
 
-        assert sensor._is_light_matching("light.test", {"power": True}) is False
+        assert target.matches(state) is False
 
     def test_matching_brightness(self):
-        raw = _brightness_pct_to_raw(80)
-        sensor = _make_sensor({"light.test": {"power": True, "brightness": 80}})
-        _attach_hass(sensor, {"light.test": _mock_state("on", brightness=raw)})
+        raw = brightness_pct_to_raw(80)
+        target = LightTarget.from_config({"power": True, "brightness": 80})
+        state = _mock_state("on", brightness=raw)
 
-        assert sensor._is_light_matching("light.test", {"power": True, "brightness": 80}) is True
+        assert target.matches(state) is True
 
     def test_mismatching_brightness(self):
-        sensor = _make_sensor({"light.test": {"power": True, "brightness": 80}})
-        _attach_hass(sensor, {"light.test": _mock_state("on", brightness=100)})
+        target = LightTarget.from_config({"power": True, "brightness": 80})
+        state = _mock_state("on", brightness=100)
 
-        assert sensor._is_light_matching("light.test", {"power": True, "brightness": 80}) is False
+        assert target.matches(state) is False
 
     def test_missing_brightness_attribute_is_not_matching(self):
-        sensor = _make_sensor({"light.test": {"power": True, "brightness": 80}})
+        target = LightTarget.from_config({"power": True, "brightness": 80})
         # Light is on but has no brightness attribute
-        _attach_hass(sensor, {"light.test": _mock_state("on")})
+        state = _mock_state("on")
 
-        assert sensor._is_light_matching("light.test", {"power": True, "brightness": 80}) is False
+        assert target.matches(state) is False
 
     def test_matching_color_temp_kelvin(self):
-        sensor = _make_sensor({"light.test": {"power": True, "color_temp_kelvin": 4000}})
-        _attach_hass(sensor, {"light.test": _mock_state("on", color_temp_kelvin=4000)})
+        target = LightTarget.from_config({"power": True, "color_temp_kelvin": 4000})
+        state = _mock_state("on", color_temp_kelvin=4000)
 
-        assert sensor._is_light_matching("light.test", {"power": True, "color_temp_kelvin": 4000}) is True
+        assert target.matches(state) is True
 
     def test_mismatching_color_temp_kelvin(self):
-        sensor = _make_sensor({"light.test": {"power": True, "color_temp_kelvin": 4000}})
-        _attach_hass(sensor, {"light.test": _mock_state("on", color_temp_kelvin=3000)})
+        target = LightTarget.from_config({"power": True, "color_temp_kelvin": 4000})
+        state = _mock_state("on", color_temp_kelvin=3000)
 
-        assert sensor._is_light_matching("light.test", {"power": True, "color_temp_kelvin": 4000}) is False
+        assert target.matches(state) is False
 
     def test_matching_rgb_color(self):
-        sensor = _make_sensor({"light.test": {"power": True, "rgb_color": [255, 0, 128]}})
-        _attach_hass(sensor, {"light.test": _mock_state("on", rgb_color=(255, 0, 128))})
+        target = LightTarget.from_config({"power": True, "rgb_color": [255, 0, 128]})
+        state = _mock_state("on", rgb_color=(255, 0, 128))
 
-        assert sensor._is_light_matching("light.test", {"power": True, "rgb_color": [255, 0, 128]}) is True
+        assert target.matches(state) is True
 
     def test_mismatching_rgb_color(self):
-        sensor = _make_sensor({"light.test": {"power": True, "rgb_color": [255, 0, 128]}})
-        _attach_hass(sensor, {"light.test": _mock_state("on", rgb_color=(0, 255, 0))})
+        target = LightTarget.from_config({"power": True, "rgb_color": [255, 0, 128]})
+        state = _mock_state("on", rgb_color=(0, 255, 0))
 
-        assert sensor._is_light_matching("light.test", {"power": True, "rgb_color": [255, 0, 128]}) is False
+        assert target.matches(state) is False
 
     def test_color_temp_takes_priority_over_rgb(self):
         """When both color_temp_kelvin and rgb_color are configured, rgb is not checked."""
-        sensor = _make_sensor({"light.test": {"power": True, "color_temp_kelvin": 4000, "rgb_color": [255, 0, 0]}})
+        target = LightTarget.from_config({"power": True, "color_temp_kelvin": 4000, "rgb_color": [255, 0, 0]})
         # rgb_color doesn't match, but color_temp_kelvin does — should still match
-        _attach_hass(
-            sensor,
-            {"light.test": _mock_state("on", color_temp_kelvin=4000, rgb_color=(0, 0, 255))},
-        )
+        state = _mock_state("on", color_temp_kelvin=4000, rgb_color=(0, 0, 255))
 
-        assert sensor._is_light_matching(
-            "light.test",
-            {"power": True, "color_temp_kelvin": 4000, "rgb_color": [255, 0, 0]},
-        ) is True
+        assert target.matches(state) is True
 
     def test_matching_effect(self):
-        sensor = _make_sensor({"light.test": {"power": True, "effect": "Rainbow"}})
-        _attach_hass(sensor, {"light.test": _mock_state("on", effect="Rainbow")})
+        target = LightTarget.from_config({"power": True, "effect": "Rainbow"})
+        state = _mock_state("on", effect="Rainbow")
 
-        assert sensor._is_light_matching("light.test", {"power": True, "effect": "Rainbow"}) is True
+        assert target.matches(state) is True
 
     def test_mismatching_effect(self):
-        sensor = _make_sensor({"light.test": {"power": True, "effect": "Rainbow"}})
-        _attach_hass(sensor, {"light.test": _mock_state("on", effect="Strobe")})
+        target = LightTarget.from_config({"power": True, "effect": "Rainbow"})
+        state = _mock_state("on", effect="Strobe")
 
-        assert sensor._is_light_matching("light.test", {"power": True, "effect": "Rainbow"}) is False
+        assert target.matches(state) is False
 
     def test_unconfigured_attribute_ignored(self):
         """A light with only brightness configured should not be affected by a colour change."""
-        raw = _brightness_pct_to_raw(50)
-        sensor = _make_sensor({"light.test": {"power": True, "brightness": 50}})
+        raw = brightness_pct_to_raw(50)
+        target = LightTarget.from_config({"power": True, "brightness": 50})
         # rgb_color changed by user — not in mood config, should be ignored
-        _attach_hass(
-            sensor,
-            {"light.test": _mock_state("on", brightness=raw, rgb_color=(255, 0, 0))},
-        )
+        state = _mock_state("on", brightness=raw, rgb_color=(255, 0, 0))
 
-        assert sensor._is_light_matching("light.test", {"power": True, "brightness": 50}) is True
+        assert target.matches(state) is True
 
 
 # ---------------------------------------------------------------------------
@@ -184,7 +160,7 @@ class TestIsLightMatching:
 
 class TestComputeMismatched:
     def test_all_lights_match_returns_empty(self):
-        raw = _brightness_pct_to_raw(100)
+        raw = brightness_pct_to_raw(100)
         sensor = _make_sensor({
             "light.a": {"power": True, "brightness": 100},
             "light.b": {"power": True, "brightness": 100},
@@ -194,10 +170,10 @@ class TestComputeMismatched:
             "light.b": _mock_state("on", brightness=raw),
         })
 
-        assert sensor._compute_mismatched() == []
+        assert sensor._compute_mismatched() == ([], [])
 
     def test_one_light_mismatches(self):
-        raw = _brightness_pct_to_raw(100)
+        raw = brightness_pct_to_raw(100)
         sensor = _make_sensor({
             "light.a": {"power": True, "brightness": 100},
             "light.b": {"power": True, "brightness": 100},
@@ -207,25 +183,149 @@ class TestComputeMismatched:
             "light.b": _mock_state("on", brightness=50),  # wrong brightness
         })
 
-        mismatched = sensor._compute_mismatched()
-        assert mismatched == ["light.b"]
+        mismatched_lights, mismatched_covers = sensor._compute_mismatched()
+        assert mismatched_lights == ["light.b"]
+        assert mismatched_covers == []
 
     def test_is_on_true_when_all_match(self):
-        raw = _brightness_pct_to_raw(100)
+        raw = brightness_pct_to_raw(100)
         sensor = _make_sensor({"light.a": {"power": True, "brightness": 100}})
         _attach_hass(sensor, {"light.a": _mock_state("on", brightness=raw)})
-        sensor._mismatched = sensor._compute_mismatched()
+        sensor._mismatched_lights = set(sensor._compute_mismatched()[0])
 
         assert sensor.is_on is True
 
     def test_is_on_false_when_mismatch(self):
         sensor = _make_sensor({"light.a": {"power": True, "brightness": 100}})
         _attach_hass(sensor, {"light.a": _mock_state("on", brightness=50)})
-        sensor._mismatched = sensor._compute_mismatched()
+        sensor._mismatched_lights = set(sensor._compute_mismatched()[0])
 
         assert sensor.is_on is False
 
 
+# ---------------------------------------------------------------------------
+# _handle_state_change — incremental evaluation
+# ---------------------------------------------------------------------------
+
+
+def _state_event(entity_id: str, new_state) -> MagicMock:
+    event = MagicMock()
+    event.data = {"entity_id": entity_id, "new_state": new_state}
+    return event
+
+
+@pytest.fixture
+def call_later():
+    """Patch async_call_later in the platform and return the mock."""
+    with patch(
+        "custom_components.moodlights.binary_sensor.async_call_later"
+    ) as mock_call_later:
+        mock_call_later.side_effect = lambda *_args: MagicMock()
+        yield mock_call_later
+
+
+class TestHandleStateChange:
+    @pytest.fixture(autouse=True)
+    def _deferred_writes(self, call_later):
+        """State writes are deferred; keep them off the real event loop."""
+
+    def test_only_event_entity_is_reevaluated(self):
+        sensor = _make_sensor({
+            "light.a": {"power": True},
+            "light.b": {"power": True},
+        })
+        hass = _attach_hass(sensor, {})
+        sensor.async_write_ha_state = MagicMock()
+        sensor._mismatched_lights = {"light.a", "light.b"}
+
+        sensor._handle_state_change(_state_event("light.a", _mock_state("on")))
+
+        assert sensor._mismatched_lights == {"light.b"}
+        hass.states.get.assert_not_called()
+
+    def test_entity_becomes_mismatched(self):
+        sensor = _make_sensor({"light.a": {"power": True}})
+        _attach_hass(sensor, {})
+        sensor.async_write_ha_state = MagicMock()
+
+        sensor._handle_state_change(_state_event("light.a", _mock_state("off")))
+
+        assert sensor._mismatched_lights == {"light.a"}
+        assert sensor.is_on is False
+
+    def test_removed_entity_is_mismatched(self):
+        sensor = _make_sensor({"light.a": {"power": True}})
+        _attach_hass(sensor, {})
+        sensor.async_write_ha_state = MagicMock()
+
+        sensor._handle_state_change(_state_event("light.a", None))
+
+        assert sensor._mismatched_lights == {"light.a"}
+
+
+# ---------------------------------------------------------------------------
+# Deferred state writes
+# ---------------------------------------------------------------------------
+
+
+class TestDeferredWrites:
+    def test_burst_is_written_once_after_delay(self, call_later):
+        sensor = _make_sensor({"light.a": {"power": True}, "light.b": {"power": True}})
+        _attach_hass(sensor, {})
+        sensor.async_write_ha_state = MagicMock()
+
+        for state in ("off", "on"):
+            sensor._handle_state_change(_state_event("light.a", _mock_state(state)))
+            sensor._handle_state_change(_state_event("light.b", _mock_state(state)))
+
+        call_later.assert_called_once()
+        sensor.async_write_ha_state.assert_not_called()
+
+        write_pending = call_later.call_args.args[2]
+        write_pending(None)
+        sensor.async_write_ha_state.assert_called_once()
+        assert sensor.is_on is True
+
+    def test_settled_mood_writes_immediately(self, call_later):
+        sensor = _make_sensor({"light.a": {"power": True}})
+        _attach_hass(sensor, {})
+        sensor.async_write_ha_state = MagicMock()
+        sensor._handle_state_change(_state_event("light.a", _mock_state("on")))
+        pending = sensor._unsub_pending_write
+
+        sensor._async_write_pending()
+
+        pending.assert_called_once()
+        sensor.async_write_ha_state.assert_called_once()
+        # Nothing new since: a second settle does not write again
+        sensor._async_write_pending()
+        sensor.async_write_ha_state.assert_called_once()
+
+    def test_unchanged_result_is_not_written(self, call_later):
+        sensor = _make_sensor({"light.a": {"power": True}})
+        _attach_hass(sensor, {})
+        sensor.async_write_ha_state = MagicMock()
+        sensor._written = (frozenset(), frozenset())
+
+        # Flickers off and back on within one burst
+        sensor._handle_state_change(_state_event("light.a", _mock_state("off")))
+        sensor._handle_state_change(_state_event("light.a", _mock_state("on")))
+        sensor._async_write_pending()
+
+        sensor.async_write_ha_state.assert_not_called()
+
+    async def test_removal_cancels_pending_write(self, call_later):
+        sensor = _make_sensor({"light.a": {"power": True}})
+        _attach_hass(sensor, {})
+        sensor._handle_state_change(_state_event("light.a", _mock_state("on")))
+        pending = sensor._unsub_pending_write
+
+        await sensor.async_will_remove_from_hass()
+
+        pending.assert_called_once()
+        assert sensor._unsub_pending_write is None
+
+
 # ---------------------------------------------------------------------------
 # extra_state_attributes
 # ---------------------------------------------------------------------------
@@ -234,13 +334,23 @@ class TestComputeMismatched:
 class TestExtraStateAttributes:
     def test_attributes_present(self):
         sensor = _make_sensor({"light.a": {"power": True}, "light.b": {"power": False}})
-        sensor._mismatched = ["light.b"]
+        sensor._mismatched_lights = {"light.b"}
 
         attrs = sensor.extra_state_attributes
         assert attrs["mood_name"] == "Movie Night"
         assert set(attrs["configured_lights"]) == {"light.a", "light.b"}
         assert attrs["mismatched_lights"] == ["light.b"]
 
+    def test_static_attributes_are_not_recorded(self):
+        sensor = _make_sensor({"light.a": {"power": True}})
+
+        assert sensor._unrecorded_attributes >= {
+            "mood_name",
+            "configured_lights",
+            "configured_covers",
+        }
+        assert "mismatched_lights" not in sensor._unrecorded_attributes
+
 
 # ---------------------------------------------------------------------------
 # async_will_remove_from_hass — listener cleanup
@@ -248,15 +358,14 @@ class TestExtraStateAttributes:
 
 
 class TestListenerCleanup:
-    def test_unsub_called_on_removal(self):
+    async def test_unsub_called_on_removal(self):
         sensor = _make_sensor({"light.a": {"power": True}})
         sensor.hass = MagicMock()
 
         unsub = MagicMock()
         sensor._unsub_listeners = [unsub]
 
-        import asyncio
-        asyncio.get_event_loop().run_until_complete(sensor.async_will_remove_from_hass())
+        await sensor.async_will_remove_from_hass()
 
         unsub.assert_called_once()
         assert sensor._unsub_listeners == []
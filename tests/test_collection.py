@@ -0,0 +1,155 @@
+"""Tests for collection entries and folding single-mood entries into them."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.moodlights.collection import (
+    async_fold_entries,
+    async_remove_mood,
+    next_mood_id,
+    with_mood_ids,
+)
+from custom_components.moodlights.manager import MoodManager
+from custom_components.moodlights.store import MoodLightsStore
+
+
+def _entry(entry_id, *names, **data):
+    entry = MagicMock(entry_id=entry_id, title=names[0])
+    entry.data = {"moods": [{"name": name, "lights": ["light.lamp"]} for name in names], **data}
+    return entry
+
+
+class TestMoodIds:
+    def test_positional_ids_made_explicit(self):
+        moods = with_mood_ids([{"name": "A"}, {"name": "B", "mood_id": "mood_7"}])
+        assert [mood["mood_id"] for mood in moods] == ["mood_0", "mood_7"]
+
+    def test_next_id_skips_taken(self):
+        assert next_mood_id([{"mood_id": "mood_0"}, {"mood_id": "mood_2"}]) == "mood_3"
+        assert next_mood_id([{"mood_id": "mood_0"}, {"mood_id": "mood_5"}]) == "mood_2"
+
+    async def test_manager_uses_stored_ids(self, hass):
+        manager = MoodManager(hass)
+        await manager.load_moods(
+            {"moods": [{"name": "A", "mood_id": "mood_3"}, {"name": "B"}]}
+        )
+        assert list(manager.get_all_moods()) == ["mood_3", "mood_1"]
+
+
+class TestFoldEntries:
+    @pytest.fixture
+    def stores(self):
+        """Patch the store with per-entry in-memory timers and snapshots."""
+        data = {
+            "target": ({"mood_0": 100.0}, {"mood_0": ["t"]}),
+            "source": ({"mood_0": 200.0}, {"mood_0": ["s"]}),
+        }
+        saved = {}
+
+        def _store(_hass, entry_id):
+            timers, snapshots = data.get(entry_id, ({}, {}))
+            store = MagicMock()
+            store.async_load_timers = AsyncMock(return_value=dict(timers))
+            store.async_load_snapshots = AsyncMock(return_value=dict(snapshots))
+            store.async_save_timers = AsyncMock(
+                side_effect=lambda value: saved.__setitem__("timers", value)
+            )
+            store.async_save_snapshots = AsyncMock(
+                side_effect=lambda value: saved.__setitem__("snapshots", value)
+            )
+            return store
+
+        with patch("custom_components.moodlights.store.MoodLightsStore", side_effect=_store):
+            yield saved
+
+    async def test_moods_entities_and_storage_move_to_target(self, hass, stores):
+        hass.config_entries.async_unload = AsyncMock()
+        hass.config_entries.async_remove = AsyncMock()
+        target, source = _entry("target", "Relax"), _entry("source", "Movie")
+        entity = MagicMock(
+            entity_id="button.movie_activate",
+            unique_id="moodlights_source_mood_0_activate",
+        )
+        entity_reg, device_reg = MagicMock(), MagicMock()
+        device_reg.async_get_device.return_value = MagicMock(id="device")
+
+        with (
+            patch("homeassistant.helpers.entity_registry.async_get", return_value=entity_reg),
+            patch(
+                "homeassistant.helpers.entity_registry.async_entries_for_config_entry",
+                return_value=[entity],
+            ),
+            patch("homeassistant.helpers.device_registry.async_get", return_value=device_reg),
+        ):
+            moods = await async_fold_entries(hass, target, [source])
+
+        assert [(mood["name"], mood["mood_id"]) for mood in moods] == [
+            ("Relax", "mood_0"),
+            ("Movie", "mood_1"),
+        ]
+        entity_reg.async_update_entity.assert_called_once_with(
+            "button.movie_activate",
+            config_entry_id="target",
+            new_unique_id="moodlights_target_mood_1_activate",
+        )
+        device_reg.async_update_device.assert_called_once_with(
+            "device",
+            add_config_entry_id="target",
+            remove_config_entry_id="source",
+            new_identifiers={("moodlights", "target_mood_1")},
+        )
+        assert stores == {
+            "timers": {"mood_0": 100.0, "mood_1": 200.0},
+            "snapshots": {"mood_0": ["t"], "mood_1": ["s"]},
+        }
+        hass.config_entries.async_remove.assert_awaited_once_with("source")
+
+
+class TestRemoveMood:
+    async def test_entities_and_storage_pruned(self, hass):
+        hass.config_entries.async_unload = AsyncMock()
+        entry = _entry("collection", "Relax", "Movie", "Party")
+        entry.data["moods"][2]["mood_id"] = "mood_10"
+        entities = [
+            MagicMock(entity_id="button.movie_activate", unique_id="moodlights_collection_mood_1_activate"),
+            MagicMock(entity_id="button.party_activate", unique_id="moodlights_collection_mood_10_activate"),
+        ]
+        entity_reg, device_reg = MagicMock(), MagicMock()
+        device_reg.async_get_device.return_value = MagicMock(id="device")
+        store = MagicMock()
+        store.async_load_timers = AsyncMock(return_value={"mood_1": 100.0, "mood_10": 200.0})
+        store.async_load_snapshots = AsyncMock(return_value={"mood_0": ["r"], "mood_1": ["m"]})
+        store.async_save_timers = AsyncMock()
+        store.async_save_snapshots = AsyncMock()
+
+        with (
+            patch("custom_components.moodlights.store.MoodLightsStore", return_value=store),
+            patch("homeassistant.helpers.entity_registry.async_get", return_value=entity_reg),
+            patch(
+                "homeassistant.helpers.entity_registry.async_entries_for_config_entry",
+                return_value=entities,
+            ),
+            patch("homeassistant.helpers.device_registry.async_get", return_value=device_reg),
+        ):
+            moods = await async_remove_mood(hass, entry, "mood_1")
+
+        # The others keep their ids, now stored explicitly
+        assert [(mood["name"], mood["mood_id"]) for mood in moods] == [
+            ("Relax", "mood_0"),
+            ("Party", "mood_10"),
+        ]
+        entity_reg.async_remove.assert_called_once_with("button.movie_activate")
+        device_reg.async_get_device.assert_called_once_with(
+            identifiers={("moodlights", "collection_mood_1")}
+        )
+        device_reg.async_remove_device.assert_called_once_with("device")
+        store.async_save_timers.assert_awaited_once_with({"mood_10": 200.0})
+        store.async_save_snapshots.assert_awaited_once_with({"mood_0": ["r"]})
+
+
+class TestStoreMigration:
+    async def test_version_1_data_kept(self, hass):
+        store = MoodLightsStore(hass, "entry")
+        data = {"mood_0": 100.0}
+
+        assert await store._timers._async_migrate_func(1, 1, data) == data
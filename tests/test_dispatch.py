@@ -0,0 +1,112 @@
+"""Tests for the bounded-concurrency service dispatcher."""
+import asyncio
+
+from custom_components.moodlights.dispatch import ServiceDispatcher
+from custom_components.moodlights.manager import MoodManager
+
+
+def _tracking_call(hass, release: asyncio.Event):
+    """Install a service call that records peak concurrency per domain."""
+    in_flight: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def _call(domain, _service, _data, blocking):
+        in_flight[domain] = in_flight.get(domain, 0) + 1
+        peak[domain] = max(peak.get(domain, 0), in_flight[domain])
+        peak["all"] = max(peak.get("all", 0), sum(in_flight.values()))
+        await release.wait()
+        in_flight[domain] -= 1
+
+    hass.services.async_call = _call
+    return peak
+
+
+class TestServiceDispatcher:
+    async def test_per_domain_limit(self, hass):
+        release = asyncio.Event()
+        peak = _tracking_call(hass, release)
+        dispatcher = ServiceDispatcher(hass, max_in_flight=10, max_in_flight_per_domain=3)
+
+        task = asyncio.ensure_future(
+            dispatcher.async_call_many(
+                [("light", "turn_on", {"entity_id": f"light.{i}"}) for i in range(20)]
+            )
+        )
+        for _ in range(5):
+            await asyncio.sleep(0)
+        release.set()
+        await task
+
+        assert peak["light"] == 3
+
+    async def test_global_limit(self, hass):
+        release = asyncio.Event()
+        peak = _tracking_call(hass, release)
+        dispatcher = ServiceDispatcher(hass, max_in_flight=4, max_in_flight_per_domain=3)
+
+        calls = [("light", "turn_on", {}) for _ in range(10)]
+        calls += [("cover", "open_cover", {}) for _ in range(10)]
+        task = asyncio.ensure_future(dispatcher.async_call_many(calls))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        release.set()
+        await task
+
+        assert peak["all"] == 4
+
+    async def test_failures_are_returned(self, hass):
+        async def _call(_domain, service, _data, blocking):
+            if service == "bad":
+                raise ValueError("boom")
+
+        hass.services.async_call = _call
+        dispatcher = ServiceDispatcher(hass)
+
+        results = await dispatcher.async_call_many(
+            [("light", "good", {}), ("light", "bad", {})]
+        )
+
+        assert results[0] is None
+        assert isinstance(results[1], ValueError)
+
+    def test_shared_across_entries(self, hass):
+        first = MoodManager(hass, entry_id="first")
+        second = MoodManager(hass, entry_id="second")
+        assert first._dispatcher is second._dispatcher
+
+    async def test_limits_from_entry_options(self, hass):
+        release = asyncio.Event()
+        peak = _tracking_call(hass, release)
+        first = MoodManager(hass, options={"max_in_flight_per_domain": 2}, entry_id="first")
+        # Entries that leave the limits unset do not reset them
+        MoodManager(hass, entry_id="second")
+
+        task = asyncio.ensure_future(
+            first._dispatcher.async_call_many(
+                [("light", "turn_on", {"entity_id": f"light.{i}"}) for i in range(6)]
+            )
+        )
+        for _ in range(5):
+            await asyncio.sleep(0)
+        release.set()
+        await task
+
+        assert peak["light"] == 2
+
+    async def test_later_entry_replaces_limits(self, hass):
+        release = asyncio.Event()
+        peak = _tracking_call(hass, release)
+        first = MoodManager(hass, options={"max_in_flight_per_domain": 2}, entry_id="first")
+        MoodManager(hass, options={"max_in_flight_per_domain": 4}, entry_id="second")
+
+        task = asyncio.ensure_future(
+            first._dispatcher.async_call_many(
+                [("light", "turn_on", {"entity_id": f"light.{i}"}) for i in range(6)]
+            )
+        )
+        for _ in range(5):
+            await asyncio.sleep(0)
+        release.set()
+        await task
+
+        assert peak["light"] == 4
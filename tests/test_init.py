@@ -0,0 +1,87 @@
+"""Tests for the domain-wide mood name index."""
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.moodlights import (
+    _index_moods,
+    _loaded_managers,
+    _resolve_mood,
+    _unindex_moods,
+)
+from custom_components.moodlights.manager import MoodConfig, MoodManager
+
+
+def _make_manager(hass, *names: str) -> MoodManager:
+    manager = MoodManager(hass)
+    for idx, name in enumerate(names):
+        manager._moods[f"mood_{idx}"] = MoodConfig(
+            mood_id=f"mood_{idx}", name=name, lights=[], light_config={}
+        )
+    return manager
+
+
+class TestMoodIndex:
+    def test_resolve_is_case_insensitive(self, hass):
+        manager = _make_manager(hass, "Movie Night")
+        _index_moods(hass, manager)
+
+        resolved_manager, mood = _resolve_mood(hass, "movie NIGHT")
+        assert resolved_manager is manager
+        assert mood.mood_id == "mood_0"
+
+    def test_resolve_across_managers(self, hass):
+        first = _make_manager(hass, "Morning")
+        second = _make_manager(hass, "Evening")
+        _index_moods(hass, first)
+        _index_moods(hass, second)
+
+        assert _resolve_mood(hass, "Evening")[0] is second
+
+    def test_unknown_mood_lists_available(self, hass):
+        _index_moods(hass, _make_manager(hass, "Morning", "Evening"))
+
+        with pytest.raises(ServiceValidationError, match="'Morning', 'Evening'"):
+            _resolve_mood(hass, "Party")
+
+    def test_unindex_removes_only_own_moods(self, hass):
+        first = _make_manager(hass, "Morning")
+        second = _make_manager(hass, "Evening")
+        _index_moods(hass, first)
+        _index_moods(hass, second)
+
+        _unindex_moods(hass, first)
+
+        with pytest.raises(ServiceValidationError):
+            _resolve_mood(hass, "Morning")
+        assert _resolve_mood(hass, "Evening")[0] is second
+
+    def test_unindex_hands_clashing_name_to_other_entry(self, hass):
+        first = _make_manager(hass, "Morning")
+        second = _make_manager(hass, "morning", "Evening")
+        _index_moods(hass, first)
+        _index_moods(hass, second)
+        hass.config_entries.async_entries.return_value = [
+            MagicMock(state=ConfigEntryState.LOADED, runtime_data=first),
+            MagicMock(state=ConfigEntryState.LOADED, runtime_data=second),
+        ]
+
+        _unindex_moods(hass, first)
+
+        assert _resolve_mood(hass, "Morning") == (second, second.get_mood("mood_0"))
+
+    def test_loaded_managers_skip_entries_not_loaded(self, hass):
+        # A manager whose moods all lost a name clash is still included
+        first = _make_manager(hass, "Morning")
+        second = _make_manager(hass, "morning")
+        _index_moods(hass, first)
+        _index_moods(hass, second)
+        hass.config_entries.async_entries.return_value = [
+            MagicMock(state=ConfigEntryState.LOADED, runtime_data=first),
+            MagicMock(state=ConfigEntryState.LOADED, runtime_data=second),
+            MagicMock(state=ConfigEntryState.NOT_LOADED),
+        ]
+
+        assert _loaded_managers(hass) == [first, second]
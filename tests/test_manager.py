@@ -0,0 +1,775 @@
+"""Tests for MoodManager."""
+import asyncio
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.moodlights.manager import (
+    MoodManager,
+    async_activate_moods,
+    async_save_all_states,
+)
+
+
+@pytest.fixture
+def call_later():
+    """Patch async_call_later and return the mock."""
+    with patch("homeassistant.helpers.event.async_call_later") as mock_call_later:
+        mock_call_later.side_effect = lambda *_args: MagicMock()
+        yield mock_call_later
+
+
+@pytest.fixture
+def time_interval():
+    """Patch async_track_time_interval and return the mock."""
+    with patch(
+        "homeassistant.helpers.event.async_track_time_interval"
+    ) as mock_interval:
+        mock_interval.side_effect = lambda *_args: MagicMock()
+        yield mock_interval
+
+
+# ---------------------------------------------------------------------------
+# Shared countdown ticker
+# ---------------------------------------------------------------------------
+
+
+class TestCountdownTicker:
+    def test_no_ticker_without_timers(self, hass, time_interval):
+        manager = MoodManager(hass)
+        manager.async_add_countdown_listener("mood_0", MagicMock())
+
+        time_interval.assert_not_called()
+
+    @pytest.mark.usefixtures("call_later")
+    def test_ticker_runs_only_while_timers_exist(
+        self, hass, time_interval
+    ):
+        manager = MoodManager(hass)
+
+        manager._schedule_auto_revert("mood_0", 5)
+        manager._schedule_auto_revert("mood_1", 5)
+        assert time_interval.call_count == 1
+        unsub_ticker = manager._unsub_countdown_ticker
+
+        manager.cancel_auto_revert("mood_0")
+        unsub_ticker.assert_not_called()
+
+        manager.cancel_auto_revert("mood_1")
+        unsub_ticker.assert_called_once()
+        assert manager._unsub_countdown_ticker is None
+
+    @pytest.mark.usefixtures("call_later", "time_interval")
+    def test_tick_updates_only_live_timers(self, hass):
+        manager = MoodManager(hass)
+        active, idle = MagicMock(), MagicMock()
+        manager.async_add_countdown_listener("mood_0", active)
+        manager.async_add_countdown_listener("mood_1", idle)
+
+        manager._schedule_auto_revert("mood_0", 5)
+        active.reset_mock()
+        manager._async_countdown_tick()
+
+        active.assert_called_once()
+        idle.assert_not_called()
+
+    @pytest.mark.usefixtures("call_later")
+    def test_timestamp_mode_never_ticks(self, hass, time_interval):
+        manager = MoodManager(hass, options={"revert_at_timestamp": True})
+        listener = MagicMock()
+        manager.async_add_countdown_listener("mood_0", listener)
+
+        manager._schedule_auto_revert("mood_0", 5)
+
+        time_interval.assert_not_called()
+        listener.assert_called_once()
+        assert manager.get_auto_revert_at("mood_0") is not None
+
+
+# ---------------------------------------------------------------------------
+# Heap-based revert scheduler
+# ---------------------------------------------------------------------------
+
+
+class TestRevertScheduler:
+    def test_single_timer_armed_for_earliest_deadline(self, hass, call_later):
+        manager = MoodManager(hass)
+
+        manager._schedule_auto_revert("mood_0", 10)
+        manager._schedule_auto_revert("mood_1", 20)
+
+        assert call_later.call_count == 1
+        assert call_later.call_args[0][1] == pytest.approx(600, abs=1)
+
+    def test_earlier_deadline_rearms(self, hass, call_later):
+        manager = MoodManager(hass)
+        manager._schedule_auto_revert("mood_0", 10)
+        first_timer = manager._unsub_revert_timer
+
+        manager._schedule_auto_revert("mood_1", 5)
+
+        first_timer.assert_called_once()
+        assert call_later.call_args[0][1] == pytest.approx(300, abs=1)
+
+    def test_cancel_rearms_for_next_live_deadline(self, hass, call_later):
+        manager = MoodManager(hass)
+        manager._schedule_auto_revert("mood_0", 5)
+        manager._schedule_auto_revert("mood_1", 10)
+
+        assert manager.cancel_auto_revert("mood_0") is True
+        assert manager.cancel_auto_revert("mood_0") is False
+
+        assert call_later.call_args[0][1] == pytest.approx(600, abs=1)
+        assert manager.get_auto_revert_remaining("mood_0") is None
+        assert manager.get_auto_revert_remaining("mood_1") == pytest.approx(600, abs=1)
+
+    @pytest.mark.usefixtures("call_later")
+    async def test_due_reverts_coalesce_into_one_restore(self, hass):
+        manager = MoodManager(hass, options={"revert_coalesce_window": 30})
+        manager._state_manager.restore_previous_many = AsyncMock(
+            return_value={"mood_0", "mood_1"}
+        )
+        manager._schedule_auto_revert("mood_0", 1)
+        manager._schedule_auto_revert("mood_1", 1)
+        manager._schedule_auto_revert("mood_2", 10)
+
+        # Pretend the first deadline has passed
+        for mood_id in ("mood_0", "mood_1"):
+            manager._revert_deadlines[mood_id] -= 60
+        manager._revert_heap = [
+            (manager._revert_deadlines[m], m) for m in ("mood_0", "mood_1", "mood_2")
+        ]
+
+        await manager._async_revert_timer_fired(None)
+
+        manager._state_manager.restore_previous_many.assert_awaited_once_with(
+            ["mood_0", "mood_1"]
+        )
+        assert manager.is_timer_active("mood_2")
+        assert not manager.is_timer_active("mood_0")
+
+
+# ---------------------------------------------------------------------------
+# Timer persistence
+# ---------------------------------------------------------------------------
+
+
+class TestTimerPersistence:
+    @pytest.mark.usefixtures("call_later")
+    async def test_restored_timer_resumes(self, hass):
+        from homeassistant.util import dt as dt_util
+
+        manager = MoodManager(hass)
+        await manager.load_moods({"moods": [{"name": "Movie Night"}]})
+        manager._store = MagicMock()
+        manager._store.async_load_timers = AsyncMock(
+            return_value={"mood_0": dt_util.utcnow().timestamp() + 120}
+        )
+
+        await manager.async_restore_timers()
+
+        assert manager.get_auto_revert_remaining("mood_0") == pytest.approx(120, abs=1)
+
+    @pytest.mark.usefixtures("call_later")
+    async def test_switch_sync_keeps_restored_timer(self, hass):
+        manager = MoodManager(hass)
+        manager._start_revert_timer("mood_0", 120)
+
+        await manager.set_auto_revert_enabled("mood_0", False)
+
+        assert manager.is_timer_active("mood_0")
+
+    @pytest.mark.usefixtures("call_later")
+    async def test_enabling_loads_stored_snapshots(self, hass):
+        manager = MoodManager(hass)
+        await manager.load_moods({"moods": [{"name": "Movie Night"}]})
+        store = manager._state_manager._store = MagicMock()
+        store.async_load_snapshots = AsyncMock(
+            return_value={"mood_0": [{"ts": 0, "lights": [["light.lamp", "off", None, None, None, None]]}]}
+        )
+        manager._state_manager._loaded = False
+        await manager.set_auto_revert_enabled("mood_0", False)
+
+        await manager.set_auto_revert_enabled("mood_0", True)
+
+        assert manager.is_timer_active("mood_0")
+
+    @pytest.mark.usefixtures("call_later")
+    def test_deadlines_saved_as_wall_clock(self, hass):
+        manager = MoodManager(hass)
+        manager._store = MagicMock()
+
+        manager._schedule_auto_revert("mood_0", 1)
+
+        data_func = manager._store.async_delay_save_timers.call_args[0][0]
+        assert set(data_func()) == {"mood_0"}
+
+
+# ---------------------------------------------------------------------------
+# Batched apply
+# ---------------------------------------------------------------------------
+
+
+class TestBatchedApply:
+    async def test_identical_lights_share_one_call(self, hass):
+        hass.services.async_call = AsyncMock()
+        manager = MoodManager(hass)
+
+        await manager._apply_light_config({
+            "light.a": {"power": True, "brightness": 50, "color_temp_kelvin": 3000},
+            "light.b": {"power": True, "brightness": 50, "color_temp_kelvin": 3000},
+            "light.c": {"power": True, "rgb_color": [255, 0, 0]},
+            "light.d": {"power": True, "rgb_color": [255, 0, 0]},
+            "light.e": {"power": False},
+        })
+
+        calls = [call.args for call in hass.services.async_call.await_args_list]
+        assert ("light", "turn_on", {
+            "entity_id": ["light.a", "light.b"],
+            "brightness_pct": 50,
+            "color_temp_kelvin": 3000,
+        }) in calls
+        assert ("light", "turn_on", {
+            "entity_id": ["light.c", "light.d"],
+            "rgb_color": [255, 0, 0],
+        }) in calls
+        assert ("light", "turn_off", {"entity_id": ["light.e"]}) in calls
+        assert len(calls) == 3
+
+    async def test_covers_grouped_by_target(self, hass):
+        hass.services.async_call = AsyncMock()
+        manager = MoodManager(hass)
+
+        await manager._apply_cover_config({
+            "cover.a": {"position": 40, "tilt_position": 10},
+            "cover.b": {"position": 40},
+            "cover.c": {"position": 80},
+        })
+
+        calls = [call.args for call in hass.services.async_call.await_args_list]
+        assert ("cover", "set_cover_position", {
+            "entity_id": ["cover.a", "cover.b"], "position": 40,
+        }) in calls
+        assert len(calls) == 3
+
+
+# ---------------------------------------------------------------------------
+# Delta apply
+# ---------------------------------------------------------------------------
+
+
+def _mock_state(state: str, **attributes) -> MagicMock:
+    mock = MagicMock()
+    mock.state = state
+    mock.attributes = attributes
+    return mock
+
+
+class TestDeltaApply:
+    MOOD = {
+        "moods": [
+            {
+                "name": "Movie Night",
+                "lights": ["light.a", "light.b"],
+                "light_config": {
+                    "light.a": {"power": True, "brightness": 100},
+                    "light.b": {"power": True, "brightness": 100},
+                },
+                "covers": ["cover.a"],
+                "cover_config": {"cover.a": {"position": 20}},
+            }
+        ]
+    }
+
+    @staticmethod
+    def _states(hass):
+        states = {
+            "light.a": _mock_state("on", brightness=255),
+            "light.b": _mock_state("off"),
+            "cover.a": _mock_state("open", current_position=21),
+        }
+        hass.states.get.side_effect = states.get
+        hass.services.async_call = AsyncMock()
+
+    @pytest.mark.usefixtures("call_later")
+    async def test_only_mismatched_entities_commanded(self, hass):
+        self._states(hass)
+        manager = MoodManager(hass, options={"delta_apply": True})
+        await manager.load_moods(self.MOOD)
+
+        await manager.activate_mood("mood_0")
+
+        calls = [call.args for call in hass.services.async_call.await_args_list]
+        assert calls == [
+            ("light", "turn_on", {"entity_id": ["light.b"], "brightness_pct": 100})
+        ]
+
+    @pytest.mark.usefixtures("call_later")
+    async def test_full_fan_out_without_delta(self, hass):
+        self._states(hass)
+        manager = MoodManager(hass)
+        await manager.load_moods(self.MOOD)
+
+        await manager.activate_mood("mood_0")
+
+        assert hass.services.async_call.await_count == 2
+
+
+# ---------------------------------------------------------------------------
+# Activation coalescing
+# ---------------------------------------------------------------------------
+
+
+class TestActivationCoalescing:
+    @pytest.mark.usefixtures("call_later")
+    async def test_overlapping_requests_share_one_dispatch(self, hass):
+        hass.states.get.return_value = _mock_state("on", brightness=10)
+        release = asyncio.Event()
+
+        async def _call(*_args, **_kwargs):
+            await release.wait()
+
+        hass.services.async_call = AsyncMock(side_effect=_call)
+        manager = MoodManager(hass)
+        await manager.load_moods(TestDeltaApply.MOOD)
+
+        first = asyncio.ensure_future(manager.activate_mood("mood_0", duration=1))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(manager.activate_mood("mood_0", duration=5))
+        third = asyncio.ensure_future(manager.activate_mood("mood_0", duration=30))
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(first, second, third) == [True, True, True]
+        # One light call and one cover call, one baseline snapshot
+        assert hass.services.async_call.await_count == 2
+        assert manager._state_manager.get_state_count("mood_0") == 1
+        # Latest request's duration wins
+        assert manager.get_auto_revert_remaining("mood_0") == pytest.approx(1800, abs=1)
+        counts = manager.get_diagnostics()["activity"]["counts"]["mood_0"]
+        assert counts == {"activate": 1, "activate_coalesced": 2}
+
+    @pytest.mark.usefixtures("call_later")
+    async def test_sequential_requests_run_separately(self, hass):
+        hass.states.get.return_value = _mock_state("on", brightness=10)
+        hass.services.async_call = AsyncMock()
+        manager = MoodManager(hass)
+        await manager.load_moods(TestDeltaApply.MOOD)
+
+        await manager.activate_mood("mood_0")
+        await manager.activate_mood("mood_0")
+
+        assert hass.services.async_call.await_count == 4
+        assert manager._activations == {}
+
+
+# ---------------------------------------------------------------------------
+# Multi-mood activation
+# ---------------------------------------------------------------------------
+
+
+class TestActivateMoods:
+    @staticmethod
+    def _mood(name, light_config):
+        return {
+            "moods": [
+                {"name": name, "lights": list(light_config), "light_config": light_config}
+            ]
+        }
+
+    @pytest.mark.usefixtures("call_later")
+    async def test_shared_entities_dispatched_once_latest_wins(self, hass):
+        hass.states.get.return_value = _mock_state("on", brightness=10)
+        hass.services.async_call = AsyncMock()
+        evening, reading = MoodManager(hass), MoodManager(hass)
+        await evening.load_moods(
+            self._mood(
+                "Evening",
+                {
+                    "light.sofa": {"power": True, "brightness": 30},
+                    "light.lamp": {"power": True, "brightness": 30},
+                },
+            )
+        )
+        await reading.load_moods(
+            self._mood(
+                "Reading",
+                {
+                    "light.lamp": {"power": True, "brightness": 100},
+                    "light.desk": {"power": True, "brightness": 100},
+                },
+            )
+        )
+
+        await async_activate_moods([(evening, "mood_0"), (reading, "mood_0")])
+
+        calls = [call.args for call in hass.services.async_call.await_args_list]
+        assert sorted(calls, key=lambda call: call[2]["brightness_pct"]) == [
+            ("light", "turn_on", {"entity_id": ["light.sofa"], "brightness_pct": 30}),
+            (
+                "light",
+                "turn_on",
+                {"entity_id": ["light.lamp", "light.desk"], "brightness_pct": 100},
+            ),
+        ]
+        # Each entity read once for both baselines
+        assert hass.states.get.call_count == 3
+        assert evening.can_restore("mood_0")
+        assert reading.can_restore("mood_0")
+        baseline = reading._state_manager.get_previous_state("mood_0")
+        assert [light.entity_id for light in baseline.light_states] == [
+            "light.lamp",
+            "light.desk",
+        ]
+
+    @pytest.mark.usefixtures("call_later")
+    async def test_later_mood_of_earlier_entry_wins(self, hass):
+        hass.states.get.return_value = _mock_state("off")
+        hass.services.async_call = AsyncMock()
+        home, guest = MoodManager(hass), MoodManager(hass)
+        await home.load_moods(
+            {
+                "moods": [
+                    {
+                        "name": "Dim",
+                        "lights": ["light.lamp"],
+                        "light_config": {"light.lamp": {"power": True, "brightness": 10}},
+                    },
+                    {
+                        "name": "Bright",
+                        "lights": ["light.lamp"],
+                        "light_config": {"light.lamp": {"power": True, "brightness": 90}},
+                    },
+                ]
+            }
+        )
+        await guest.load_moods(
+            self._mood("Medium", {"light.lamp": {"power": True, "brightness": 50}})
+        )
+
+        await async_activate_moods(
+            [(home, "mood_0"), (guest, "mood_0"), (home, "mood_1")]
+        )
+
+        calls = [call.args for call in hass.services.async_call.await_args_list]
+        assert calls == [
+            ("light", "turn_on", {"entity_id": ["light.lamp"], "brightness_pct": 90})
+        ]
+        assert guest.can_restore("mood_0")
+
+    @pytest.mark.usefixtures("call_later")
+    async def test_delta_apply_skips_entities_at_latest_target(self, hass):
+        states = {
+            "light.lamp": _mock_state("on", brightness=255),
+            "light.sofa": _mock_state("off"),
+        }
+        hass.states.get.side_effect = states.get
+        hass.services.async_call = AsyncMock()
+        first = MoodManager(hass)
+        second = MoodManager(hass, options={"delta_apply": True})
+        await first.load_moods(
+            self._mood("Dim", {"light.lamp": {"power": True, "brightness": 10}})
+        )
+        await second.load_moods(
+            self._mood(
+                "Bright",
+                {
+                    "light.lamp": {"power": True, "brightness": 100},
+                    "light.sofa": {"power": True, "brightness": 100},
+                },
+            )
+        )
+
+        await async_activate_moods([(first, "mood_0"), (second, "mood_0")], duration=5)
+
+        calls = [call.args for call in hass.services.async_call.await_args_list]
+        assert calls == [
+            ("light", "turn_on", {"entity_id": ["light.sofa"], "brightness_pct": 100})
+        ]
+        assert first.is_timer_active("mood_0")
+        assert second.is_timer_active("mood_0")
+
+    @pytest.mark.usefixtures("call_later")
+    async def test_each_entry_records_and_settles_its_own_moods(self, hass):
+        hass.states.get.return_value = _mock_state("off")
+        hass.services.async_call = AsyncMock()
+        first, second = MoodManager(hass), MoodManager(hass)
+        await first.load_moods(self._mood("Dim", {"light.lamp": {"power": True}}))
+        await second.load_moods(self._mood("Bright", {"light.desk": {"power": True}}))
+        settled = []
+        first.async_add_settled_listener("mood_0", lambda: settled.append("first"))
+        second.async_add_settled_listener("mood_0", lambda: settled.append("second"))
+
+        await async_activate_moods([(first, "mood_0"), (second, "mood_0")])
+
+        assert sorted(settled) == ["first", "second"]
+        for manager in (first, second):
+            activity = manager.get_diagnostics()["activity"]
+            assert activity["counts"] == {"mood_0": {"activate": 1}}
+            (timeline,) = activity["timelines"]
+            assert timeline["mood_ids"] == ["mood_0"]
+            assert len(timeline["calls"]) == 1
+
+    @pytest.mark.usefixtures("call_later", "entity_registry")
+    async def test_joins_running_activation(self, hass):
+        hass.states.get.return_value = _mock_state("off")
+        release = asyncio.Event()
+
+        async def _slow_call(*_args, **_kwargs):
+            await release.wait()
+
+        hass.services.async_call = AsyncMock(side_effect=_slow_call)
+        manager = MoodManager(hass)
+        await manager.load_moods(self._mood("Dim", {"light.lamp": {"power": True}}))
+        running = asyncio.create_task(manager.activate_mood("mood_0"))
+        await asyncio.sleep(0)
+
+        with patch.object(manager._state_manager, "save_current_state") as save:
+            batch = asyncio.create_task(async_activate_moods([(manager, "mood_0")]))
+            await asyncio.sleep(0)
+            release.set()
+            await asyncio.gather(running, batch)
+
+        save.assert_not_called()
+        assert hass.services.async_call.await_count == 1
+        counts = manager.get_diagnostics()["activity"]["counts"]["mood_0"]
+        assert counts == {"activate": 1, "activate_coalesced": 1}
+
+
+class TestSettledListeners:
+    @pytest.mark.usefixtures("call_later", "entity_registry")
+    async def test_called_after_activation_and_restore(
+        self, hass
+    ):
+        hass.states.get.return_value = _mock_state("off")
+        hass.services.async_call = AsyncMock()
+        manager = MoodManager(hass)
+        await manager.load_moods(
+            {
+                "moods": [
+                    {
+                        "name": "Relax",
+                        "lights": ["light.lamp"],
+                        "light_config": {"light.lamp": {"power": True}},
+                    }
+                ]
+            }
+        )
+        calls_sent = []
+        remove = manager.async_add_settled_listener(
+            "mood_0", lambda: calls_sent.append(hass.services.async_call.await_count)
+        )
+
+        await manager.activate_mood("mood_0")
+        await manager.restore_previous("mood_0")
+
+        # Each time only after the operation's commands went out
+        assert calls_sent == [1, 2]
+        remove()
+        await manager.activate_mood("mood_0")
+        assert calls_sent == [1, 2]
+
+
+class TestVectorizedMatch:
+    async def test_falls_back_without_numpy(self, hass):
+        manager = MoodManager(hass, options={"vectorized_match": True})
+        with patch.dict(
+            sys.modules,
+            {"numpy": None, "custom_components.moodlights.match_engine": None},
+        ):
+            await manager.load_moods({"moods": [{"name": "Relax", "lights": ["light.a"]}]})
+
+        assert manager.match_engine is None
+
+
+class TestSaveAllStates:
+    async def test_one_read_per_entity_and_shared_records(self, hass):
+        hass.states.get.return_value = _mock_state("on", brightness=10)
+        living, bedroom = MoodManager(hass), MoodManager(hass)
+        await living.load_moods(
+            {
+                "moods": [
+                    {"name": "Relax", "lights": ["light.lamp", "light.sofa"]},
+                    {"name": "Movie", "lights": ["light.lamp"], "covers": ["cover.blind"]},
+                ]
+            }
+        )
+        await bedroom.load_moods({"moods": [{"name": "Sleep", "lights": ["light.lamp"]}]})
+
+        assert await async_save_all_states([living, bedroom], "Before Party") == 3
+
+        assert hass.states.get.call_count == 3
+        relax = living._state_manager.get_previous_state("mood_0")
+        movie = living._state_manager.get_previous_state("mood_1")
+        sleep = bedroom._state_manager.get_previous_state("mood_0")
+        assert relax.preset_name == "Before Party"
+        assert relax.light_states[0] is movie.light_states[0] is sleep.light_states[0]
+        assert living._state_manager.get_snapshot_footprint()["stored_records"] == 3
+
+    async def test_moods_without_states_are_skipped(self, hass):
+        hass.states.get.return_value = None
+        manager = MoodManager(hass)
+        await manager.load_moods({"moods": [{"name": "Relax", "lights": ["light.lamp"]}]})
+
+        assert await manager.save_all_states() == 0
+        assert not manager.can_restore("mood_0")
+
+
+# ---------------------------------------------------------------------------
+# Convergence
+# ---------------------------------------------------------------------------
+
+
+class TestConvergence:
+    OPTIONS = {"converge": True, "converge_timeout": 0.2, "converge_max_retries": 2}
+
+    @pytest.fixture(autouse=True)
+    def _fast(self, hass):
+        """Run background tasks on the loop, untracked entities, short backoff."""
+        hass.async_create_background_task = lambda coro, _name: asyncio.ensure_future(coro)
+        with patch(
+            "custom_components.moodlights.tracker.async_track_state_change_event",
+            side_effect=lambda *_args: MagicMock(),
+        ), patch("custom_components.moodlights.manager.CONVERGE_INITIAL_BACKOFF_SEC", 0.01):
+            yield
+
+    @staticmethod
+    def _states(hass):
+        """light.a reaches its target when commanded; light.b never does."""
+        states = {
+            "light.a": _mock_state("off"),
+            "light.b": _mock_state("off"),
+            "cover.a": _mock_state("open", current_position=20),
+        }
+        hass.states.get.side_effect = states.get
+
+        async def _call(_domain, _service, data, blocking):
+            if "light.a" in data["entity_id"]:
+                states["light.a"] = _mock_state("on", brightness=255)
+
+        hass.services.async_call = AsyncMock(side_effect=_call)
+        return states
+
+    @staticmethod
+    def _event(entity_id, new_state):
+        event = MagicMock()
+        event.data = {"entity_id": entity_id, "new_state": new_state}
+        return event
+
+    @pytest.mark.usefixtures("call_later")
+    async def test_only_laggards_are_resent(self, hass):
+        self._states(hass)
+        manager = MoodManager(hass, options=self.OPTIONS)
+        await manager.load_moods(TestDeltaApply.MOOD)
+
+        await manager.activate_mood("mood_0")
+        task, _watched = manager._convergence["mood_0"]
+        await task
+
+        calls = hass.services.async_call.await_args_list
+        # First two calls are the activation itself (lights, cover)
+        assert [call.args[2]["entity_id"] for call in calls[2:]] == [
+            ["light.b"],
+            ["light.b"],
+        ]
+        convergence = manager.get_diagnostics()["activity"]["timelines"][0]["convergence"]
+        assert convergence["status"] == "timed_out"
+        assert convergence["retries"] == 2
+        assert convergence["resent"] == {"light.b": 2}
+        assert convergence["laggards"] == ["light.b"]
+        assert "mood_0" not in manager._convergence
+
+    @pytest.mark.usefixtures("call_later")
+    async def test_state_event_settles_without_retry(self, hass):
+        self._states(hass)
+        manager = MoodManager(hass, options={**self.OPTIONS, "converge_timeout": 5})
+        await manager.load_moods(TestDeltaApply.MOOD)
+
+        await manager.activate_mood("mood_0")
+        task, _watched = manager._convergence["mood_0"]
+        await asyncio.sleep(0)
+        manager._tracker._async_route_event(
+            self._event("light.b", _mock_state("on", brightness=255))
+        )
+        await task
+
+        convergence = manager.get_diagnostics()["activity"]["timelines"][0]["convergence"]
+        assert convergence["status"] == "converged"
+        assert convergence["retries"] == 0
+        assert hass.services.async_call.await_count == 2
+
+    @pytest.mark.usefixtures("call_later", "entity_registry")
+    async def test_restore_cancels_convergence(self, hass):
+        self._states(hass)
+        manager = MoodManager(hass, options={**self.OPTIONS, "converge_timeout": 5})
+        await manager.load_moods(TestDeltaApply.MOOD)
+
+        await manager.activate_mood("mood_0")
+        task, _watched = manager._convergence["mood_0"]
+        await asyncio.sleep(0)
+        await manager.restore_previous("mood_0")
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert manager._convergence == {}
+        timelines = manager.get_diagnostics()["activity"]["timelines"]
+        assert timelines[1]["convergence"]["status"] == "cancelled"
+
+
+# ---------------------------------------------------------------------------
+# Diagnostics
+# ---------------------------------------------------------------------------
+
+
+class TestRestoreClaim:
+    @pytest.mark.usefixtures("call_later", "entity_registry")
+    async def test_restores_entities_removed_from_mood(self, hass):
+        hass.states.get.return_value = _mock_state("on", brightness=10)
+        hass.services.async_call = AsyncMock()
+        manager = MoodManager(hass)
+        await manager.load_moods(
+            {"moods": [{"name": "Relax", "lights": ["light.a", "light.b"]}]}
+        )
+        await manager.activate_mood("mood_0")
+
+        # Reconfigured between save and restore: light.b is no longer in the mood
+        await manager.load_moods({"moods": [{"name": "Relax", "lights": ["light.a"]}]})
+        hass.services.async_call.reset_mock()
+        await manager.restore_previous("mood_0")
+
+        restored = {
+            entity_id
+            for call in hass.services.async_call.await_args_list
+            for entity_id in (
+                [call.args[2]["entity_id"]]
+                if isinstance(call.args[2]["entity_id"], str)
+                else call.args[2]["entity_id"]
+            )
+        }
+        assert restored == {"light.a", "light.b"}
+        restore = manager.get_diagnostics()["activity"]["timelines"][0]
+        assert restore["kind"] == "restore"
+        assert restore["superseded"] == []
+
+
+class TestDiagnostics:
+    @pytest.mark.usefixtures("call_later", "entity_registry")
+    async def test_activation_and_restore_recorded(self, hass):
+        hass.states.get.return_value = _mock_state("on", brightness=10)
+        hass.services.async_call = AsyncMock()
+        manager = MoodManager(hass)
+        await manager.load_moods(TestDeltaApply.MOOD)
+
+        await manager.activate_mood("mood_0", duration=5)
+        await manager.restore_previous("mood_0")
+
+        data = manager.get_diagnostics()
+        assert data["activity"]["counts"] == {"mood_0": {"activate": 1, "restore": 1}}
+        restore, activate = data["activity"]["timelines"]
+        assert activate["kind"] == "activate"
+        assert len(activate["calls"]) == 2
+        assert restore["kind"] == "restore"
+        assert data["snapshots"]["generations"] == 1
+        assert data["snapshots"]["stored_records"] == 3
+        assert data["timers"] == {}
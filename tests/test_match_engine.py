@@ -0,0 +1,131 @@
+"""Tests for the vectorized match engine."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.moodlights.manager import MoodConfig, MoodManager
+
+pytest.importorskip("numpy")
+
+from custom_components.moodlights.match_engine import MatchEngine
+
+
+def _mock_state(state: str, **attributes) -> MagicMock:
+    mock = MagicMock()
+    mock.state = state
+    mock.attributes = attributes
+    return mock
+
+
+LIGHT_CONFIGS = [
+    {"power": True},
+    {"power": False},
+    {"power": True, "brightness": 50},
+    {"power": True, "color_temp_kelvin": 4000},
+    {"power": True, "rgb_color": [255, 0, 128]},
+    {"power": True, "effect": "Rainbow", "brightness": 100},
+    {"brightness": 50},
+]
+
+LIGHT_STATES = [
+    None,
+    _mock_state("unavailable"),
+    _mock_state("off"),
+    _mock_state("on"),
+    _mock_state("on", brightness=128),
+    _mock_state("on", brightness=255, effect="Rainbow"),
+    _mock_state("on", color_temp_kelvin=4000, rgb_color=(0, 0, 255)),
+    _mock_state("on", rgb_color=(255, 0, 128)),
+    _mock_state("on", effect="Strobe"),
+]
+
+COVER_CONFIGS = [{"position": 50}, {"tilt_position": 10}, {"position": 0, "tilt_position": 0}]
+
+COVER_STATES = [
+    None,
+    _mock_state("unknown", current_position=50),
+    _mock_state("open", current_position=51),
+    _mock_state("open", current_position=53, current_tilt_position=10),
+    _mock_state("closed", current_position=0, current_tilt_position=2),
+]
+
+
+def _moods() -> list[MoodConfig]:
+    return [
+        MoodConfig(
+            mood_id=f"mood_{idx}",
+            name=f"Mood {idx}",
+            lights=["light.a", "light.b"],
+            light_config={"light.a": light_config, "light.b": {"power": True}},
+            covers=["cover.a"],
+            cover_config={"cover.a": COVER_CONFIGS[idx % len(COVER_CONFIGS)]},
+        )
+        for idx, light_config in enumerate(LIGHT_CONFIGS)
+    ]
+
+
+class TestMatchEngine:
+    @pytest.mark.parametrize("light_state", LIGHT_STATES)
+    @pytest.mark.parametrize("cover_state", COVER_STATES)
+    def test_agrees_with_compiled_targets(self, light_state, cover_state):
+        moods = _moods()
+        engine = MatchEngine(moods)
+        states = {
+            "light.a": light_state,
+            "light.b": _mock_state("on"),
+            "cover.a": cover_state,
+        }
+        engine.sync(states.get)
+
+        for mood in moods:
+            expected = (
+                [
+                    entity_id
+                    for entity_id, target in mood.light_targets.items()
+                    if not target.matches(states[entity_id])
+                ],
+                [
+                    entity_id
+                    for entity_id, target in mood.cover_targets.items()
+                    if not target.matches(states[entity_id])
+                ],
+            )
+            assert engine.mismatched(mood.mood_id) == expected, mood.light_config
+
+    def test_events_update_in_place(self):
+        engine = MatchEngine(_moods()[:1])
+        states = {
+            "light.b": _mock_state("on"),
+            "cover.a": _mock_state("open", current_position=50),
+        }
+        engine.sync(states.get)
+        assert engine.mismatched("mood_0") == (["light.a"], [])
+        assert engine.active_mood_ids() == []
+
+        event = MagicMock()
+        event.data = {"entity_id": "light.a", "new_state": _mock_state("on")}
+        engine.async_handle_event(event)
+
+        assert engine.mismatched("mood_0") == ([], [])
+        assert engine.active_mood_ids() == ["mood_0"]
+
+
+class TestManagerIntegration:
+    async def test_engine_built_when_enabled(self, hass):
+        hass.states.get.return_value = _mock_state("on")
+        manager = MoodManager(hass, options={"vectorized_match": True})
+        with patch.object(manager._tracker, "async_subscribe") as subscribe:
+            await manager.load_moods(
+                {
+                    "moods": [
+                        {
+                            "name": "Relax",
+                            "lights": ["light.a"],
+                            "light_config": {"light.a": {"power": True}},
+                        }
+                    ]
+                }
+            )
+
+        assert manager.match_engine.mismatched("mood_0") == ([], [])
+        subscribe.assert_called_once_with(["light.a"], manager.match_engine.async_handle_event)
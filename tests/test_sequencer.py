@@ -0,0 +1,101 @@
+"""Tests for entity ownership and command sequencing."""
+import asyncio
+
+from custom_components.moodlights.activity import ActivityLog
+from custom_components.moodlights.dispatch import ServiceDispatcher
+from custom_components.moodlights.sequencer import EntitySequencer, async_get_sequencer
+
+
+def _gated_call(hass):
+    """Install a service call that blocks until its gate opens; log the calls."""
+    sent: list[tuple[str, object]] = []
+    gates: dict[str, asyncio.Event] = {}
+
+    async def _call(_domain, service, data, blocking):
+        sent.append((service, data["entity_id"]))
+        gate = gates.get(service)
+        if gate is not None:
+            await gate.wait()
+
+    hass.services.async_call = _call
+    return sent, gates
+
+
+async def _operation(sequencer, dispatcher, entity_ids, calls, log=None):
+    """Run calls in order inside one claimed operation."""
+    log = log or ActivityLog()
+    with log.track("activate", ["mood"]), sequencer.claim(entity_ids):
+        for service, entity_id in calls:
+            await dispatcher.async_call("light", service, {"entity_id": entity_id})
+
+
+class TestEntitySequencer:
+    async def test_newer_claim_waits_then_supersedes(self, hass):
+        sent, gates = _gated_call(hass)
+        gates["slow"] = asyncio.Event()
+        sequencer = EntitySequencer()
+        dispatcher = ServiceDispatcher(hass, sequencer=sequencer)
+        older_log = ActivityLog()
+
+        older = asyncio.ensure_future(
+            _operation(
+                sequencer,
+                dispatcher,
+                ["light.x"],
+                [("slow", "light.x"), ("unsent", "light.x")],
+                older_log,
+            )
+        )
+        await asyncio.sleep(0)
+        newer = asyncio.ensure_future(
+            _operation(
+                sequencer,
+                dispatcher,
+                ["light.x", "light.y"],
+                [("newer", ["light.x", "light.y"])],
+            )
+        )
+        for _ in range(3):
+            await asyncio.sleep(0)
+        # Newer command waits for the one already in flight on light.x
+        assert sent == [("slow", "light.x")]
+
+        gates["slow"].set()
+        await asyncio.gather(older, newer)
+
+        # The older operation's queued command for light.x was dropped
+        assert sent == [("slow", "light.x"), ("newer", ["light.x", "light.y"])]
+        assert older_log.as_dict()["timelines"][0]["superseded"] == ["light.x"]
+
+    async def test_disjoint_claims_run_in_parallel(self, hass):
+        sent, gates = _gated_call(hass)
+        gates["hold"] = asyncio.Event()
+        sequencer = EntitySequencer()
+        dispatcher = ServiceDispatcher(hass, sequencer=sequencer)
+
+        tasks = [
+            asyncio.ensure_future(
+                _operation(sequencer, dispatcher, [entity_id], [("hold", entity_id)])
+            )
+            for entity_id in ("light.a", "light.b")
+        ]
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+        assert sorted(sent) == [("hold", "light.a"), ("hold", "light.b")]
+        gates["hold"].set()
+        await asyncio.gather(*tasks)
+
+    async def test_unclaimed_calls_pass_through(self, hass):
+        sent, _gates = _gated_call(hass)
+        sequencer = EntitySequencer()
+        dispatcher = ServiceDispatcher(hass, sequencer=sequencer)
+        with sequencer.claim(["light.a"]):
+            pass
+
+        await dispatcher.async_call("light", "turn_on", {"entity_id": "light.a"})
+
+        assert sent == [("turn_on", "light.a")]
+
+    def test_shared_across_entries(self, hass):
+        assert async_get_sequencer(hass) is async_get_sequencer(hass)
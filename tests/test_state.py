@@ -1,9 +1,17 @@
 """Tests for state management."""
+import asyncio
+
 import pytest
-from unittest.mock import MagicMock, patch
-from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import UTC, datetime
 
-from custom_components.moodlights.state import StateManager, LightState, MoodState
+from custom_components.moodlights.state import (
+    StateManager,
+    LightState,
+    MoodState,
+    SnapshotHistory,
+    _mood_state_from_json,
+)
 
 
 class TestStateManager:
@@ -104,3 +112,287 @@ class TestStateManager:
         
         manager.clear_states("mood_0")
         assert manager.get_state_count("mood_0") == 0
+
+    async def test_restore_previous_many_merges_shared_entities(
+        self, hass, entity_registry
+    ):
+        """Test restoring several moods in one dispatch, later mood winning."""
+        manager = StateManager(hass)
+        hass.services.async_call = AsyncMock()
+
+        first = MagicMock(state="on", attributes={"brightness": 10})
+        second = MagicMock(state="on", attributes={"brightness": 200})
+        hass.states.get.return_value = first
+        manager.save_current_state("mood_0", "A", ["light.shared", "light.a"])
+        hass.states.get.return_value = second
+        manager.save_current_state("mood_1", "B", ["light.shared"])
+
+        restored = await manager.restore_previous_many(["mood_0", "mood_1", "mood_2"])
+
+        assert restored == {"mood_0", "mood_1"}
+        calls = {
+            call.args[2]["entity_id"]: call.args[2]
+            for call in hass.services.async_call.await_args_list
+        }
+        assert calls["light.shared"]["brightness"] == 200
+        assert calls["light.a"]["brightness"] == 10
+        assert hass.services.async_call.await_count == 2
+
+    async def test_restore_runs_integrations_in_parallel(self, hass, entity_registry):
+        """Test lights of one integration restore in order, others concurrently."""
+        manager = StateManager(hass)
+        entity_registry.platforms = {
+            "light.hue_1": "hue",
+            "light.hue_2": "hue",
+            "light.zigbee": "mqtt",
+        }
+        started: list[str] = []
+        release = asyncio.Event()
+
+        async def _call(_domain, _service, data, blocking):
+            started.append(data["entity_id"])
+            await release.wait()
+
+        hass.services.async_call = _call
+        hass.states.get.return_value = MagicMock(state="on", attributes={})
+        manager.save_current_state(
+            "mood_0", "", ["light.hue_1", "light.hue_2", "light.zigbee"]
+        )
+
+        task = asyncio.ensure_future(manager.restore_previous("mood_0"))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        # First Hue light and the MQTT light are in flight; second Hue light waits
+        assert started == ["light.hue_1", "light.zigbee"]
+
+        release.set()
+        assert await task is True
+        assert started == ["light.hue_1", "light.zigbee", "light.hue_2"]
+
+
+class TestSnapshotRecords:
+    """Test the compact snapshot records."""
+
+    def test_only_active_color_mode_is_kept(self, hass):
+        """Test a light in XY mode keeps only its XY colour."""
+        manager = StateManager(hass)
+        hass.states.get.return_value = MagicMock(
+            state="on",
+            attributes={
+                "color_mode": "xy",
+                "brightness": 80,
+                "color_temp_kelvin": 2700,
+                "rgb_color": (255, 10, 0),
+                "xy_color": (0.6, 0.3),
+            },
+        )
+
+        light = manager.save_current_state("mood_0", "", ["light.test"]).light_states[0]
+
+        assert light.xy_color == (0.6, 0.3)
+        assert light.rgb_color is None
+        assert light.color_temp_kelvin is None
+        assert not hasattr(light, "__dict__")
+
+    async def test_restore_sends_single_color(self, hass, entity_registry):
+        """Test restore sends the saved colour mode's descriptor only."""
+        manager = StateManager(hass)
+        hass.services.async_call = AsyncMock()
+        hass.states.get.return_value = MagicMock(
+            state="on",
+            attributes={
+                "color_mode": "color_temp",
+                "color_temp": 370,
+                "color_temp_kelvin": 2702,
+                "rgb_color": (255, 166, 87),
+            },
+        )
+        manager.save_current_state("mood_0", "", ["light.test"])
+
+        await manager.restore_previous("mood_0")
+
+        data = hass.services.async_call.await_args.args[2]
+        assert data == {"entity_id": "light.test", "color_temp_kelvin": 2702}
+
+    def test_record_is_read_as_utc(self):
+        """Test stored records load with a timezone-aware timestamp."""
+        mood_state = _mood_state_from_json(
+            "mood_0",
+            {
+                "ts": 0,
+                "lights": [["light.test", "on", 120, "color_temp_kelvin", 2702, None]],
+            },
+        )
+
+        assert mood_state.timestamp == datetime(1970, 1, 1, tzinfo=UTC)
+        assert mood_state.light_states[0].color_temp_kelvin == 2702
+
+
+class TestSnapshotHistory:
+    """Test the delta-encoded snapshot history."""
+
+    @staticmethod
+    def _light(entity_id: str, brightness: int) -> LightState:
+        return LightState(entity_id=entity_id, state="on", brightness=brightness)
+
+    def test_generations_rebuild_and_share_records(self):
+        """Test every generation rebuilds and unchanged records are shared."""
+        history = SnapshotHistory(maxlen=5)
+        generations = [
+            MoodState("mood_0", "A", (self._light("light.a", 1), self._light("light.b", 1))),
+            MoodState("mood_0", "B", (self._light("light.a", 2), self._light("light.b", 1))),
+            MoodState("mood_0", "C", (self._light("light.b", 1), self._light("light.c", 3))),
+        ]
+        for mood_state in generations:
+            history.append(mood_state)
+
+        assert len(history) == 3
+        assert list(history) == generations
+        assert history[1] == generations[1]
+        assert history[-1] == generations[-1]
+        # light.b never changed: one object across all generations
+        light_b = [
+            next(light for light in state.light_states if light.entity_id == "light.b")
+            for state in history
+        ]
+        assert light_b[0] is light_b[1] is light_b[2]
+
+    def test_reordered_entities_keep_saved_order(self):
+        """Test a generation with reordered entities rebuilds in its own order."""
+        history = SnapshotHistory(maxlen=5)
+        first = MoodState("mood_0", "", (self._light("light.a", 1), self._light("light.b", 1)))
+        second = MoodState("mood_0", "", (self._light("light.b", 1), self._light("light.a", 1)))
+        history.append(first)
+        history.append(second)
+
+        assert [light.entity_id for light in history[1].light_states] == ["light.b", "light.a"]
+
+    def test_oldest_generation_is_dropped(self):
+        """Test the base advances once the history is full."""
+        history = SnapshotHistory(maxlen=2)
+        for brightness in (1, 2, 3):
+            light = self._light("light.a", brightness)
+            history.append(MoodState("mood_0", str(brightness), (light,)))
+
+        assert len(history) == 2
+        assert [state.preset_name for state in history] == ["2", "3"]
+        assert history[0].light_states[0].brightness == 2
+
+    def test_single_generation_keeps_no_delta(self):
+        """Test a one-deep history just replaces its only generation."""
+        history = SnapshotHistory(maxlen=1)
+        for brightness in (1, 2):
+            mood_state = MoodState("mood_0", "", (self._light("light.a", brightness),))
+            history.append(mood_state)
+
+        assert len(history) == 1
+        assert history.latest is mood_state
+        assert list(history) == [mood_state]
+        assert not history._deltas
+
+
+class TestDeltaRestore:
+    """Test restoring only entities that moved away from their snapshot."""
+
+    async def test_unchanged_entities_are_skipped(self, hass, entity_registry):
+        """Test lights and covers still at their snapshot get no commands."""
+        manager = StateManager(hass, delta_restore=True)
+        hass.services.async_call = AsyncMock()
+        snapshot = {
+            "light.still": MagicMock(
+                state="on", attributes={"brightness": 100, "color_temp_kelvin": 3000}
+            ),
+            "light.moved": MagicMock(state="on", attributes={"brightness": 100}),
+            "cover.still": MagicMock(state="open", attributes={"current_position": 50}),
+        }
+        hass.states.get.side_effect = snapshot.get
+        manager.save_current_state(
+            "mood_0", "", ["light.still", "light.moved"], ["cover.still"]
+        )
+
+        # Within tolerance for light.still and cover.still; light.moved changed
+        snapshot["light.still"] = MagicMock(
+            state="on", attributes={"brightness": 101, "color_temp_kelvin": 3040}
+        )
+        snapshot["light.moved"] = MagicMock(state="on", attributes={"brightness": 255})
+        snapshot["cover.still"] = MagicMock(
+            state="open", attributes={"current_position": 52}
+        )
+
+        assert await manager.restore_previous("mood_0") is True
+        assert hass.services.async_call.await_count == 1
+        call = hass.services.async_call.await_args
+        assert call.args[2]["entity_id"] == "light.moved"
+
+    async def test_nothing_changed_is_still_a_restore(self, hass, entity_registry):
+        """Test a restore with nothing to do succeeds without calls."""
+        manager = StateManager(hass, delta_restore=True)
+        hass.services.async_call = AsyncMock()
+        hass.states.get.return_value = MagicMock(state="closed", attributes={})
+        manager.save_current_state("mood_0", "", [], ["cover.blind"])
+
+        assert await manager.restore_previous("mood_0") is True
+        hass.services.async_call.assert_not_awaited()
+
+    async def test_unavailable_entity_is_restored(self, hass, entity_registry):
+        """Test an entity in an unknown state is never assumed to be restored."""
+        manager = StateManager(hass, delta_restore=True)
+        hass.services.async_call = AsyncMock()
+        hass.states.get.return_value = MagicMock(state="off", attributes={})
+        manager.save_current_state("mood_0", "", ["light.test"])
+
+        hass.states.get.return_value = MagicMock(state="unavailable", attributes={})
+        await manager.restore_previous("mood_0")
+
+        hass.services.async_call.assert_awaited_once()
+
+
+class TestStatePersistence:
+    """Test lazy loading and debounced saving of snapshots."""
+
+    @staticmethod
+    def _store(data=None) -> MagicMock:
+        store = MagicMock()
+        store.async_load_snapshots = AsyncMock(return_value=data or {})
+        store.async_save_snapshots = AsyncMock()
+        return store
+
+    async def test_snapshots_round_trip(self, hass):
+        """Test a snapshot survives serialization through the store."""
+        store = self._store()
+        manager = StateManager(hass, store=store)
+        await manager.async_ensure_loaded()
+        hass.states.get.return_value = MagicMock(
+            state="on", attributes={"brightness": 128, "rgb_color": [255, 0, 0]}
+        )
+        manager.save_current_state("mood_0", "Before", ["light.test"])
+
+        data_func = store.async_delay_save_snapshots.call_args[0][0]
+        reloaded = StateManager(hass, store=self._store(data_func()))
+        assert not reloaded.can_restore("mood_0")
+        await reloaded.async_ensure_loaded()
+
+        state = reloaded.get_previous_state("mood_0")
+        assert state.preset_name == "Before"
+        assert state.light_states[0].brightness == 128
+        assert state.light_states[0].rgb_color == (255, 0, 0)
+
+    async def test_load_happens_once(self, hass):
+        """Test the snapshot store is parsed only on first access."""
+        store = self._store()
+        manager = StateManager(hass, store=store)
+
+        await manager.async_ensure_loaded()
+        await manager.async_ensure_loaded()
+
+        store.async_load_snapshots.assert_awaited_once()
+
+    def test_no_save_before_load(self, hass):
+        """Test unloaded history is never overwritten by an early save."""
+        store = self._store()
+        manager = StateManager(hass, store=store)
+        hass.states.get.return_value = MagicMock(state="on", attributes={})
+
+        manager.save_current_state("mood_0", "Early", ["light.test"])
+
+        store.async_delay_save_snapshots.assert_not_called()
@@ -0,0 +1,95 @@
+"""Tests for compiled match targets."""
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.moodlights.targets import (
+    CoverTarget,
+    LightTarget,
+    brightness_pct_to_raw,
+)
+
+
+def _mock_state(state: str, **attributes) -> MagicMock:
+    mock = MagicMock()
+    mock.state = state
+    mock.attributes = attributes
+    return mock
+
+
+# ---------------------------------------------------------------------------
+# brightness_pct_to_raw helper
+# ---------------------------------------------------------------------------
+
+
+class TestBrightnessPctToRaw:
+    def test_100_pct_is_255(self):
+        assert brightness_pct_to_raw(100) == 255
+
+    def test_50_pct_is_128(self):
+        assert brightness_pct_to_raw(50) == 128
+
+    def test_1_pct_is_3(self):
+        assert brightness_pct_to_raw(1) == 3
+
+
+# ---------------------------------------------------------------------------
+# LightTarget
+# ---------------------------------------------------------------------------
+
+
+class TestLightTarget:
+    def test_compiles_raw_values(self):
+        target = LightTarget.from_config(
+            {"power": True, "brightness": 50, "rgb_color": [255, 0, 128]}
+        )
+
+        assert target.state == "on"
+        assert target.brightness == 128
+        assert target.rgb_color == (255, 0, 128)
+
+    def test_effect_suppresses_colour(self):
+        target = LightTarget.from_config(
+            {"power": True, "effect": "Rainbow", "color_temp_kelvin": 4000}
+        )
+
+        assert target.effect == "Rainbow"
+        assert target.color_temp_kelvin is None
+        assert target.rgb_color is None
+
+    def test_color_temp_suppresses_rgb(self):
+        target = LightTarget.from_config(
+            {"color_temp_kelvin": 4000, "rgb_color": [255, 0, 0]}
+        )
+
+        assert target.color_temp_kelvin == 4000
+        assert target.rgb_color is None
+
+    def test_is_immutable(self):
+        target = LightTarget.from_config({"power": True})
+
+        with pytest.raises(AttributeError):
+            target.state = "off"
+
+
+# ---------------------------------------------------------------------------
+# CoverTarget
+# ---------------------------------------------------------------------------
+
+
+class TestCoverTarget:
+    def test_position_within_tolerance_matches(self):
+        target = CoverTarget.from_config({"position": 50})
+
+        assert target.matches(_mock_state("open", current_position=52)) is True
+        assert target.matches(_mock_state("open", current_position=53)) is False
+
+    def test_missing_tilt_is_not_matching(self):
+        target = CoverTarget.from_config({"tilt_position": 30})
+
+        assert target.matches(_mock_state("open", current_position=50)) is False
+
+    def test_unavailable_cover_is_not_matching(self):
+        target = CoverTarget.from_config({"position": 50})
+
+        assert target.matches(_mock_state("unavailable", current_position=50)) is False
@@ -0,0 +1,63 @@
+"""Tests for the shared entity tracker."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.moodlights.tracker import MoodEntityTracker, async_get_tracker
+
+
+def _state_event(entity_id: str) -> MagicMock:
+    event = MagicMock()
+    event.data = {"entity_id": entity_id, "new_state": None}
+    return event
+
+
+@pytest.fixture
+def track():
+    """Patch the HA state-change helper and return the mock."""
+    with patch(
+        "custom_components.moodlights.tracker.async_track_state_change_event"
+    ) as mock_track:
+        mock_track.side_effect = lambda *_args: MagicMock()
+        yield mock_track
+
+
+class TestMoodEntityTracker:
+    def test_one_subscription_per_entity(self, hass, track):
+        tracker = MoodEntityTracker(hass)
+
+        tracker.async_subscribe(["light.a", "light.b"], MagicMock())
+        tracker.async_subscribe(["light.a"], MagicMock())
+
+        assert track.call_count == 2
+        assert tracker.tracked_entity_count == 2
+
+    @pytest.mark.usefixtures("track")
+    def test_event_routed_only_to_affected_handlers(self, hass):
+        tracker = MoodEntityTracker(hass)
+        first, second = MagicMock(), MagicMock()
+        tracker.async_subscribe(["light.a", "light.b"], first)
+        tracker.async_subscribe(["light.b"], second)
+
+        event = _state_event("light.a")
+        tracker._async_route_event(event)
+
+        first.assert_called_once_with(event)
+        second.assert_not_called()
+
+    @pytest.mark.usefixtures("track")
+    def test_last_unsubscribe_releases_listener(self, hass):
+        tracker = MoodEntityTracker(hass)
+        unsub_first = tracker.async_subscribe(["light.a"], MagicMock())
+        unsub_second = tracker.async_subscribe(["light.a"], MagicMock())
+        listener_unsub = tracker._unsubs["light.a"]
+
+        unsub_first()
+        listener_unsub.assert_not_called()
+
+        unsub_second()
+        listener_unsub.assert_called_once()
+        assert tracker.tracked_entity_count == 0
+
+    def test_tracker_is_shared(self, hass):
+        assert async_get_tracker(hass) is async_get_tracker(hass)